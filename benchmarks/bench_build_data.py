@@ -0,0 +1,34 @@
+"""
+Times `Mind.build_data` on a generated history.
+
+Usage (from the repository root):
+    python benchmarks/bench_build_data.py [days] [orders]
+"""
+import sys
+import tempfile
+from pathlib import Path
+from timeit import repeat
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT.joinpath('pycounter'))]
+
+from tests.fake_db import generate_fake_db
+from pycounter.config import yaml_config_loader
+from core.db import Mind
+
+
+def main(num_days: int = 1_825, num_orders: int = 50):
+    with tempfile.TemporaryDirectory() as tmp:
+        config = yaml_config_loader('pycounter/config.yaml')
+        config.mind.Database = str(Path(tmp).joinpath('bench.json'))
+        generate_fake_db(num_days, num_orders, config.mind.Database, config.mind.collection)
+
+        mind = Mind(config)
+        for format in ('hours', 'perc'):
+            timings = repeat(lambda: mind.build_data(format=format), number=1, repeat=3)
+            print(f"build_data({format!r}) days={num_days} orders={num_orders}: {min(timings) * 1e3:.1f} ms")
+        mind.close()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:3]))
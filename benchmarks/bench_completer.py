@@ -0,0 +1,54 @@
+"""
+Measures the keystroke-to-popup latency of the project completer.
+
+Builds a `FocusLineEdit` over generated project codes and times, for every
+prefix of a few queries, the filter update and the processing of the
+resulting Qt events (model reset and popup layout).
+
+Usage (from the repository root):
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_completer.py [names] [fuzzy]
+"""
+import sys
+import time
+import random
+from pathlib import Path
+from statistics import median
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT.joinpath('pycounter'))]
+
+from PyQt5.QtWidgets import QApplication
+
+QUERIES = ['4711', '12-dev', 'OPS', 'zz9', '1', '1234576']
+
+
+def main(num_names: int = 100_000, mode: str = 'substring'):
+    app = QApplication(sys.argv)
+    from config import CompleterConfig
+    from ui.activities import FocusLineEdit
+
+    random.seed(1)
+    names = [f"{random.randint(1_000_000, 9_999_999)}{random.choice(['', '-dev', '-ops'])}" for _ in range(num_names)]
+
+    start = time.perf_counter()
+    line_edit = FocusLineEdit(names, config=CompleterConfig(fuzzy=mode == 'fuzzy'))
+    line_edit.show()
+    app.processEvents()
+    print(f"construction with {num_names} names ({mode}): {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    timings = []
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            line_edit.setText(query[:end])
+            start = time.perf_counter()
+            line_edit._update_filter()
+            app.processEvents()
+            timings.append(time.perf_counter() - start)
+        line_edit.clear()
+
+    print(f"keystroke latency: median {median(timings) * 1e3:.2f} ms, max {max(timings) * 1e3:.2f} ms "
+          f"({len(timings)} keystrokes)")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]), *sys.argv[2:3])
@@ -0,0 +1,47 @@
+"""
+Measures the cold import cost of the application modules loaded at startup.
+
+Each measurement runs in a fresh interpreter, which imports `ui.app` (everything
+`main()` needs before the first paint) and reports the import time, the peak RSS
+and which of the heavy analytics modules ended up loaded.
+
+Usage (from the repository root):
+    python benchmarks/bench_startup.py [runs]
+"""
+import sys
+import json
+import subprocess
+from pathlib import Path
+from statistics import median
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import sys, json, time, resource
+sys.path[:0] = [{root!r}, {pycounter!r}]
+start = time.perf_counter()
+import ui.app
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'loaded': sorted(m for m in ('numpy', 'pandas', 'openpyxl', 'pyarrow', 'tinydb', 'webbrowser') if m in sys.modules),
+}}))
+"""
+
+
+def measure() -> dict:
+    probe = PROBE.format(root=str(ROOT), pycounter=str(ROOT.joinpath('pycounter')))
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True, cwd=ROOT)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int = 5):
+    samples = [measure() for _ in range(runs)]
+    print(f"import ui.app: {median(s['seconds'] for s in samples) * 1e3:.0f} ms (median of {runs})")
+    print(f"peak RSS:      {median(s['max_rss_kb'] for s in samples) / 1024:.1f} MB")
+    print(f"loaded:        {', '.join(samples[-1]['loaded']) or '-'}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
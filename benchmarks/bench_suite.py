@@ -0,0 +1,235 @@
+"""
+Benchmarks the data path of `Mind` on generated histories.
+
+Every scenario generates a history with `tests/fake_db.py` (days x distinct orders)
+and measures the wall time (best of `--repeat` runs) and the peak memory traced by
+tracemalloc (one extra run) of:
+
+    open                      Mind(config); timed on the new database (with the rollup build),
+                              the memory is traced on a second open
+    build_data(hours|perc)    the daily table
+    report(total|month)       the report file, not opened
+    get_activity_suggestions  the order names for the completer
+    update / push             one write of the current day, committed synchronously
+
+The results are written as JSON and compared against a baseline file, so changes
+to the storage layer can be measured instead of guessed.
+
+Usage (from the repository root):
+    python benchmarks/bench_suite.py                          # default grid
+    python benchmarks/bench_suite.py --days 1000 --orders 10 50 --backend tinydb sqlite columnar
+    python benchmarks/bench_suite.py --save-baseline          # store the results as baseline
+    python benchmarks/bench_suite.py --baseline benchmarks/baseline.json --threshold 0.2
+"""
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+from pathlib import Path
+from datetime import timedelta, datetime
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT.joinpath('pycounter'))]
+
+from tests.fake_db import generate_fake_db
+from pycounter.config import yaml_config_loader
+from core.db import Mind
+
+DEFAULT_DAYS = [1_000, 10_000, 100_000]
+DEFAULT_ORDERS = [10, 1_000, 10_000]
+DEFAULT_RESULTS = ROOT.joinpath('benchmarks', 'results.json')
+DEFAULT_BASELINE = ROOT.joinpath('benchmarks', 'baseline.json')
+
+
+def measure(function, repeat: int) -> dict:
+    """
+    Times a function (best of `repeat`) and traces its peak memory in one extra run.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': min(timings), 'peak_bytes': peak}
+
+
+def run_scenario(num_days: int, num_orders: int, backend: str, args: argparse.Namespace) -> dict:
+    """
+    Generates one history and measures all operations on it.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        config = yaml_config_loader(str(ROOT.joinpath('pycounter', 'config.yaml')))
+        config.mind.backend = backend
+        config.mind.background_writes = False    # time the commit, not the scheduling
+        config.mind.Database = str(Path(tmp).joinpath('bench').with_suffix(config.mind.suffix))
+
+        start = time.perf_counter()
+        generate_fake_db(
+            num_days, num_orders, config.mind.Database, config.mind.collection,
+            max_day_orders=args.day_orders, seed=args.seed
+        )
+        print(f"  generated in {time.perf_counter() - start:.1f} s", flush=True)
+
+        # the first open builds the rollups (and migrates into SQLite)
+        minds = []
+        results['open'] = measure(lambda: minds.append(Mind(config)), repeat=1)
+        for mind in minds[1:]:
+            mind.close()
+        mind = minds[0]
+        print(f"  {'open':<26} {describe(results['open'])}", flush=True)
+
+        try:
+            operations = {
+                'build_data(hours)': lambda: mind.build_data(format='hours'),
+                'build_data(perc)': lambda: mind.build_data(format='perc'),
+                'report(total)': lambda: mind.report(
+                    interval='total', file=str(Path(tmp).joinpath(f'total.{args.output}')), open_report=False
+                ),
+                'report(month)': lambda: mind.report(
+                    interval='month', file=str(Path(tmp).joinpath(f'month.{args.output}')), open_report=False
+                ),
+                'get_activity_suggestions': mind.get_activity_suggestions,
+                'update': lambda: mind.update(timedelta(hours=8)),
+                'push': push(mind),
+            }
+            if num_days * num_orders > args.max_report_cells:
+                # writing a workbook of this size takes minutes and gigabytes
+                del operations['report(total)']
+                results['report(total)'] = {'error': f'skipped, more than {args.max_report_cells:.0e} table cells'}
+                print(f"  {'report(total)':<26} {results['report(total)']['error']}")
+
+            for name, operation in operations.items():
+                try:
+                    results[name] = measure(operation, args.repeat)
+                except Exception as ex:     # e.g. more date columns than an Excel sheet holds
+                    results[name] = {'error': f'{type(ex).__name__}: {ex}'}
+                print(f"  {name:<26} {describe(results[name])}", flush=True)
+        finally:
+            mind.close()
+
+    return results
+
+
+def push(mind: Mind):
+    """
+    Returns a function that pushes a new duration of a booked order.
+    """
+    def run():
+        mind.start_order('benchmark', when=datetime.now() - timedelta(minutes=5))
+        mind.push()
+    return run
+
+
+def describe(result: dict) -> str:
+    if 'error' in result:
+        return result['error']
+    return f"{result['seconds'] * 1e3:>10.1f} ms {result['peak_bytes'] / 2 ** 20:>9.1f} MiB"
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Prints the change of every measurement against the baseline.
+
+    Returns:
+        list[str]: The measurements that got slower by more than `threshold` (relative).
+    """
+    regressions = []
+    print(f"\n{'scenario / operation':<52} {'baseline ms':>12} {'ms':>10} {'change':>8}")
+    for scenario, operations in results['scenarios'].items():
+        for name, result in operations.items():
+            reference = baseline.get('scenarios', {}).get(scenario, {}).get(name)
+            if not reference or 'error' in reference or 'error' in result:
+                continue
+            change = result['seconds'] / reference['seconds'] - 1 if reference['seconds'] else 0.0
+            flag = ''
+            if change > threshold:
+                flag = '  slower'
+                regressions.append(f'{scenario} {name}')
+            elif change < -threshold:
+                flag = '  faster'
+            print(
+                f"{scenario + ' ' + name:<52} {reference['seconds'] * 1e3:>12.1f} "
+                f"{result['seconds'] * 1e3:>10.1f} {change:>+8.0%}{flag}"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, nargs='+', default=DEFAULT_DAYS)
+    parser.add_argument('--orders', type=int, nargs='+', default=DEFAULT_ORDERS)
+    parser.add_argument('--backend', nargs='+', choices=('tinydb', 'sqlite', 'columnar'), default=['tinydb'])
+    parser.add_argument('--day-orders', type=int, default=20, help="orders booked on one day at most")
+    parser.add_argument('--max-cells', type=float, default=5e7,
+                        help="skip scenarios whose dense days x orders table has more cells")
+    parser.add_argument('--max-report-cells', type=float, default=2e6,
+                        help="skip the total report of scenarios whose table has more cells")
+    parser.add_argument('--output', choices=('xlsx', 'csv', 'parquet', 'jsonl'), default='xlsx')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--results', type=Path, default=DEFAULT_RESULTS)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="also write the results to the baseline")
+    parser.add_argument('--threshold', type=float, default=0.1, help="relative slowdown reported as regression")
+    args = parser.parse_args(argv)
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {key: vars(args)[key] for key in ('day_orders', 'output', 'repeat', 'seed', 'max_report_cells')},
+        'scenarios': {},
+        'skipped': {},
+    }
+
+    for backend in args.backend:
+        for num_days in args.days:
+            for num_orders in args.orders:
+                scenario = f'{backend} days={num_days} orders={num_orders}'
+                if num_days * num_orders > args.max_cells:
+                    results['skipped'][scenario] = f'more than {args.max_cells:.0e} table cells'
+                    print(f"{scenario}: skipped, {results['skipped'][scenario]}")
+                    continue
+                print(scenario, flush=True)
+                results['scenarios'][scenario] = run_scenario(num_days, num_orders, backend, args)
+
+    args.results.write_text(json.dumps(results, indent=2))
+    print(f"\nresults written to {args.results}")
+
+    regressions = []
+    if args.baseline.exists() and args.baseline != args.results:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} measurement(s) slower than the baseline by more than {args.threshold:.0%}")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"baseline written to {args.baseline}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,7 +2,8 @@ import sys
 import yaml
 import getpass
 from pydantic_settings import BaseSettings
-from typing import Dict, Optional
+from typing import Dict, List, Literal, Optional, Tuple
+from datetime import timedelta
 from pathlib import Path
 
 class WindowConfig(BaseSettings):
@@ -11,6 +12,16 @@ class WindowConfig(BaseSettings):
     """
     width: int = 450
     height: int = 200
+    hidden_tick_ms: int = 60_000  # Display updates while hidden in the tray, 0 = none
+
+
+class AlertLevel(BaseSettings):
+    """
+    A tray notification shown once the elapsed time of the day reaches `after`.
+    """
+    after: Dict[str, int]   # timedelta arguments, e.g. {'hours': 8, 'minutes': 30}
+    message: str
+    icon: Literal['NoIcon', 'Information', 'Warning', 'Critical'] = 'Information'
 
 
 class NotificationConfig(BaseSettings):
@@ -18,6 +29,7 @@ class NotificationConfig(BaseSettings):
     Configuration for notification timing levels.
     
     Each dictionary specifies a time duration (e.g., in hours) for a given level.
+    Any number of further notifications can be configured in `levels`.
     """
     information: Dict[str, int] = {
         'hours': 1
@@ -28,6 +40,35 @@ class NotificationConfig(BaseSettings):
     critical: Dict[str, int] = {
         'hours': 3
     }
+    levels: List[AlertLevel] = []
+
+    def schedule(self) -> List[Tuple[timedelta, str, str]]:
+        """
+        Returns all notifications as (elapsed time, message, icon), sorted by time.
+        """
+        levels = [
+            AlertLevel(after=self.information, message="Finish now!", icon='Information'),
+            AlertLevel(after=self.warning, message="Tomorrow is a new day!", icon='Warning'),
+            AlertLevel(after=self.critical, message="GO HOME NOW!", icon='Critical'),
+            *self.levels,
+        ]
+        return sorted(
+            ((timedelta(**level.after), level.message, level.icon) for level in levels),
+            key=lambda alert: alert[0]
+        )
+
+
+class CompleterConfig(BaseSettings):
+    """
+    Configuration of the project name completer.
+    """
+    max_results: int = 200  # Suggestions shown in the popup at most
+    debounce_ms: int = 60  # Delay of the filter update while typing in large lists
+    debounce_threshold: int = 250_000  # Lists with more names are filtered after the delay
+    recent_size: int = 50  # Recently pushed projects ranked first by frecency
+    frecency_half_life_days: float = 14  # Days after which a push counts half in the ranking
+    fuzzy: bool = False  # Also suggest projects that match apart from typos (loads numpy)
+    fuzzy_max_distance: int = 2  # Typos tolerated in queries of 6 or more characters
 
 
 class AssetConfig(BaseSettings):
@@ -101,6 +142,31 @@ class Data(BaseSettings):
     collection: str = 'herecomestheuser'  # Default collection/table name
     defaultorder: str = "1234"  # Default order ID (useful for debugging or pre-loads)
 
+    # 'tinydb' stores the days in a JSON document, 'sqlite' in an indexed SQLite database,
+    # 'columnar' in memory-mapped binary columns
+    backend: Literal['tinydb', 'sqlite', 'columnar'] = 'tinydb'
+
+    # 'json' rewrites the whole TinyDB file on each write, 'journal' appends changes
+    storage: Literal['json', 'journal'] = 'json'
+    journal_max_bytes: int = 1_000_000  # Journal size that triggers a compaction into the snapshot
+
+    @property
+    def suffix(self) -> str:
+        """
+        Returns the file extension of the database of the selected backend.
+        """
+        return {'sqlite': '.sqlite3', 'columnar': '.columns'}.get(self.backend, '.json')
+
+    # Processes sharing the database take the lock file `<database>.lock` for every write
+    lock_timeout_ms: int = 10_000  # Time to wait for another process to release the lock
+
+    background_writes: bool = True  # Commit writes on a background thread instead of the GUI thread
+    write_delay_ms: int = 250  # Writes within this window are merged into one commit
+
+    # The running timer is checkpointed to a small ring file next to the database
+    checkpoint_interval_ms: int = 10_000  # Time between checkpoints while the timer runs, 0 = only on actions
+    checkpoint_slots: int = 8  # Number of checkpoint records kept
+
 
 class AppConfig(BaseSettings):
     """
@@ -121,6 +187,7 @@ class AppConfig(BaseSettings):
     debug: bool = True
     window: WindowConfig = WindowConfig()
     notifications: NotificationConfig = NotificationConfig()
+    completer: CompleterConfig = CompleterConfig()
     assets: AssetConfig = AssetConfig()
     mind: Data = Data()
 
@@ -129,7 +196,7 @@ class AppConfig(BaseSettings):
         # set the app dir if required
         self.AppDir.mkdir(mode=0o777, parents=False, exist_ok=True)
         # set the mind database config depending on the app dir
-        self.mind.Database = str(self.AppDir.joinpath(self.mind.database).with_suffix('.json'))
+        self.mind.Database = str(self.AppDir.joinpath(self.mind.database).with_suffix(self.mind.suffix))
         # set the mind collection name
         if not self.debug:
             self.mind.collection = getpass.getuser()
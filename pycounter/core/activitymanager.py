@@ -1,97 +1,189 @@
-from PyQt5.QtCore import QTimer, QObject, pyqtSignal
-from datetime import timedelta, datetime
+import math
+import time
+import bisect
+from typing import Callable
+from PyQt5.QtCore import Qt, QTimer, QObject, pyqtSignal
+from datetime import timedelta
 from config import AppConfig
 
 class ActivityManager(QObject):
     """
     A class to manage the activity timer and alert system.
 
-    This class tracks the elapsed time for an activity, manages a timer that updates every second,
-    and provides alerts when the elapsed time exceeds certain thresholds.
+    The elapsed time is computed from `time.monotonic()` anchors rather than
+    accumulated per tick, so it is immune to wall clock changes (NTP, DST) and
+    exact whenever it is read. The timer only drives the display: it ticks on
+    every full elapsed second while the window is visible and every
+    `hidden_tick_ms` (or never) while it is hidden in the tray.
+
+    Alerts do not poll: the notification levels are parsed once into a schedule
+    sorted by elapsed time, and a single-shot timer is armed for the next one.
+    It is re-armed whenever the elapsed time or the running state changes.
     """
 
     config: AppConfig
 
-    # Flags to track the state of each alert (information, warning, critical)
-    information_shown = False
-    warning_shown = False
-    critical_shown = False
+    # Alert schedule (elapsed time, message, icon) and the number of alerts already shown
+    alerts: list[tuple[timedelta, str, str]]
+    alerts_shown: int = 0
 
-    # Timer instance and elapsed time tracking
+    # Timer instances and elapsed time tracking
     timer: QTimer
-    start_time: datetime = datetime.now()
-    total_elapsed: timedelta = timedelta(seconds=0)
-    last_update: datetime = datetime.now()
+    alert_timer: QTimer
     running: bool = False
+    visible: bool = True
 
     # Signal emitted on every timer tick to update elapsed time
     tick: pyqtSignal = pyqtSignal()
+    # Signal emitted with the message and icon name when an alert is due
+    alert: pyqtSignal = pyqtSignal(str, str)
+    # Signal emitted when the elapsed time is set or the timer starts, pauses or resets
+    changed: pyqtSignal = pyqtSignal()
 
-    def __init__(self, config: AppConfig, parent: QObject):
+    def __init__(self, config: AppConfig, parent: QObject, clock: Callable[[], float] = time.monotonic):
         """
         Initialize the ActivityManager instance.
 
         Args:
             config (AppConfig): The application configuration that contains notification thresholds.
             parent (QObject): The parent object for the timer.
+            clock (Callable): Monotonic clock in seconds, replaceable for tests.
         """
         super().__init__()
 
         self.config = config
+        self.clock = clock
 
-        # Initialize alert flags
-        self.information_shown = False
-        self.warning_shown = False
-        self.critical_shown = False
+        # Parse the alert levels once
+        self.alerts = config.notifications.schedule()
+        self.alerts_shown = 0
 
-        # Initialize elapsed time tracking
-        self.total_elapsed = timedelta(seconds=0)
-        self.start_time = datetime.now()
-        self.last_update = datetime.now()
+        # Elapsed time = time banked while paused + time since the clock anchor while running
+        self._banked = timedelta(seconds=0)
+        self._anchor: float | None = None
 
-        # Initialize and configure the timer
+        # Initialize and configure the timer, re-armed after every tick
         self.timer = QTimer(parent)
-        self.timer.setInterval(1_000)  # 1000 ms = 1 second
-        self.timer.timeout.connect(self.tick.emit)  # Emit signal every time the timer times out
-        self.tick.connect(self.update_time)  # Connect the tick signal to the update_time method
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._on_timeout)
+
+        # Single-shot timer for the next alert; precise, an alert is hours away
+        self.alert_timer = QTimer(parent)
+        self.alert_timer.setSingleShot(True)
+        self.alert_timer.setTimerType(Qt.PreciseTimer)  # type: ignore
+        self.alert_timer.timeout.connect(self._on_alert_timeout)
 
         self.running = False
+        self.visible = True
+
+    @property
+    def total_elapsed(self) -> timedelta:
+        """
+        The elapsed time, computed from the monotonic clock.
+        """
+        if self._anchor is None:
+            return self._banked
+        return self._banked + timedelta(seconds=self.clock() - self._anchor)
+
+    @total_elapsed.setter
+    def total_elapsed(self, value: timedelta):
+        self._banked = value
+        if self._anchor is not None:
+            self._anchor = self.clock()
+            self._arm()
+        self._arm_alert()
+        self.changed.emit()
 
     def update_time(self, delta: timedelta | None = None):
         """
-        Update the total elapsed time by calculating the difference
-        between the current time and the start time.
+        Adds a correction to the elapsed time, the running time itself is computed.
+
+        Args:
+            delta (timedelta | None): The time to add.
+        """
+        if delta:
+            self.total_elapsed = self.total_elapsed + delta
+
+    def _on_timeout(self):
+        self.tick.emit()
+        self._arm()
+
+    def _arm(self):
+        """
+        Schedules the next tick: at the next full elapsed second while visible,
+        after `hidden_tick_ms` (or not at all) while hidden.
         """
-        if not delta:
-            new_time = self.total_elapsed + (datetime.now() - self.last_update)
+        if not self.running:
+            return
+        if self.visible:
+            milliseconds = self.total_elapsed / timedelta(milliseconds=1)
+            self.timer.start(1_000 - int(milliseconds % 1_000))
+        elif self.config.window.hidden_tick_ms > 0:
+            self.timer.start(self.config.window.hidden_tick_ms)
         else:
-            new_time = self.total_elapsed + delta 
-        self.total_elapsed = new_time
-        self.last_update = datetime.now()
-    
+            self.timer.stop()
+
+    def _arm_alert(self):
+        """
+        Arms the alert timer for the next alert that was not shown yet.
+        """
+        if not self.running or self.alerts_shown >= len(self.alerts):
+            self.alert_timer.stop()
+            return
+        remaining = self.alerts[self.alerts_shown][0] - self.total_elapsed
+        self.alert_timer.start(max(0, math.ceil(remaining / timedelta(milliseconds=1))))
+
+    def _on_alert_timeout(self):
+        due = self.check_for_alerts()
+        if due:
+            self.alert.emit(*due)
+        self._arm_alert()
+
+    def set_visible(self, visible: bool):
+        """
+        Adapts the tick rate to the visibility of the window.
+
+        On show, a tick is emitted right away, the display catches up exactly
+        because the elapsed time is computed.
+
+        Args:
+            visible (bool): Whether the window is shown.
+        """
+        if visible == self.visible:
+            return
+        self.visible = visible
+        if self.running:
+            if visible:
+                self.tick.emit()
+            self._arm()
+
     def start_timer(self):
         """
         Start the timer if it is not already running.
-        Resets the start time and begins updating the elapsed time every second.
+        Anchors the elapsed time to the monotonic clock and starts ticking.
         """
         if not self.running:
-            self.start_time = datetime.now() - self.total_elapsed  # Adjust the start time based on any previous elapsed time
-            self.timer.start(1_000)  # Start the timer with 1-second interval
+            self._anchor = self.clock()
             self.running = True
+            self._arm()
+            self._arm_alert()
+            self.changed.emit()
     
     def toggle_play_pause(self):
         """
         Toggle the timer between playing and pausing states.
 
-        When paused, it stops the timer and keeps track of the elapsed time.
+        When paused, it stops the timer and banks the elapsed time.
         When resumed, it restarts the timer from the paused state.
         """
         if self.running:
             # Pause the timer
             self.timer.stop()
-            self.total_elapsed = datetime.now() - self.start_time  # Store the elapsed time at pause
-            self.start_time = None # type: ignore
+            self._banked = self.total_elapsed  # Store the elapsed time at pause
+            self._anchor = None
             self.running = not self.running
+            self.alert_timer.stop()
+            self.changed.emit()
         else:
             # Resume the timer
             self.start_timer()
@@ -103,37 +195,31 @@ class ActivityManager(QObject):
         Stops the timer, resets the elapsed time, and clears all alert flags.
         """
         self.timer.stop()
-        self.start_time = None # type: ignore
-        self.total_elapsed = timedelta()
+        self.alert_timer.stop()
+        self._anchor = None
+        self._banked = timedelta()
 
         self.running = False
-        # Reset all alert flags
-        self.information_shown = False
-        self.warning_shown = False
-        self.critical_shown = False
+        # Show all alerts again
+        self.alerts_shown = 0
+        self.changed.emit()
 
-    def check_for_alerts(self):
+    def check_for_alerts(self) -> tuple[str, str] | None:
         """
-        Check if the elapsed time has reached any configured alert thresholds.
+        Check if the elapsed time has reached the next alert threshold.
+
+        If several thresholds were passed at once (e.g. by a quick action), only
+        the latest of them is returned, the earlier ones count as shown.
 
         Returns:
-            tuple: A tuple containing the alert message and the alert type
-                   (information, warning, or critical) if an alert should be shown.
+            tuple: A tuple containing the alert message and the icon name
+                   (e.g. Information, Warning or Critical) if an alert should be shown.
                    None if no alert is triggered.
         """
-        # Check if elapsed time has exceeded the information threshold
-        if self.total_elapsed >= timedelta(**self.config.notifications.information) and not self.information_shown:
-            self.information_shown = True
-            return ("Finish now!", 'Information')
-
-        # Check if elapsed time has exceeded the warning threshold
-        if self.total_elapsed >= timedelta(**self.config.notifications.warning) and not self.warning_shown:
-            self.warning_shown = True
-            return ("Tomorrow is a new day!", 'Warning')
-
-        # Check if elapsed time has exceeded the critical threshold
-        if self.total_elapsed >= timedelta(**self.config.notifications.critical) and not self.critical_shown:
-            self.critical_shown = True
-            return ("GO HOME NOW!", 'Critical')
-
-        return None  # No alert if none of the thresholds are exceeded
+        elapsed = self.total_elapsed
+        due = bisect.bisect_right(self.alerts, elapsed, key=lambda alert: alert[0])
+        if due <= self.alerts_shown:
+            return None  # No alert if no further threshold is exceeded
+        self.alerts_shown = due
+        _, message, icon = self.alerts[due - 1]
+        return (message, icon)
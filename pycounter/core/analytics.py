@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+from typing import Iterable, Literal
+
+from core.store import Cell, CellColumns, TOTAL_ROW
+from core.export import day_summary, report_values, total_values
+
+
+def build_matrix(
+        cells: Iterable[Cell],
+        default_order: str,
+        format: Literal['hours', 'perc'] = 'hours'
+) -> tuple[np.ndarray, list[str], list[str]]:
+    """
+    Builds the order x day matrix of a report in a single pass over the cells.
+
+    Day ids and order names are dictionary-encoded into integer indices while the
+    cells are read, all conversions (hours/percent, rounding, default order fill)
+    are then done on whole arrays.
+
+    Args:
+        cells (Iterable[Cell]): The (day, order, seconds) cells as returned by `DayStore.iter_cells`.
+        default_order (str): Name of the row that receives the time not booked on any order.
+        format (str): Either 'hours' to show hours worked or 'perc' to show % per order.
+
+    Returns:
+        tuple: The matrix, the row names (orders, default order, total) and the day ids
+               of the columns in chronological order.
+    """
+    if isinstance(cells, CellColumns):
+        return _column_matrix(cells, default_order, format)
+
+    day_codes: dict[str, int] = {}
+    order_codes: dict[str, int] = {}
+    elapsed: dict[int, float] = {}
+    cell_days: list[int] = []
+    cell_orders: list[int] = []
+    cell_seconds: list[float] = []
+
+    # dictionary-encode days and orders
+    for day, order, seconds in cells:
+        day_code = day_codes.setdefault(day, len(day_codes))
+        if order is None:
+            elapsed[day_code] = seconds
+        else:
+            cell_days.append(day_code)
+            cell_orders.append(order_codes.setdefault(order, len(order_codes)))
+            cell_seconds.append(seconds)
+
+    # sort rows by name and columns by date by re-mapping the codes
+    days = sorted(day_codes)
+    orders = sorted(order_codes)
+    day_rank = np.empty(len(days), dtype=np.intp)
+    day_rank[[day_codes[day] for day in days]] = np.arange(len(days))
+    order_rank = np.empty(len(orders), dtype=np.intp)
+    order_rank[[order_codes[order] for order in orders]] = np.arange(len(orders))
+
+    columns = day_rank[np.asarray(cell_days, dtype=np.intp)]
+    rows = order_rank[np.asarray(cell_orders, dtype=np.intp)]
+    seconds = np.asarray(cell_seconds, dtype=np.float64)
+
+    day_elapsed = np.zeros(len(days))
+    day_elapsed[day_rank[list(elapsed.keys())]] = list(elapsed.values())
+
+    return _fill_matrix(columns, rows, seconds, day_elapsed, days, orders, default_order, format)
+
+
+def _column_matrix(
+        cells: CellColumns,
+        default_order: str,
+        format: Literal['hours', 'perc']
+) -> tuple[np.ndarray, list[str], list[str]]:
+    """
+    `build_matrix` for cells that are already dictionary-encoded arrays.
+
+    The days are sorted already, only the orders that occur are ranked by name.
+    """
+    is_total = cells.order < 0
+    used = np.unique(cells.order[~is_total])
+    names = [cells.orders[order] for order in used.tolist()]
+    by_name = np.argsort(np.array(names, dtype=object), kind='stable') if names else np.zeros(0, dtype=np.intp)
+    order_rank = np.zeros(len(cells.orders), dtype=np.intp)
+    order_rank[used[by_name]] = np.arange(len(used))
+
+    day_elapsed = np.zeros(len(cells.days))
+    day_elapsed[cells.day[is_total]] = cells.seconds[is_total]
+
+    columns = np.asarray(cells.day[~is_total], dtype=np.intp)
+    rows = order_rank[cells.order[~is_total]]
+    seconds = np.asarray(cells.seconds[~is_total], dtype=np.float64)
+    orders = [names[index] for index in by_name.tolist()]
+    return _fill_matrix(columns, rows, seconds, day_elapsed, list(cells.days), orders, default_order, format)
+
+
+def _fill_matrix(
+        columns: np.ndarray,
+        rows: np.ndarray,
+        seconds: np.ndarray,
+        day_elapsed: np.ndarray,
+        days: list[str],
+        orders: list[str],
+        default_order: str,
+        format: Literal['hours', 'perc']
+) -> tuple[np.ndarray, list[str], list[str]]:
+    """
+    Converts the encoded cells (column, row, seconds) and day totals into the report matrix.
+
+    The default order and total rows are derived as in the long layout, see `core.export.day_summary`.
+    """
+    default, total = day_summary(day_elapsed, np.bincount(columns, weights=seconds, minlength=len(days)))
+
+    data = np.zeros((len(orders) + 2, len(days)))
+    data[rows, columns] = report_values(seconds, total[columns], format)
+    data[-2] = report_values(default, total, format)
+    data[-1] = total_values(total)
+
+    return data, orders + [default_order, TOTAL_ROW], days
+
+
+def days_frame(
+        cells: Iterable[Cell],
+        default_order: str,
+        format: Literal['hours', 'perc'] = 'hours',
+        day_format: str = '%Y%m%d'
+) -> pd.DataFrame:
+    """
+    Builds the daily report table from the store cells.
+
+    Args:
+        cells (Iterable[Cell]): The (day, order, seconds) cells as returned by `DayStore.iter_cells`.
+        default_order (str): Name of the row that receives the time not booked on any order.
+        format (str): Either 'hours' to show hours worked or 'perc' to show % per order.
+        day_format (str): Format of the day ids.
+
+    Returns:
+        pd.DataFrame: A table where columns are dates (sorted) and rows are order names and total elapsed.
+    """
+    data, rows, columns = build_matrix(cells, default_order, format=format)
+
+    # format columns for printing
+    formatted_columns = pd.to_datetime(columns, format=day_format).strftime('%d-%m-%Y')
+
+    return pd.DataFrame(data=data, columns=formatted_columns, index=rows)
+
+
+def months_frame(months: list[str], rollups: list[dict]) -> pd.DataFrame:
+    """
+    Builds the monthly summary table from month rollups.
+
+    Args:
+        months (list[str]): The months (YYYYMM) of the columns.
+        rollups (list[dict]): The rollup of each month, see `Rollups`.
+
+    Returns:
+        pd.DataFrame: A table where columns are months and rows are the hours per order,
+                      the total hours and the number of days worked.
+    """
+    orders = sorted({order for rollup in rollups for order in rollup['orders']})
+    rows = [[rollup['orders'].get(order, 0.0) / (60 * 60) for rollup in rollups] for order in orders]
+    rows.append([rollup['seconds'] / (60 * 60) for rollup in rollups])
+    rows.append([rollup['days'] for rollup in rollups])
+
+    data = pd.DataFrame(
+        data=rows,
+        index=orders + [TOTAL_ROW, 'days worked'],
+        columns=pd.to_datetime(months, format='%Y%m').strftime('%m-%Y'),
+        dtype=float
+    )
+    return data.round(1)
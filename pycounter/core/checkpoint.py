@@ -0,0 +1,265 @@
+import os
+import zlib
+import struct
+from pathlib import Path
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Callable
+
+from PyQt5.QtCore import QObject, QTimer
+
+from core.log import logger
+from core.filelock import FileLock
+
+MAGIC = b'PCCP'
+VERSION = 2
+
+# magic, version, flags, length of the order name, sequence number, time of the write (epoch ms),
+# day id, elapsed time of the day (ms), start of the recorded order (epoch ms),
+# interval log session of the writer, order name
+_RECORD = struct.Struct('<4sBBHQq8sqqH202s')
+# the record is followed by the CRC32 of its bytes, 256 bytes in total
+_CRC = struct.Struct('<I')
+RECORD_SIZE = _RECORD.size + _CRC.size
+
+_RUNNING = 1
+_RECORDING = 2
+_CLEAN = 4
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """
+    The state of the running timer at one point in time.
+    """
+    day: str                              # Day id (YYYYMMDD) the elapsed time belongs to
+    elapsed: timedelta                    # Elapsed time of the day
+    running: bool = False                 # Whether the timer was running
+    order: str = ''                       # The order being recorded, empty if none
+    order_start: datetime | None = None   # When the recording of the order started
+    session: int = 0                      # Interval log session of the app that wrote it
+    clean: bool = False                   # The app exited normally or the state was recovered
+    written: datetime | None = None       # Set when the checkpoint is stored
+    seq: int = 0                          # Set when the checkpoint is stored
+
+    @property
+    def order_elapsed(self) -> timedelta:
+        """
+        The time recorded on the order up to the checkpoint.
+        """
+        if not self.order or self.order_start is None or self.written is None:
+            return timedelta()
+        return max(self.written - self.order_start, timedelta())
+
+    def same_state(self, other: 'Checkpoint | None') -> bool:
+        """
+        Returns True if `other` describes the same state, ignoring when it was written.
+        """
+        return other is not None and replace(self, written=None, seq=0) == replace(other, written=None, seq=0)
+
+
+class CheckpointRing:
+    """
+    A fixed-size file of checkpoint records, written round robin.
+
+    The file holds `slots` records of 256 bytes. Every write goes to the slot after
+    the newest one and is synced to disk, so it costs one small write regardless of
+    the size of the database. Each record carries a sequence number and a CRC32: a
+    record torn by a crash fails the check and `latest()` falls back to the newest
+    intact one.
+
+    `mark_clean()` stores a clean copy of the newest record when the app exits
+    normally and after a recovery, so a state is never recovered twice.
+
+    The ring belongs to the session that opened it first: it holds the lock file
+    `<ring>.lock` until `close()`, the operating system releases it when the app
+    dies. A ring opened while another live session owns it is not `owned`, it
+    offers nothing to recover and ignores writes.
+    """
+
+    def __init__(self, path: str | Path, slots: int = 8):
+        """
+        Opens (or creates) the checkpoint file.
+
+        Args:
+            path (str | Path): Path of the checkpoint file.
+            slots (int): Number of records kept.
+        """
+        self.path = Path(path)
+        self.slots = slots
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._owner = FileLock(self.path.with_name(f'{self.path.name}.lock'), timeout=0)
+        try:
+            self._owner.acquire()
+            self.owned = True
+        except TimeoutError:
+            self.owned = False
+        self._file = self.path.open('r+b' if self.path.exists() else 'w+b')
+        latest = self.latest()
+        self._seq = latest.seq if latest else 0
+
+    def read(self) -> list[Checkpoint]:
+        """
+        Returns all intact records, the oldest first.
+        """
+        self._file.seek(0)
+        data = self._file.read(self.slots * RECORD_SIZE)
+        checkpoints = []
+        for offset in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+            checkpoint = _unpack(data[offset:offset + RECORD_SIZE])
+            if checkpoint:
+                checkpoints.append(checkpoint)
+        return sorted(checkpoints, key=lambda checkpoint: checkpoint.seq)
+
+    def latest(self) -> Checkpoint | None:
+        """
+        Returns the newest intact record, None if there is none.
+        """
+        checkpoints = self.read()
+        return checkpoints[-1] if checkpoints else None
+
+    def unrecovered(self) -> Checkpoint | None:
+        """
+        Returns the newest record if it still needs a recovery: it is not clean and
+        the session that wrote it is gone.
+        """
+        latest = self.latest() if self.owned else None
+        return latest if latest and not latest.clean else None
+
+    def write(self, checkpoint: Checkpoint, when: datetime | None = None) -> Checkpoint:
+        """
+        Stores a checkpoint in the next slot and syncs it to disk.
+
+        Order names longer than 202 bytes (UTF-8) are truncated.
+
+        Args:
+            checkpoint (Checkpoint): The state to store.
+            when (datetime | None): Time of the write, now if None.
+
+        Returns:
+            Checkpoint: The stored checkpoint with its sequence number and time,
+                        unchanged if the ring is not owned.
+        """
+        if not self.owned:
+            return checkpoint
+        self._seq += 1
+        checkpoint = replace(checkpoint, written=when or datetime.now(), seq=self._seq)
+        self._file.seek((self._seq % self.slots) * RECORD_SIZE)
+        self._file.write(_pack(checkpoint))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return checkpoint
+
+    def mark_clean(self, when: datetime | None = None):
+        """
+        Marks the newest state as one that needs no recovery.
+
+        Args:
+            when (datetime | None): Time of the write, now if None.
+        """
+        latest = self.latest()
+        if latest and not latest.clean:
+            self.write(replace(latest, clean=True), when)
+
+    def close(self):
+        self._file.close()
+        if self.owned:
+            self._owner.release()
+        self._owner.close()
+
+
+def ring_path(database: str | Path, collection: str) -> Path:
+    """
+    Returns the checkpoint file of a collection, next to the database like its interval log.
+    """
+    return Path(database).with_suffix(f'.{collection}.checkpoint')
+
+
+def _milliseconds(value: datetime | None) -> int:
+    return round(value.timestamp() * 1_000) if value else 0
+
+
+def _pack(checkpoint: Checkpoint) -> bytes:
+    name = checkpoint.order.encode('utf-8')[:202].decode('utf-8', 'ignore').encode('utf-8')
+    flags = ((_RUNNING if checkpoint.running else 0) | (_RECORDING if checkpoint.order else 0)
+             | (_CLEAN if checkpoint.clean else 0))
+    record = _RECORD.pack(
+        MAGIC, VERSION, flags, len(name), checkpoint.seq, _milliseconds(checkpoint.written),
+        checkpoint.day.encode('ascii'), round(checkpoint.elapsed / timedelta(milliseconds=1)),
+        _milliseconds(checkpoint.order_start), checkpoint.session, name
+    )
+    return record + _CRC.pack(zlib.crc32(record))
+
+
+def _unpack(data: bytes) -> Checkpoint | None:
+    record = data[:_RECORD.size]
+    if _CRC.unpack(data[_RECORD.size:])[0] != zlib.crc32(record):
+        return None
+    magic, version, flags, length, seq, written, day, elapsed, order_start, session, name = _RECORD.unpack(record)
+    if magic != MAGIC or version != VERSION:
+        return None
+    recording = bool(flags & _RECORDING)
+    return Checkpoint(
+        day=day.decode('ascii'),
+        elapsed=timedelta(milliseconds=elapsed),
+        running=bool(flags & _RUNNING),
+        order=name[:length].decode('utf-8') if recording else '',
+        order_start=datetime.fromtimestamp(order_start / 1_000) if recording else None,
+        session=session,
+        clean=bool(flags & _CLEAN),
+        written=datetime.fromtimestamp(written / 1_000),
+        seq=seq,
+    )
+
+
+class Checkpointer(QObject):
+    """
+    Writes the state of the timer to a `CheckpointRing` every `interval_ms`,
+    skipping writes while nothing changed (e.g. while paused).
+
+    `write()` can also be connected to user actions (pause, push, ...), so the
+    checkpoint never lags behind what was written to the database.
+    """
+
+    def __init__(self, ring: CheckpointRing, state: Callable[[], Checkpoint], interval_ms: int, parent: QObject):
+        """
+        Args:
+            ring (CheckpointRing): Where the checkpoints are stored.
+            state (Callable): Returns the current state of the timer.
+            interval_ms (int): Time between periodic checkpoints, 0 disables them.
+            parent (QObject): The parent object for the timer.
+        """
+        super().__init__(parent)
+        self.ring = ring
+        self.state = state
+        self.writes = 0
+        self._last: Checkpoint | None = None
+
+        self.timer = QTimer(parent)
+        self.timer.timeout.connect(self.write)
+        if interval_ms > 0:
+            self.timer.start(interval_ms)
+
+    def write(self):
+        """
+        Stores the current state unless it equals the last checkpoint.
+        """
+        checkpoint = self.state()
+        if checkpoint.same_state(self._last):
+            return
+        try:
+            self._last = self.ring.write(checkpoint)
+            self.writes += 1
+        except OSError:
+            logger.exception("Failed to write a checkpoint!")
+
+    def close(self):
+        """
+        Stops the periodic checkpoints, marks the last one clean and closes the file.
+        """
+        self.timer.stop()
+        try:
+            self.ring.mark_clean()
+        except OSError:
+            logger.exception("Failed to write a checkpoint!")
+        self.ring.close()
@@ -0,0 +1,243 @@
+import os
+import copy
+import json
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from config import AppConfig
+from core.store import Cell, CellColumns, DayStore, encode_day, read_tinydb_days
+
+# One cell: day (proleptic ordinal), order id (-1 for the day total), milliseconds
+CELL = np.dtype([('day', '<i4'), ('order', '<i4'), ('ms', '<i4')])
+
+
+def _ordinal(day: str) -> int:
+    return date(int(day[:4]), int(day[4:6]), int(day[6:8])).toordinal()
+
+
+class ColumnStore(DayStore):
+    """
+    Stores the days of a collection as fixed-width binary columns.
+
+    The database is a directory with three files per collection:
+    - `<collection>.cells`: the cells as packed `(int32 day ordinal, int32 order id,
+      int32 milliseconds)` records sorted by day, the day total first (order id -1)
+    - `<collection>.orders`: the order dictionary, one JSON string per line, the line
+      number is the order id
+    - `<collection>.meta.json`: the meta records (rollups, suggestions)
+
+    The cells are read through `numpy.memmap`, so opening the store parses nothing
+    and only the pages of the days that are accessed become resident. Lookups and
+    range queries bisect the sorted day column, and `cells()` hands the columns to
+    the analytics without building a tuple per cell.
+
+    Every write replaces the cells file atomically (a temporary file renamed over
+    it), so a crash leaves the previous or the new version and a reader that mapped
+    the file keeps a consistent snapshot while it is written.
+    """
+
+    def __init__(self, config: AppConfig):
+        """
+        Opens (or creates) the columnar database configured in `config.mind`.
+
+        If the database does not exist yet but a TinyDB file with the same name
+        does, its collection is migrated first.
+
+        Args:
+            config (AppConfig): Application configuration with DB details.
+        """
+        self.config = config
+        self.path = Path(config.mind.Database)
+        self.collection = config.mind.collection
+        self.cells_path = self.path.joinpath(f'{self.collection}.cells')
+        self.orders_path = self.path.joinpath(f'{self.collection}.orders')
+        self.meta_path = self.path.joinpath(f'{self.collection}.meta.json')
+
+        legacy = self.path.with_suffix('.json')
+        is_new = not self.cells_path.exists()
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.names: list[str] = []
+        if self.orders_path.exists():
+            with self.orders_path.open('r', encoding='utf-8') as file:
+                self.names = [json.loads(line) for line in file if line.endswith('\n')]
+        self.ids = {name: index for index, name in enumerate(self.names)}
+        self._orders_file = self.orders_path.open('a', encoding='utf-8')
+
+        self.meta: dict = {}
+        if self.meta_path.exists():
+            self.meta = json.loads(self.meta_path.read_text(encoding='utf-8'))
+        self._meta_dirty = False
+        self._depth = 0  # Nesting level of open transactions
+
+        self.cells_path.touch()
+        self._day_ids: dict[int, str] = {}
+        self._map()
+
+        if is_new and legacy.exists():
+            documents = read_tinydb_days(legacy).get(self.collection, [])
+            self._rewrite([encode_day(document, self.order_id) for document in documents])
+
+    def _map(self):
+        """
+        Maps the cells file, to be called after every change of the file.
+        """
+        if self.cells_path.stat().st_size:
+            self._cells = np.memmap(self.cells_path, dtype=CELL, mode='r')
+        else:
+            self._cells = np.zeros(0, dtype=CELL)
+
+    def _range(self, start: str | None, end: str | None) -> tuple[int, int]:
+        """
+        Returns the record range of the days between `start` and `end`.
+        """
+        days = self._cells['day']
+        lower = int(np.searchsorted(days, _ordinal(start), 'left')) if start else 0
+        upper = int(np.searchsorted(days, _ordinal(end), 'right')) if end else len(days)
+        return lower, upper
+
+    def _day_id(self, ordinal: int) -> str:
+        if ordinal not in self._day_ids:
+            self._day_ids[ordinal] = date.fromordinal(ordinal).strftime('%Y%m%d')
+        return self._day_ids[ordinal]
+
+    def order_id(self, name: str) -> int:
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+            self._orders_file.write(json.dumps(name) + '\n')
+            self._orders_file.flush()
+        return self.ids[name]
+
+    def order_name(self, order_id: int) -> str:
+        return self.names[order_id]
+
+    def _records(self, document: dict) -> np.ndarray:
+        """
+        Encodes a day document as cell records, the orders sorted by id.
+        """
+        orders = sorted(document.get('orders', {}).items())
+        records = np.zeros(len(orders) + 1, dtype=CELL)
+        records['day'] = _ordinal(document['day'])
+        records['order'][0] = -1
+        records['ms'][0] = document.get('elapsed', 0)
+        if orders:
+            records['order'][1:], records['ms'][1:] = zip(*orders)
+        return records
+
+    def get_day(self, day: str) -> dict | None:
+        lower, upper = self._range(day, day)
+        if lower == upper:
+            return None
+        records = np.array(self._cells[lower:upper])
+        document: dict = {'day': day, 'elapsed': 0}
+        orders = {}
+        for order, ms in zip(records['order'].tolist(), records['ms'].tolist()):
+            if order < 0:
+                document['elapsed'] = ms
+            else:
+                orders[order] = ms
+        if orders:
+            document['orders'] = orders
+        return document
+
+    def put_day(self, document: dict):
+        records = self._records(document)
+        lower, upper = self._range(document['day'], document['day'])
+        self._write_all(np.concatenate([self._cells[:lower], records, self._cells[upper:]]))
+
+    def _write_all(self, cells: np.ndarray):
+        """
+        Replaces the cells file atomically.
+        """
+        cells = np.array(cells)                 # copy out of the mapping before it is released
+        self._cells = np.zeros(0, dtype=CELL)
+        tmp_path = self.cells_path.with_suffix('.cells.tmp')
+        with tmp_path.open('wb') as file:
+            file.write(cells.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.cells_path)
+        self._map()
+
+    def _rewrite(self, documents: list[dict]):
+        """
+        Replaces all days by the given documents.
+        """
+        documents = sorted(documents, key=lambda document: document['day'])
+        records = [self._records(document) for document in documents]
+        self._write_all(np.concatenate(records) if records else np.zeros(0, dtype=CELL))
+
+    def order_names(self) -> set[str]:
+        ids = np.unique(self._cells['order'])
+        return {self.names[order] for order in ids.tolist() if order >= 0}
+
+    def iter_cells(self, start: str | None = None, end: str | None = None) -> Iterator[Cell]:
+        lower, upper = self._range(start, end)
+        # copied, so the generator does not hold the mapping while the file changes
+        records = np.array(self._cells[lower:upper])
+        names = self.names
+        for day, order, ms in zip(records['day'].tolist(), records['order'].tolist(), records['ms'].tolist()):
+            yield self._day_id(day), names[order] if order >= 0 else None, ms / 1_000
+
+    def cells(self, start: str | None = None, end: str | None = None) -> CellColumns:
+        lower, upper = self._range(start, end)
+        records = self._cells[lower:upper]
+        days, day_index = np.unique(records['day'], return_inverse=True)
+        return CellColumns(
+            days=[self._day_id(day) for day in days.tolist()],
+            orders=list(self.names),
+            day=day_index,
+            order=np.array(records['order']),
+            seconds=records['ms'] / 1_000,
+        )
+
+    @contextmanager
+    def transaction(self):
+        # the cells are written right away, the meta records at the end of the outermost transaction
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self._save_meta()
+
+    def iter_meta(self, prefix: str) -> Iterator[tuple[str, object]]:
+        for key in sorted(key for key in self.meta if key.startswith(prefix)):
+            yield key, copy.deepcopy(self.meta[key])
+
+    def get_meta(self, key: str):
+        return copy.deepcopy(self.meta.get(key))
+
+    def put_meta(self, key: str, value):
+        self.meta[key] = json.loads(json.dumps(value))
+        self._meta_dirty = True
+        if not self._depth:
+            self._save_meta()
+
+    def _save_meta(self):
+        """
+        Writes the meta records atomically if they changed.
+        """
+        if not self._meta_dirty:
+            return
+        tmp_path = self.meta_path.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps(self.meta), encoding='utf-8')
+        os.replace(tmp_path, self.meta_path)
+        self._meta_dirty = False
+
+    def reload(self):
+        self._orders_file.close()
+        self._cells = np.zeros(0, dtype=CELL)
+        self.__init__(self.config)
+
+    def close(self):
+        self._save_meta()
+        self._orders_file.close()
+        self._cells = np.zeros(0, dtype=CELL)
+
@@ -1,16 +1,26 @@
-import json
-import numpy as np
-import pandas as pd
-import tempfile
-import webbrowser
-from typing import Literal
+import copy
+import threading
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
 from datetime import timedelta, date, datetime
-from tinydb import TinyDB, Query
-from tinydb.storages import JSONStorage
-from tinydb_serialization import SerializationMiddleware
-from tinydb_serialization.serializers import DateTimeSerializer
 
 from config import AppConfig
+from core.store import Cell, DayStore, open_store, decode_day, to_ms
+from core.report import Layout, Output, ReportSnapshot, write_report, open_file
+from core.rollup import Rollups
+from core.suggestions import SuggestionIndex
+from core.writer import PersistenceWorker
+from core.filelock import FileLock
+from core.intervals import IntervalLog, day_parts, TIMER_START, TIMER_STOP, ORDER_START, ORDER_PUSH
+
+if TYPE_CHECKING:
+    # numpy/pandas are only imported when a report or table is built
+    import pandas as pd
+    from core.checkpoint import Checkpoint
+
+# Key of the interval log writes on the persistence worker, the day writes use the day ids
+INTERVALS_JOB = 'intervals'
 
 
 class Mind:
@@ -18,10 +28,29 @@ class Mind:
     A class to track daily activities and order-specific work durations.
 
     This class stores per-day total work time and tracks how much time is spent on each order,
-    storing all data in a local TinyDB database.
+    storing all data through the storage backend selected in the config (TinyDB, SQLite or columnar).
+    Every start and stop of the timer and of an order is also appended to the interval log.
+
+    The day documents are kept as stored: order ids of the store's dictionary and
+    integer milliseconds. Order names and seconds are only converted back for the
+    callers (`get_current_activity`, reports).
+
+    Several processes may use the same database (e.g. two instances, or a report
+    script next to the app). Every write takes the lock file `<database>.lock`,
+    reloads the store if another process wrote since, and applies the changes of
+    this process (the elapsed time set, the time added to orders) to the fresh
+    documents, so no process overwrites the updates of another one. Reads work on
+    a copy taken after such a reload and never hold the lock.
+
+    Within the process, `_store_lock` serializes the store I/O and `_lock` guards
+    the state in memory (the pending changes, the cached days, the suggestions).
+    The locks are taken in the order `_store_lock`, file lock, `_lock`, and `_lock`
+    is never held across I/O, so the GUI is not blocked by a write in progress.
     """
 
     config: AppConfig
+    store: DayStore
+    intervals: IntervalLog
     day_format: str = '%Y%m%d'  # Format for storing the day as YYYYMMDD
     current_order: str = ""  # Tracks the current active order
     order_start_time: datetime = datetime.now()  # The timestamp when the current order starts
@@ -39,45 +68,301 @@ class Mind:
     def __init__(self, config: AppConfig):
         """
         Initialize the Mind instance with a given AppConfig.
-        Sets up the TinyDB with datetime serialization.
+        Opens the configured storage backend and starts the persistence worker.
 
         Args:
             config (AppConfig): Application configuration with DB details.
         """
         self.config = config
-        # Setup serialization middleware for TinyDB to handle datetime serialization
-        serialization = SerializationMiddleware()
-        serialization.register_serializer(DateTimeSerializer(), 'TinyDate')
+        database = Path(self.config.mind.Database)
+
+        # Serializes the writes of all processes using the database
+        self.file_lock = FileLock(database.with_suffix('.lock'), timeout=self.config.mind.lock_timeout_ms / 1_000)
+
+        with self.file_lock:
+            self.store = open_store(self.config)
+
+            # Month and order totals, built once from the raw days if the store has none yet
+            self.rollups = Rollups(self.store)
+            if not self.rollups.exists():
+                with self.store.transaction():
+                    self.rollups.rebuild(self.store.iter_cells())
+
+            # Sorted order names of the completer, built once from the order rollup
+            self.suggestions = SuggestionIndex(
+                self.store,
+                recent_size=self.config.completer.recent_size,
+                half_life=self.config.completer.frecency_half_life_days * 24 * 60 * 60
+            )
+            if not self.suggestions.exists():
+                with self.store.transaction():
+                    self.suggestions.rebuild(self.rollups.orders())
+            # loaded now, so the GUI thread never reads the store for a completion
+            self.suggestions.names()
+
+            # Append-only log of the timer and order events of the collection next to the database
+            self.intervals = IntervalLog(database.with_suffix(f'.{self.config.mind.collection}.intervals'))
+
+            # Generation of the database this process has read (see `FileLock`)
+            self._generation = self.file_lock.bump()
+
+        self._timer_running = False
+
+        # Stored documents of the days used in this session (day id -> document or None)
+        self.days: dict[str, dict | None] = {}
+        # Changes not written yet (day id -> {'elapsed': ms, 'orders': {order name: ms to add}})
+        self._pending: dict[str, dict] = {}
+        # Interval log events not appended yet, in order: (kind, time, order name)
+        self._events: deque[tuple[int, datetime, str | None]] = deque()
+
+        # Writes are committed by a background thread, see the class docstring for the locks
+        self._store_lock = threading.RLock()
+        self._lock = threading.RLock()
+        self.writer = None
+        if self.config.mind.background_writes:
+            self.writer = PersistenceWorker(delay=self.config.mind.write_delay_ms / 1_000)
+            self.writer.start()
+
+    def _sync(self):
+        """
+        Reloads the store if another process wrote to the database since this one
+        last read it. Requires the store lock and the file lock.
+        """
+        generation = self.file_lock.generation()
+        if generation == self._generation:
+            return
+        self.store.reload()
+        self.rollups = Rollups(self.store)
+        records = self.suggestions.read()
+        # the cached days are only added under the store lock, which is held
+        days = {day: self.store.get_day(day) for day in list(self.days)}
+        with self._lock:
+            self.suggestions.reload(records)
+            self.days.update(days)
+        self._generation = generation
+
+    def _refresh(self):
+        """
+        Makes the data of other processes visible before a read, the lock is only
+        taken if the database changed.
+        """
+        with self._store_lock:
+            if self.file_lock.generation() != self._generation:
+                with self.file_lock:
+                    self._sync()
+
+    def _write_day(self, day: str):
+        """
+        Applies the pending changes of a day to its stored document, writes it and
+        updates the rollups in the same commit.
+
+        The write holds the file lock and starts from the current state of the
+        database, so the changes of other processes are kept. The pending changes
+        are copied under `_lock` and written without it, changes made meanwhile
+        stay pending for the next write.
+
+        Args:
+            day (str): The day id of the document to write.
+        """
+        with self._store_lock, self.file_lock:
+            self._sync()
+            with self._lock:
+                pending = copy.deepcopy(self._pending.get(day))
+                if pending is None:
+                    return
+                suggestions, pushes = self.suggestions.changes()
+
+            with self.store.transaction():
+                previous = self.store.get_day(day)
+                document = copy.deepcopy(previous) or {'day': day, 'elapsed': 0}
+                if 'elapsed' in pending:
+                    document['elapsed'] = pending['elapsed']
+                if pending['orders']:
+                    orders = document.setdefault('orders', {})
+                    for order, ms in pending['orders'].items():
+                        order_id = self.store.order_id(order)
+                        orders[order_id] = orders.get(order_id, 0) + ms
+                self.store.put_day(copy.deepcopy(document))
+                self.rollups.apply(previous, document)
+                self.suggestions.write(suggestions)
+
+            with self._lock:
+                self.days[day] = document
+                self._settle(day, pending)
+                self.suggestions.saved(suggestions, pushes)
+            self._generation = self.file_lock.bump()
+
+    def _settle(self, day: str, written: dict):
+        """
+        Removes the written changes from the pending changes of a day. Requires `_lock`.
+
+        Args:
+            day (str): The day id.
+            written (dict): The pending changes as copied for the write.
+        """
+        pending = self._pending[day]
+        if 'elapsed' in pending and pending['elapsed'] == written.get('elapsed'):
+            del pending['elapsed']
+        for order, ms in written['orders'].items():
+            remaining = pending['orders'][order] - ms
+            if remaining:
+                pending['orders'][order] = remaining
+            else:
+                del pending['orders'][order]
+        if 'elapsed' not in pending and not pending['orders']:
+            del self._pending[day]
+
+    def _persist(self, day: str):
+        """
+        Schedules the write of a day's document, either on the persistence worker or immediately.
+
+        Args:
+            day (str): The day id of the document to write.
+        """
+        if self.writer:
+            self.writer.schedule(day, lambda: self._write_day(day))
+        else:
+            self._write_day(day)
+
+    def flush(self):
+        """
+        Blocks until all scheduled writes are committed to the store.
+        """
+        if self.writer:
+            self.writer.flush()
+
+    def close(self):
+        """
+        Commits all scheduled writes, stops the persistence worker and closes the store.
+        """
+        if self.writer:
+            self.writer.stop()
+            self.writer = None
+        with self._store_lock:
+            self.store.close()
+            self.intervals.close()
+            self.file_lock.close()
+
+    def get_activity_suggestions(self) -> list[str]:
+        """
+        Retrieves all unique activity names (orders) from the suggestion index.
+
+        New names are announced to `suggestions.listeners` when they are pushed.
+
+        Returns:
+            list: All activity (order) names, sorted.
+        """
+        self._refresh()
+        with self._lock:
+            return list(self.suggestions.names())
 
-        # Initialize TinyDB with the specified database and collection
-        self.db = TinyDB(self.config.mind.Database, indent=2)
-        self.collection = self.db.table(self.config.mind.collection)
-        self.day_activity = Query()  # For querying activities by day
+    def get_project_totals(self, start: str | None = None, end: str | None = None) -> dict[str, float]:
+        """
+        Returns the total seconds per order, read from the rollups.
+
+        Args:
+            start (str | None): First day id (YYYYMMDD) of the range, only its month is used.
+            end (str | None): Last day id (YYYYMMDD) of the range, only its month is used.
+
+        Returns:
+            dict[str, float]: Order name -> seconds.
+        """
+        self.flush()
+        self._refresh()
+        with self._store_lock:
+            if start is None and end is None:
+                return dict(self.rollups.orders())
+            totals: dict[str, float] = {}
+            for month in self._rollup_months(start, end):
+                for order, seconds in self.rollups.month(month)['orders'].items():
+                    totals[order] = totals.get(order, 0.0) + seconds
+            return totals
+
+    def _rollup_months(self, start: str | None, end: str | None) -> list[str]:
+        """
+        Returns the months with a rollup that overlap the given day range.
+        """
+        return [
+            month for month in self.rollups.months()
+            if (not start or month >= start[:6]) and (not end or month <= end[:6])
+        ]
 
-    def get_activity_suggestions(self):
+    def check_rollups(self, repair: bool = True) -> bool:
         """
-        Retrieves all unique activity names (orders) from the stored database.
+        Verifies the rollups against the raw day data.
+
+        Args:
+            repair (bool): If True, inconsistent rollups are rebuilt from the raw data.
 
         Returns:
-            set: A set containing all unique activity (order) names from the stored data.
+            bool: True if the rollups were consistent.
+        """
+        self.flush()
+        with self._store_lock, self.file_lock:
+            self._sync()
+            consistent = self.rollups.check(self.store.iter_cells())
+            if not consistent and repair:
+                with self.store.transaction():
+                    self.rollups.rebuild(self.store.iter_cells())
+                self._generation = self.file_lock.bump()
+        return consistent
+
+    def _day(self, day: str) -> dict | None:
         """
-        all_activities = set()
-        docs = self.collection.all()
-        # Collect all activity names from the stored documents
-        for doc in docs:
-            day_activities = doc.get('orders', {})
-            all_activities.update(day_activities.keys())
-        return all_activities
+        Returns the stored document of a day, loading it from the store on first access.
+        Must not be called while holding `_lock`, the store is read under the store lock.
+
+        Args:
+            day (str): The day id.
+        """
+        if day not in self.days:
+            with self._store_lock:
+                if day not in self.days:
+                    document = self.store.get_day(day)
+                    with self._lock:
+                        self.days[day] = document
+        return self.days[day]
+
+    def _pending_day(self, day: str) -> dict:
+        """
+        Returns the changes of a day that are not written yet, to be modified in place.
+        """
+        return self._pending.setdefault(day, {'orders': {}})
+
+    def _elapsed_ms(self, day: str) -> int:
+        """
+        Returns the elapsed milliseconds of a day, including a change not written yet.
+        Requires `_lock` and the day loaded by `_day`.
+        """
+        pending = self._pending.get(day, {})
+        if 'elapsed' in pending:
+            return pending['elapsed']
+        activity = self.days[day]
+        return activity.get('elapsed', 0) if activity else 0
 
     def get_current_activity(self) -> dict | None:
         """
-        Retrieves the current day's activity from the database.
+        Retrieves the current day's activity with order names and seconds,
+        including the changes not written yet.
 
         Returns:
             dict | None: The activity entry if it exists, else None.
         """
-        activity = self.collection.search(self.day_activity.day == self.day_id)
-        return activity[0] if activity else None
+        day = self.day_id
+        self._day(day)
+        # order names are decoded by the store
+        with self._store_lock, self._lock:
+            activity = self.days[day]
+            pending = self._pending.get(day)
+            if activity is None and pending is None:
+                return None
+            decoded = decode_day(activity, self.store.order_name) if activity else {'day': day, 'elapsed': 0.0}
+            if pending:
+                decoded['elapsed'] = self._elapsed_ms(day) / 1_000
+                for order, ms in pending['orders'].items():
+                    orders = decoded.setdefault('orders', {})
+                    orders[order] = orders.get(order, 0.0) + ms / 1_000
+            return decoded
 
     def get_current_elapsed_time(self) -> timedelta:
         """
@@ -86,9 +371,10 @@ class Mind:
         Returns:
             timedelta: The time elapsed today.
         """
-        activity = self.get_current_activity()
-        elapsed_seconds = activity.get('elapsed', 0.0) if activity else 0.0
-        return timedelta(seconds=elapsed_seconds)
+        day = self.day_id
+        self._day(day)
+        with self._lock:
+            return timedelta(milliseconds=self._elapsed_ms(day))
 
     def update(self, elapsed: timedelta):
         """
@@ -97,148 +383,325 @@ class Mind:
         Args:
             elapsed (timedelta): The new total elapsed time to store.
         """
-        transformed_elapsed = elapsed.total_seconds()
-        day_activity = self.get_current_activity()
+        transformed_elapsed = to_ms(elapsed.total_seconds())
 
-        if day_activity:
-            # Update the elapsed time in the current day's record
-            self.collection.update(
-                lambda a: a.update({'elapsed': transformed_elapsed}), # type: ignore
-                self.day_activity.day == self.day_id
-            )
+        with self._lock:
+            self._pending_day(self.day_id)['elapsed'] = transformed_elapsed
+        self._persist(self.day_id)
+
+    def _log(self, kind: int, when: datetime, order: str | None = None):
+        """
+        Queues an event for the interval log. It is appended by the persistence worker,
+        so the caller neither waits for the file lock nor for the fsync.
+        """
+        self._events.append((kind, when, order))
+        if self.writer:
+            self.writer.schedule(INTERVALS_JOB, self._write_events)
         else:
-            # Insert a new record for the current day with the elapsed time
-            self.collection.insert({
-                'day': self.day_id,
-                'elapsed': transformed_elapsed
-            })
+            self._write_events()
+
+    def _write_events(self):
+        """
+        Appends the queued events to the interval log, holding the file lock for its name dictionary.
+        """
+        with self.file_lock:
+            while self._events:
+                # removed once written, so a failed append is retried by the next write
+                self.intervals.append(*self._events[0])
+                self._events.popleft()
+
+    def start_order(self, order: str, when: datetime | None = None):
+        """
+        Starts recording an order.
+
+        Args:
+            order (str): The order name.
+            when (datetime | None): The start time, now if None.
+        """
+        self.current_order = order
+        self.order_start_time = when or datetime.now()
+        self._log(ORDER_START, self.order_start_time, order)
+
+    def log_timer(self, running: bool, when: datetime | None = None):
+        """
+        Logs a start or stop of the timer, repeated calls with the same state are ignored.
+
+        Args:
+            running (bool): Whether the timer runs now.
+            when (datetime | None): Time of the change, now if None.
+        """
+        if running != self._timer_running:
+            self._timer_running = running
+            self._log(TIMER_START if running else TIMER_STOP, when or datetime.now())
 
     def push(self):
         """
         Push the current order's duration to the activity record.
 
         This method updates the time spent on the current order and stores it
-        in the database under the 'orders' field.
+        in the database under the 'orders' field. A duration that spans midnight
+        is split, each part is credited to its own day.
         """
-        activity = self.get_current_activity()
+        day = self.day_id
+        self._day(day)
+        with self._lock:
+            has_activity = self.days[day] is not None or day in self._pending
 
-        if self.current_order and activity:
-            activity_orders = activity.get('orders', {})
-            elapsed_order = datetime.now() - self.order_start_time
+        if self.current_order and has_activity:
+            now = datetime.now()
+            self._log(ORDER_PUSH, now, self.current_order)
+            self._credit_order(self.current_order, self.order_start_time, now)
 
-            # Update or insert elapsed time for the current order
-            activity_orders[self.current_order] = activity_orders.get(
-                self.current_order, 0
-            ) + elapsed_order.total_seconds()
+    def _credit_order(self, order: str, start: datetime, end: datetime):
+        """
+        Adds the time between `start` and `end` to an order, split by day.
+        """
+        days = []
+        with self._lock:
+            for day, seconds in day_parts(start, end, self.day_format):
+                # the time is added to the stored time of the order when the day is written
+                orders = self._pending_day(day)['orders']
+                orders[order] = orders.get(order, 0) + to_ms(seconds)
+                days.append(day)
+            self.suggestions.record(order, end.timestamp())
+        for day in days:
+            self._persist(day)
+
+    def get_intervals(self, start: datetime, end: datetime) -> list[tuple[datetime, datetime, str | None]]:
+        """
+        Returns what ran when: the timer and order intervals overlapping a time range.
 
-            self.collection.update(
-                {'orders': activity_orders},
-                self.day_activity.day == self.day_id
-            )
+        Args:
+            start (datetime): Start of the range.
+            end (datetime): End of the range.
+
+        Returns:
+            list: (start, end, order name or None for the timer) by start time.
+        """
+        self.flush()
+        return list(self.intervals.between(start, end))
+
+    def get_interval_totals(self, start: date | None = None, end: date | None = None) -> list[Cell]:
+        """
+        Derives the daily timer and order totals from the interval log.
+
+        Args:
+            start (date | None): First day to include, unbounded if None.
+            end (date | None): Last day to include, unbounded if None.
+
+        Returns:
+            list[Cell]: The (day id, order or None for the timer, seconds) cells, sorted by day.
+        """
+        self.flush()
+        return self.intervals.daily_totals(start, end, now=datetime.now())
+
+    def recover(self, checkpoint: 'Checkpoint') -> bool:
+        """
+        Applies the state of a checkpoint written before the app was terminated.
+
+        A clean checkpoint (the app exited normally or it was recovered already) is
+        ignored. The elapsed time of the checkpoint's day is only raised to the
+        checkpointed value, a larger stored value is newer. The intervals the
+        terminated session left open in the interval log are closed at the time of
+        the checkpoint and the time recorded on the in-flight order up to then is
+        pushed to it, unless the session pushed it after the checkpoint.
+
+        Args:
+            checkpoint (Checkpoint): The newest checkpoint.
+
+        Returns:
+            bool: True if the database was changed.
+        """
+        if checkpoint.clean:
+            return False
+        day = checkpoint.day
+        elapsed = to_ms(checkpoint.elapsed.total_seconds())
+
+        self._day(day)
+        with self._lock:
+            changed = elapsed > self._elapsed_ms(day)
+            if changed:
+                self._pending_day(day)['elapsed'] = elapsed
+        if changed:
+            self._persist(day)
+
+        session = checkpoint.session
+        if not session:
+            return changed
+        self.flush()
+        with self.file_lock:
+            if checkpoint.running and self.intervals.open_start(session) is not None:
+                self.intervals.append(TIMER_STOP, checkpoint.written, session=session) # type: ignore
+            # the log keeps whole seconds, the checkpoint milliseconds
+            start = self.intervals.open_start(session, checkpoint.order) if checkpoint.order_elapsed else None
+            recording = start is not None and abs(start - checkpoint.order_start.timestamp()) <= 1 # type: ignore
+            if recording:
+                self.intervals.append(ORDER_PUSH, checkpoint.written, checkpoint.order, session=session) # type: ignore
+        if recording:
+            self._credit_order(checkpoint.order, checkpoint.order_start, checkpoint.written) # type: ignore
+            return True
+        return changed
+
+    def day_range(self, start: date | str | None, end: date | str | None) -> tuple[str | None, str | None]:
+        """
+        Converts the bounds of a date range into day ids.
+
+        Args:
+            start (date | str | None): First day (date or YYYYMMDD), unbounded if None.
+            end (date | str | None): Last day (date or YYYYMMDD), unbounded if None.
+
+        Returns:
+            tuple: The bounds as day ids (YYYYMMDD) or None.
+        """
+        return tuple(
+            bound.strftime(self.day_format) if isinstance(bound, date) else bound
+            for bound in (start, end)
+        ) # type: ignore
+
+    def build_data(
+            self,
+            format: Literal['hours', 'perc'] = 'hours',
+            start: date | str | None = None,
+            end: date | str | None = None
+    ) -> 'pd.DataFrame':
+        """
+        Builds a pandas DataFrame summarizing the stored activities.
+
+        The date range is pushed down into the store, so only the days inside
+        the range are loaded.
+
+        Args:
+            format (str): Either 'hours' to show hours worked or 'perc' to show % per order.
+            start (date | str | None): First day (date or YYYYMMDD) to include, unbounded if None.
+            end (date | str | None): Last day (date or YYYYMMDD) to include, unbounded if None.
+
+        Returns:
+            pd.DataFrame: A table where columns are dates (sorted) and rows are order names and total elapsed.
+        """
+        start, end = self.day_range(start, end)
+        self.flush()
+        with self._store_lock, self.file_lock:
+            self._sync()
+            cells = self.store.cells(start, end)
 
-    def build_data(self, format: Literal['hours', 'perc'] = 'hours') -> pd.DataFrame:
+        from core.analytics import days_frame
+        return days_frame(cells, self.config.mind.defaultorder, format, self.day_format)
+
+    def build_summary(self, start: str | None = None, end: str | None = None) -> 'pd.DataFrame':
+        """
+        Builds a monthly summary from the rollups, without touching the raw days.
+
+        Args:
+            start (str | None): First day id (YYYYMMDD) of the range, only its month is used.
+            end (str | None): Last day id (YYYYMMDD) of the range, only its month is used.
+
+        Returns:
+            pd.DataFrame: A table where columns are months and rows are the hours per order,
+                          the total hours and the number of days worked.
+        """
+        self.flush()
+        self._refresh()
+        with self._store_lock:
+            months = self._rollup_months(start, end)
+            rollups = [self.rollups.month(month) for month in months]
+        from core.analytics import months_frame
+        return months_frame(months, rollups)
+
+    def report_range(
+            self,
+            interval: Literal['total', 'month'] = 'total',
+            start: date | str | None = None,
+            end: date | str | None = None
+    ) -> tuple[str | None, str | None]:
         """
-        Builds a pandas DataFrame summarizing all stored activities.
+        Resolves the day range of a report.
+
+        Args:
+            interval (str): Either 'total' for all time or 'month' for the current month.
+                            Ignored if an explicit `start` or `end` is given.
+            start (date | str | None): First day of the report (date or YYYYMMDD).
+            end (date | str | None): Last day of the report (date or YYYYMMDD).
+
+        Returns:
+            tuple: The bounds as day ids (YYYYMMDD) or None.
+        """
+        start, end = self.day_range(start, end)
+        if interval == 'month' and start is None and end is None:
+            # Only load the days of the current month from the store
+            month = date.today().strftime('%Y%m')
+            start, end = f'{month}01', f'{month}31'
+        return start, end
+
+    def report_snapshot(
+            self,
+            format: Literal['hours', 'perc'] = 'hours',
+            interval: Literal['total', 'month'] = 'total',
+            start: date | str | None = None,
+            end: date | str | None = None
+    ) -> ReportSnapshot:
+        """
+        Copies the data of a report, so it can be generated off the GUI thread.
+
+        The copy is taken under the file lock, so no process writes in between. It
+        may be called from any thread, e.g. by a `ReportJob` on a worker.
 
         Args:
             format (str): Either 'hours' to show hours worked or 'perc' to show % per order.
+            interval (str): Either 'total' for all time or 'month' for the current month.
+            start (date | str | None): First day of the report (date or YYYYMMDD).
+            end (date | str | None): Last day of the report (date or YYYYMMDD).
 
         Returns:
-            pd.DataFrame: A table where columns are dates and rows are order names and total elapsed.
-        """
-        columns = set()  # Stores all unique day IDs
-        rows = set()     # Stores all unique order names
-
-        # Collect all day IDs and all unique order names
-        for doc in self.collection.all():
-            if (day := doc.get('day')):
-                columns.add(day)
-                if isinstance((orders := doc.get('orders', None)), dict):
-                    rows.update(orders.keys())
-
-        rows = list(rows)
-        rows.append(self.config.mind.defaultorder)
-        rows.append('total elapsed')
-        columns = list(columns)
-        
-        data = np.zeros((len(rows), len(columns)))
-
-        # Populate the matrix with hours or percentages
-        for document in self.collection.all():
-             day_id = document.get('day', None)
-             if day_id:
-                col_idx = columns.index(day_id)
- 
-                total_elapsed = document.get('elapsed', 0.0) / (60 * 60)       # convert to hours
-                
-               
-
-                orders = document.get('orders', {})
-                if isinstance(orders, dict):
-                    if np.isclose(total_elapsed, 0.0):
-                        total_elapsed = np.sum(list(orders.values()))
-                    for order, order_elapsed in orders.items():
-                        row_idx = rows.index(order)
-                        formatted_order_elapsed = order_elapsed / (60 * 60)    # convert to hours
-                        if format == 'perc':
-          
-                            data[-1, col_idx] = round(total_elapsed, 1)
-                            formatted_order_elapsed = (formatted_order_elapsed / total_elapsed) * 1e2 
-
-                        data[row_idx, col_idx] = round(formatted_order_elapsed, 1)
-
-        # fill by default order
-        data[-2, :] = np.round(data[-1, :] - np.sum(data[:-2], axis=0),1) if format == 'hours' else np.round(100 - np.sum(data[:-2], axis=0), 1)
-        # build the colum with total worked per order
-        # data[:, -1] = np.sum(data, axis=1)
-
-        # format columns for printing
-        formatted_columns = [
-            datetime.strptime(col, self.day_format).strftime('%d-%m-%Y')
-            for col in columns
-        ]
-         
-        data = pd.DataFrame(
-             data=data, columns=formatted_columns, index=rows
+            ReportSnapshot: The cells and month rollups of the report range.
+        """
+        start, end = self.report_range(interval, start, end)
+        self.flush()
+        with self._store_lock, self.file_lock:
+            self._sync()
+            cells = self.store.cells(start, end)
+            months = self._rollup_months(start, end)
+            rollups = [copy.deepcopy(self.rollups.month(month)) for month in months]
+        return ReportSnapshot(
+            cells=cells,
+            months=months,
+            rollups=rollups,
+            default_order=self.config.mind.defaultorder,
+            format=format,
+            day_format=self.day_format
         )
-          
-        return data
-    
+
     def report(
             self,
             format: Literal['hours', 'perc'] = 'hours',
             interval: Literal['total', 'month'] = 'total',
             file: str | None = None,
-            open_report: bool = True
-    ):
+            open_report: bool = True,
+            start: date | str | None = None,
+            end: date | str | None = None,
+            output: Output | None = None,
+            layout: Layout = 'wide'
+    ) -> str:
         """
         Generates a report of the activities stored in the database.
 
         Args:
             format (str): Either 'hours' to show hours worked or 'perc' to show % per order.
             interval (str): Either 'total' for all time or 'month' for the current month.
+                            Ignored if an explicit `start` or `end` is given.
             open_report (bool): If True, opens the report in a web browser.
+            start (date | str | None): First day of the report (date or YYYYMMDD).
+            end (date | str | None): Last day of the report (date or YYYYMMDD).
+            output (Output | None): 'xlsx', 'csv', 'parquet' or 'jsonl'; taken from the
+                                    extension of `file` if None, Excel by default.
+            layout (Layout): 'wide' (orders x dates) or 'long' (one row per date and order).
+
+        Returns:
+            str: The path of the written report.
         """
-        data = self.build_data(format=format)
-        
-        if interval == 'month':
-            # Filter the DataFrame to only include the current month
-            current_month = datetime.now().month
-            def filter_columns_by_current_month(column_name):
-                column_date = datetime.strptime(column_name, '%d-%m-%Y')
-                return column_date.month == current_month
-            data = data.loc[:, data.columns.to_series().apply(filter_columns_by_current_month)]
-
-        if file is None:
-            # Create a temporary file to store the report
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-                file = tmp_file.name
-        
-        # rearange the columns to be in the order of the day
-        data = data[sorted(data.columns, key=lambda day: pd.to_datetime(day, format='%d-%m-%Y'))]
-        # Save the DataFrame to an Excel file
-        data.to_excel(file)
+        snapshot = self.report_snapshot(format, interval, start, end)
+        file = write_report(snapshot, file, output=output, layout=layout)
 
         if open_report:
             # Open the report in the default web browser
-            webbrowser.open(f'file://{file}')
\ No newline at end of file
+            open_file(file)
+        return file
@@ -0,0 +1,156 @@
+import csv
+import json
+import importlib.util
+from itertools import groupby
+from typing import TYPE_CHECKING, Iterable, Iterator, Literal
+
+from core.store import Cell, TOTAL_ROW
+
+if TYPE_CHECKING:
+    # numpy is only imported when a report is built
+    import numpy as np
+
+OUTPUTS = ('xlsx', 'csv', 'parquet', 'jsonl')
+
+
+def day_summary(elapsed: 'np.ndarray', booked: 'np.ndarray') -> tuple['np.ndarray', 'np.ndarray']:
+    """
+    Derives the default order and total rows of the report from the day totals.
+
+    Both report layouts use it, on single days (long) or on arrays of days (wide).
+
+    Args:
+        elapsed ('np.ndarray'): The elapsed seconds of the days.
+        booked ('np.ndarray'): The seconds booked on orders per day.
+
+    Returns:
+        tuple: The seconds of the default order (the time not booked on any order)
+               and the total seconds (the sum of the orders for days without a total).
+    """
+    import numpy as np
+    total = np.where(elapsed > 0, elapsed, booked)
+    return np.maximum(total - booked, 0.0), total
+
+
+def report_values(seconds: 'np.ndarray', total: 'np.ndarray', format: Literal['hours', 'perc']) -> 'np.ndarray':
+    """
+    Converts order seconds into the values shown in the report, rounded to 0.1.
+
+    Args:
+        seconds ('np.ndarray'): The seconds of the orders.
+        total ('np.ndarray'): The total seconds of their days.
+        format (str): Either 'hours' to show hours worked or 'perc' to show % of the day's total.
+    """
+    import numpy as np
+    if format == 'perc':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(total > 0, seconds / total * 1e2, 0.0)
+    else:
+        values = seconds / (60 * 60)
+    return np.round(values, 1)
+
+
+def total_values(total: 'np.ndarray') -> 'np.ndarray':
+    """
+    Converts day totals into the values of the total row, hours in both formats.
+    """
+    import numpy as np
+    return np.round(total / (60 * 60), 1)
+
+
+def iter_long_rows(
+        cells: Iterable[Cell],
+        default_order: str,
+        format: Literal['hours', 'perc'] = 'hours'
+) -> Iterator[tuple[str, str, float]]:
+    """
+    Streams the report in long (tidy) layout: one (date, order, value) row per cell.
+
+    Only one day is held in memory at a time. Every day yields its orders, the
+    default order with the time not booked on any order and the total (in hours),
+    the same values as the wide layout of `core.analytics`.
+
+    Args:
+        cells (Iterable[Cell]): The (day, order, seconds) cells as returned by `DayStore.iter_cells`,
+                                sorted by day.
+        default_order (str): Name of the row that receives the time not booked on any order.
+        format (str): Either 'hours' to show hours worked or 'perc' to show % of the day's total.
+    """
+    import numpy as np
+    for day, day_cells in groupby(cells, key=lambda cell: cell[0]):
+        date = f'{day[:4]}-{day[4:6]}-{day[6:8]}'
+        elapsed = 0.0
+        orders = []
+        for _, order, seconds in day_cells:
+            if order is None:
+                elapsed = seconds
+            else:
+                orders.append((order, seconds))
+
+        seconds = np.array([seconds for _, seconds in orders], dtype=np.float64)
+        default, total = day_summary(np.float64(elapsed), seconds.sum())
+        values = report_values(np.append(seconds, default), total, format).tolist()
+        for (order, _), value in zip(orders + [(default_order, default)], values):
+            yield date, order, value
+        yield date, TOTAL_ROW, float(total_values(total))
+
+
+def value_column(format: Literal['hours', 'perc']) -> str:
+    return 'percent' if format == 'perc' else 'hours'
+
+
+def write_long_csv(rows: Iterable[tuple[str, str, float]], file: str, format: Literal['hours', 'perc']):
+    """
+    Streams long rows into a CSV file.
+    """
+    with open(file, 'w', newline='', encoding='utf-8') as target:
+        writer = csv.writer(target)
+        writer.writerow(['date', 'order', value_column(format)])
+        writer.writerows(rows)
+
+
+def write_long_jsonl(rows: Iterable[tuple[str, str, float]], file: str, format: Literal['hours', 'perc']):
+    """
+    Streams long rows into a JSON Lines file, one object per row.
+    """
+    column = value_column(format)
+    with open(file, 'w', encoding='utf-8') as target:
+        for date, order, value in rows:
+            target.write(json.dumps({'date': date, 'order': order, column: value}) + '\n')
+
+
+def write_long_parquet(rows: Iterable[tuple[str, str, float]], file: str, format: Literal['hours', 'perc']):
+    """
+    Writes long rows into a Parquet file (requires pyarrow).
+    """
+    pa, pq = import_pyarrow()
+    rows = list(rows)  # Parquet is written column by column
+    dates, orders, values = zip(*rows) if rows else ((), (), ())
+    table = pa.table({
+        'date': pa.array(dates, type=pa.string()).cast(pa.date32()),
+        'order': pa.array(orders, type=pa.string()).dictionary_encode(),
+        value_column(format): pa.array(values, type=pa.float64()),
+    })
+    pq.write_table(table, file)
+
+
+def import_pyarrow():
+    """
+    Imports pyarrow, which is only needed for Parquet exports.
+
+    Raises:
+        ImportError: With an explanation if pyarrow is not installed.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as ex:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow).") from ex
+    return pa, pq
+
+
+def has_parquet() -> bool:
+    """
+    Returns True if Parquet exports are available, without importing pyarrow.
+    """
+    return importlib.util.find_spec('pyarrow') is not None
@@ -0,0 +1,129 @@
+import os
+import time
+import struct
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# The write generation at the start of the lock file
+_GENERATION = struct.Struct('<Q')
+# Windows locks a byte range, the byte after the generation is locked so it stays readable
+_LOCK_OFFSET = _GENERATION.size
+
+
+class FileLock:
+    """
+    An advisory lock shared by all processes that open the same database.
+
+    The lock is held on a small file next to the database (`<database>.lock`), so
+    every process that writes the database must take it first: with `flock` on
+    POSIX and `msvcrt.locking` on Windows. The operating system releases the lock
+    when a process dies, a crashed instance never blocks the others.
+
+    The file also holds a write generation: a writer calls `bump()` before it
+    releases the lock, and a process that finds a generation other than the one it
+    last saw knows that its in-memory view of the database is stale.
+
+    The lock is re-entrant within a process and safe to use from several threads.
+    """
+
+    def __init__(self, path: str | Path, timeout: float = 10.0):
+        """
+        Opens (or creates) the lock file.
+
+        Args:
+            path (str | Path): Path of the lock file.
+            timeout (float): Seconds to wait for the lock before `TimeoutError` is raised.
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = os.fdopen(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b', buffering=0)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+
+    def acquire(self):
+        """
+        Takes the lock, waiting at most `timeout` seconds for other processes.
+
+        Raises:
+            TimeoutError: If another process holds the lock for longer than `timeout`.
+        """
+        self._thread_lock.acquire()
+        if self._depth:
+            self._depth += 1
+            return
+        deadline = time.monotonic() + self.timeout
+        while not self._try_lock():
+            if time.monotonic() > deadline:
+                self._thread_lock.release()
+                raise TimeoutError(f"The database is locked by another process ({self.path})")
+            time.sleep(0.005)
+        self._depth = 1
+
+    def release(self):
+        """
+        Releases the lock (once it was released as often as it was acquired).
+        """
+        self._depth -= 1
+        if not self._depth:
+            self._unlock()
+        self._thread_lock.release()
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def _try_lock(self) -> bool:
+        try:
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                self._file.seek(_LOCK_OFFSET)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(self):
+        if fcntl:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(_LOCK_OFFSET)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def generation(self) -> int:
+        """
+        Returns the write generation, 0 for a new database.
+
+        It can be read without holding the lock to check whether a reload is needed.
+        """
+        with self._thread_lock:
+            self._file.seek(0)
+            data = self._file.read(_GENERATION.size)
+        return _GENERATION.unpack(data)[0] if len(data) == _GENERATION.size else 0
+
+    def bump(self) -> int:
+        """
+        Increments the write generation, must be called while holding the lock.
+
+        Returns:
+            int: The new generation.
+        """
+        generation = self.generation() + 1
+        with self._thread_lock:
+            self._file.seek(0)
+            self._file.write(_GENERATION.pack(generation))
+        return generation
+
+    def close(self):
+        self._file.close()
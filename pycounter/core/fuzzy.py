@@ -0,0 +1,108 @@
+import numpy as np
+from typing import Iterable
+
+
+class FuzzyIndex:
+    """
+    Typo-tolerant prefix search over the order names of the completer.
+
+    A name matches if some prefix of it is within `max_distance` edits of the query,
+    where an edit is an insertion, deletion, substitution or transposition of two
+    adjacent characters (optimal string alignment distance). Matches are ranked
+    by that distance, then by the distance to the whole name.
+
+    The casefolded names are stored once as a (names x characters) code point
+    matrix. A query runs the banded alignment over all names at once, one numpy
+    operation per cell of the band, so its cost does not depend on how many
+    names are close to the query.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        """
+        Args:
+            names (Iterable[str]): The initial names.
+        """
+        self.names: list[str] = sorted(set(names))
+        self._columns: list[np.ndarray] | None = None
+        self._lengths = np.zeros(0, dtype=np.int32)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str):
+        """
+        Adds a name, the matrix is rebuilt on the next search.
+
+        Args:
+            name (str): The name.
+        """
+        if name not in self.names:
+            self.names.append(name)
+            self._columns = None
+
+    def _build(self) -> list[np.ndarray]:
+        if self._columns is None:
+            folded = [name.casefold() for name in self.names]
+            width = max(map(len, folded), default=0)
+            self._lengths = np.fromiter(map(len, folded), dtype=np.int32, count=len(folded))
+            codes = np.zeros((len(folded), width), dtype=np.int32)     # 0 pads the short names
+            codes[np.arange(width) < self._lengths[:, None]] = np.frombuffer(
+                ''.join(folded).encode('utf-32-le'), dtype=np.int32
+            )
+            self._columns = [np.ascontiguousarray(codes[:, j]) for j in range(width)]
+        return self._columns
+
+    def search(self, text: str, max_distance: int = 2, limit: int | None = None) -> list[tuple[str, int]]:
+        """
+        Returns the names with a prefix within `max_distance` edits of `text`.
+
+        Args:
+            text (str): The query.
+            max_distance (int): Number of edits tolerated.
+            limit (int | None): Maximum number of names returned, all if None.
+
+        Returns:
+            list[tuple[str, int]]: The names and their distance, the best first.
+        """
+        query = [ord(char) for char in text.casefold()]
+        columns = self._build()
+        if not query or not self.names:
+            return []
+
+        k = max_distance
+        size, width = len(self.names), len(columns)
+        cap = np.full(size, k + 1, dtype=np.uint8)  # everything outside the band is "too far"
+
+        # rows of the alignment matrix, restricted to the band |i - j| <= k
+        previous = {j: np.full(size, j, dtype=np.uint8) for j in range(min(k, width) + 1)}
+        before_previous: dict[int, np.ndarray] = {}
+        equal: dict[tuple[int, int], np.ndarray] = {}
+
+        for i in range(1, len(query) + 1):
+            current = {}
+            for j in range(max(0, i - k), min(width, i + k) + 1):
+                if j == 0:
+                    current[0] = np.full(size, min(i, k + 1), dtype=np.uint8)
+                    continue
+                same = equal[i, j] = columns[j - 1] == query[i - 1]
+                value = previous.get(j - 1, cap) + ~same
+                np.minimum(value, previous.get(j, cap) + 1, out=value)
+                np.minimum(value, current.get(j - 1, cap) + 1, out=value)
+                if i > 1 and j > 1 and j - 2 in before_previous:
+                    swapped = equal[i, j - 1] if (i, j - 1) in equal else columns[j - 2] == query[i - 1]
+                    swapped = swapped & (equal[i - 1, j] if (i - 1, j) in equal else columns[j - 1] == query[i - 2])
+                    np.minimum(value, np.where(swapped, before_previous[j - 2] + 1, cap), out=value)
+                np.minimum(value, cap, out=value)
+                current[j] = value
+            before_previous, previous = previous, current
+
+        # distance to the best prefix and to the whole name
+        prefix, whole = cap.copy(), cap.copy()
+        for j, value in previous.items():
+            np.minimum(prefix, np.where(self._lengths >= j, value, cap), out=prefix)
+            whole = np.where(self._lengths == j, value, whole)
+
+        found = np.flatnonzero(prefix <= k)
+        order = found[np.lexsort((whole[found], prefix[found]))][:limit]
+        return [(self.names[index], int(prefix[index])) for index in order]
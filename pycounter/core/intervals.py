@@ -0,0 +1,343 @@
+import os
+import json
+import random
+import struct
+from pathlib import Path
+from datetime import datetime, date, timedelta
+from typing import TYPE_CHECKING, Iterator
+
+from core.store import Cell
+
+if TYPE_CHECKING:
+    # numpy is only imported when the log is read
+    import numpy as np
+
+# Event kinds of the interval log
+TIMER_START = 1
+TIMER_STOP = 2
+ORDER_START = 3
+ORDER_PUSH = 4
+
+# time (epoch seconds), kind, padding, session, order id (-1 for timer events)
+_EVENT = struct.Struct('<qBxHi')
+EVENT_SIZE = _EVENT.size
+
+
+def _dtype():
+    import numpy as np
+    return np.dtype([('time', '<i8'), ('kind', 'u1'), ('pad', 'V1'), ('session', '<u2'), ('order', '<i4')])
+
+
+class IntervalLog:
+    """
+    Append-only log of the timer and order events of one collection: when the
+    timer ran and when each order was recorded. The day documents of the store
+    remain the authoritative totals, the log adds the time of day they lack and
+    `daily_totals()` derives the same totals from it, e.g. to audit the store.
+
+    Every event is a fixed 16-byte record `(epoch seconds, kind, session, order id)`
+    appended to the log file; the order names are dictionary-encoded, their ids are the line
+    numbers of `<log>.names`. Appending never rewrites anything, so its cost does
+    not depend on the length of the history. Every instance writes its own random
+    session id, so the events of processes that record the same collection at the
+    same time are told apart (records written before sessions existed read as 0).
+
+    Reading maps the whole log into a numpy array; `intervals()` pairs the start
+    and end events, and `daily_totals()` splits the intervals at local midnight
+    and sums them per day and order without a Python loop over the intervals.
+    """
+
+    def __init__(self, path: str | Path, session: int | None = None):
+        """
+        Opens (or creates) the log and its name dictionary.
+
+        Args:
+            path (str | Path): Path of the event log.
+            session (int | None): Session id of the events appended by this instance
+                                  (1 to 65535), a random one if None.
+        """
+        self.path = Path(path)
+        self.session = session or random.randint(1, 0xFFFF)
+        self.names_path = Path(f'{self.path}.names')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.names: list[str] = []
+        self._ids: dict[str, int] = {}
+        self._names_read = 0  # Bytes of the name dictionary read so far
+        self.names_path.touch()
+        self._read_names()
+
+        self._events = self.path.open('ab')
+        # a record torn by a crash is cut off
+        if self._events.tell() % EVENT_SIZE:
+            self._events.truncate(self._events.tell() - self._events.tell() % EVENT_SIZE)
+        self._names = self.names_path.open('a', encoding='utf-8')
+
+    def _read_names(self):
+        """
+        Reads the names appended to the dictionary since the last read, also by other processes.
+        """
+        with self.names_path.open('rb') as file:
+            file.seek(self._names_read)
+            for line in file:
+                if not line.endswith(b'\n'):
+                    # torn by a crash (or still being written), it is read again next time
+                    break
+                self._names_read += len(line)
+                try:
+                    name = json.loads(line)
+                except ValueError:
+                    continue
+                self._ids.setdefault(name, len(self.names))
+                self.names.append(name)
+
+    def order_id(self, name: str) -> int:
+        """
+        Returns the id of an order name, adding it to the dictionary if it is new.
+
+        Processes sharing the log must hold the database lock, so that a name
+        appended by another process is found before it is added again.
+
+        Args:
+            name (str): The order name.
+        """
+        if name not in self._ids:
+            self._read_names()
+        if name not in self._ids:
+            self._names.write(json.dumps(name) + '\n')
+            self._names.flush()
+            self._read_names()
+        return self._ids[name]
+
+    def append(self, kind: int, when: datetime, order: str | None = None, session: int | None = None):
+        """
+        Appends an event and syncs it to disk.
+
+        Args:
+            kind (int): TIMER_START, TIMER_STOP, ORDER_START or ORDER_PUSH.
+            when (datetime): Time of the event.
+            order (str | None): The order of an order event.
+            session (int | None): Session of the event, e.g. to close an interval of
+                                  a crashed session; this instance's session if None.
+        """
+        order_id = self.order_id(order) if order is not None else -1
+        self._events.write(_EVENT.pack(int(when.timestamp()), kind, session or self.session, order_id))
+        self._events.flush()
+        os.fsync(self._events.fileno())
+
+    def events(self) -> 'np.ndarray':
+        """
+        Returns all events as a structured array with the fields time, kind, session and order.
+        """
+        import numpy as np
+        self._events.flush()
+        if not self.path.stat().st_size:
+            return np.zeros(0, dtype=_dtype())
+        return np.fromfile(self.path, dtype=_dtype())
+
+    def open_start(self, session: int, order: str | None = None) -> int | None:
+        """
+        Returns the start of the interval a session left open, e.g. when it crashed.
+
+        Args:
+            session (int): The session.
+            order (str | None): The order, the timer if None.
+
+        Returns:
+            int | None: The start (epoch seconds), None if the interval was closed.
+        """
+        import numpy as np
+        if order is None:
+            opening, closing, order_id = TIMER_START, TIMER_STOP, -1
+        else:
+            self._read_names()
+            if order not in self._ids:
+                return None
+            opening, closing, order_id = ORDER_START, ORDER_PUSH, self._ids[order]
+        events = self.events()
+        events = events[(events['session'] == session) & (events['order'] == order_id)
+                        & np.isin(events['kind'], (opening, closing))]
+        if len(events) and events['kind'][-1] == opening:
+            return int(events['time'][-1])
+        return None
+
+    def intervals(self, timer: bool = False, now: datetime | None = None) -> tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """
+        Pairs the start and end events into intervals.
+
+        An end event closes the latest start of the same order in the same session
+        (all timer events share the order id -1). A start that is followed by
+        another start of the same order and session was restarted and has no
+        interval; an end without an open start is ignored.
+
+        Args:
+            timer (bool): If True, the intervals of the timer (start to stop), else
+                          those of the orders (start to push).
+            now (datetime | None): Closes an interval that is still open at this time,
+                                   open intervals are left out if None.
+
+        Returns:
+            tuple: The start and end times (epoch seconds) and the order ids (-1 for the timer).
+        """
+        import numpy as np
+        events = self.events()
+        opening, closing = (TIMER_START, TIMER_STOP) if timer else (ORDER_START, ORDER_PUSH)
+        events = events[(events['kind'] == opening) | (events['kind'] == closing)]
+        if not len(events):
+            return events['time'], events['time'], events['order']
+
+        # group the events by session and order, in log order within each group
+        events = events[np.lexsort((np.arange(len(events)), events['order'], events['session']))]
+        is_start = events['kind'] == opening
+        same_order = ((events['order'][1:] == events['order'][:-1])
+                      & (events['session'][1:] == events['session'][:-1]))
+
+        # a start directly followed by an end of the same order is an interval
+        closed = np.append(is_start[:-1] & ~is_start[1:] & same_order, False)
+        starts, orders = events['time'][closed], events['order'][closed]
+        ends = events['time'][np.roll(closed, 1)]
+
+        # the last event of an order in a session is a start: it is still running
+        running = is_start & np.append(~same_order, True)
+        if now is not None and running.any():
+            starts = np.append(starts, events['time'][running])
+            ends = np.append(ends, np.full(running.sum(), int(now.timestamp())))
+            orders = np.append(orders, events['order'][running])
+
+        by_start = np.argsort(starts, kind='stable')
+        return starts[by_start], ends[by_start], orders[by_start]
+
+    def daily_totals(
+            self,
+            start: date | None = None,
+            end: date | None = None,
+            now: datetime | None = None
+    ) -> list[Cell]:
+        """
+        Derives the time per day (timer) and per day and order from the log.
+
+        Intervals that span midnight are split, each part is credited to its own day.
+
+        Args:
+            start (date | None): First day to include, unbounded if None.
+            end (date | None): Last day to include, unbounded if None.
+            now (datetime | None): Closes the running intervals at this time.
+
+        Returns:
+            list[Cell]: The (day id, order or None for the timer, seconds) cells, sorted by day.
+        """
+        import numpy as np
+        first = start.toordinal() if start else -np.inf
+        last = end.toordinal() if end else np.inf
+        cells = []
+        for timer in (True, False):
+            days, orders, seconds = split_days(*self.intervals(timer, now))
+            inside = (days >= first) & (days <= last)
+            if not inside.any():
+                continue
+            # sum the parts per (day, order), the keys come out sorted by day
+            width = len(self.names) + 1
+            keys, inverse = np.unique(days[inside] * width + orders[inside] + 1, return_inverse=True)
+            totals = np.bincount(inverse, weights=seconds[inside])
+            unique_days, day_index = np.unique(keys // width, return_inverse=True)
+            day_ids = [date.fromordinal(day).strftime('%Y%m%d') for day in unique_days.tolist()]
+            names = [None] * len(keys) if timer else [self.names[order] for order in (keys % width - 1).tolist()]
+            cells.extend(zip([day_ids[index] for index in day_index.tolist()], names, totals.tolist()))
+        # the day totals first, then the orders of the day
+        cells.sort(key=lambda cell: (cell[0], cell[1] is not None))
+        return cells
+
+    def between(self, start: datetime, end: datetime) -> Iterator[tuple[datetime, datetime, str | None]]:
+        """
+        Yields what ran when: the timer and order intervals overlapping a time range.
+
+        Args:
+            start (datetime): Start of the range.
+            end (datetime): End of the range.
+
+        Yields:
+            tuple: Start, end and order name (None for the timer) of every interval, by start time.
+        """
+        found = []
+        for timer in (True, False):
+            starts, ends, orders = self.intervals(timer, now=datetime.now())
+            overlapping = (starts < end.timestamp()) & (ends > start.timestamp())
+            for first, last, order in zip(starts[overlapping].tolist(), ends[overlapping].tolist(),
+                                          orders[overlapping].tolist()):
+                found.append((datetime.fromtimestamp(first), datetime.fromtimestamp(last),
+                              None if timer else self.names[order]))
+        yield from sorted(found, key=lambda interval: (interval[0], interval[2] is not None))
+
+    def close(self):
+        self._events.close()
+        self._names.close()
+
+
+def day_parts(start: datetime, end: datetime, day_format: str = '%Y%m%d') -> list[tuple[str, float]]:
+    """
+    Splits a single interval at local midnight, see `split_days` for many intervals.
+
+    Args:
+        start (datetime): Start of the interval.
+        end (datetime): End of the interval.
+        day_format (str): Format of the day ids.
+
+    Returns:
+        list[tuple[str, float]]: The day id and seconds of every part, at least one.
+    """
+    parts = []
+    while start.date() < end.date():
+        midnight = datetime.combine(start.date() + timedelta(days=1), datetime.min.time())
+        parts.append((start.strftime(day_format), (midnight - start).total_seconds()))
+        start = midnight
+    parts.append((start.strftime(day_format), max((end - start).total_seconds(), 0.0)))
+    return parts
+
+
+def midnights(first: date, last: date) -> 'np.ndarray':
+    """
+    Returns the epoch seconds of the local midnights from `first` to the day after `last`.
+
+    The midnights are computed per day, so days of 23 or 25 hours (DST) are split correctly.
+    """
+    import numpy as np
+    return np.fromiter(
+        (datetime.combine(first + timedelta(days=offset), datetime.min.time()).timestamp()
+         for offset in range((last - first).days + 2)),
+        dtype=np.float64
+    )
+
+
+def split_days(starts: 'np.ndarray', ends: 'np.ndarray', orders: 'np.ndarray') -> tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+    """
+    Splits intervals at local midnight.
+
+    Args:
+        starts (np.ndarray): Start times (epoch seconds).
+        ends (np.ndarray): End times (epoch seconds).
+        orders (np.ndarray): Order ids of the intervals.
+
+    Returns:
+        tuple: The day (proleptic ordinal), order id and seconds of every part.
+    """
+    import numpy as np
+    valid = ends > starts
+    starts, ends, orders = starts[valid], ends[valid], orders[valid]
+    if not len(starts):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+
+    first = date.fromtimestamp(int(starts.min()))
+    boundaries = midnights(first, date.fromtimestamp(int(ends.max())))
+    first_day = np.searchsorted(boundaries, starts, side='right') - 1
+    last_day = np.searchsorted(boundaries, ends, side='left') - 1
+
+    # one part per interval and day it touches
+    counts = last_day - first_day + 1
+    interval = np.repeat(np.arange(len(starts)), counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    day = first_day[interval] + offset
+
+    part_start = np.maximum(starts[interval], boundaries[day])
+    part_end = np.minimum(ends[interval], boundaries[day + 1])
+    return day + first.toordinal(), orders[interval].astype(np.int64), part_end - part_start
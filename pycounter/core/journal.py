@@ -0,0 +1,177 @@
+import os
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+from tinydb.storages import Storage
+
+
+class JournalStorage(Storage):
+    """
+    A TinyDB storage that appends every change to a journal file instead of
+    rewriting the whole JSON database.
+
+    The database consists of two files:
+    - the snapshot, a regular TinyDB JSON file (e.g. `pycounter.json`)
+    - the journal, a JSON-lines file next to it (e.g. `pycounter.journal`)
+
+    On startup the snapshot is loaded and the journal replayed into memory. Each
+    `write()` only appends what changed, so the cost of a write does not grow with
+    the size of the history. Once the journal exceeds `max_journal_bytes` it is
+    compacted into a new snapshot.
+
+    `read()` hands out the in-memory state itself, which TinyDB changes in place,
+    so nothing is copied or compared. Writers announce the documents they change
+    with `touch()`, only those are appended. TinyDB replaces the dict of a table on
+    every change, a replaced table nobody touched is appended as a whole.
+    """
+
+    def __init__(self, path: str, max_journal_bytes: int = 1_000_000, **kwargs):
+        """
+        Opens (or creates) the snapshot and journal files.
+
+        Args:
+            path (str): Path to the snapshot JSON file.
+            max_journal_bytes (int): Journal size that triggers a compaction.
+        """
+        super().__init__()
+
+        self.path = Path(path)
+        self.journal_path = self.path.with_suffix('.journal')
+        self.max_journal_bytes = max_journal_bytes
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._data: Dict[str, Dict[str, Any]] = self._load_snapshot()
+        self._replay()
+        # the table dicts as of the last write, to find the tables TinyDB replaced
+        self._tables: Dict[str, Dict[str, Any]] = dict(self._data)
+        # the documents changed since the last write, by table
+        self._dirty: Dict[str, Set[str]] = {}
+
+        self._journal = self.journal_path.open('a', encoding='utf-8')
+        if self._journal.tell() > self.max_journal_bytes:
+            self.compact()
+
+    def _load_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Loads the snapshot file, returning an empty database if it does not exist.
+        """
+        if not self.path.exists() or not self.path.stat().st_size:
+            return {}
+        with self.path.open('r', encoding='utf-8') as snapshot:
+            return json.load(snapshot)
+
+    def _replay(self):
+        """
+        Applies all complete journal records to the in-memory state.
+
+        A trailing record that was only partially written (e.g. because of a crash)
+        is discarded and cut off the journal.
+        """
+        if not self.journal_path.exists():
+            return
+
+        valid_bytes = 0
+        with self.journal_path.open('rb') as journal:
+            for line in journal:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(record)
+                valid_bytes += len(line)
+
+        if valid_bytes != self.journal_path.stat().st_size:
+            os.truncate(self.journal_path, valid_bytes)
+
+    def _apply(self, record: Dict[str, Any]):
+        """
+        Applies a single journal record to the in-memory state.
+
+        Records are `{"t": table, "id": doc_id, "doc": doc}` for an insert/update,
+        `{"t": table, "id": doc_id}` for a removal, `{"t": table, "docs": docs}` for
+        a rewritten table and `{"t": table}` for a dropped table.
+        """
+        table = record['t']
+        if 'docs' in record:
+            self._data[table] = record['docs']
+        elif 'id' not in record:
+            self._data.pop(table, None)
+        elif 'doc' in record:
+            self._data.setdefault(table, {})[record['id']] = record['doc']
+        else:
+            self._data.get(table, {}).pop(record['id'], None)
+
+    def touch(self, table: str, doc_id: int | str):
+        """
+        Announces a document that the next write inserts, updates or removes.
+
+        A writer that touches a table must touch every document it changes in it,
+        the other documents of the table are not looked at.
+
+        Args:
+            table (str): Name of the table.
+            doc_id (int | str): Id of the document.
+        """
+        self._dirty.setdefault(table, set()).add(str(doc_id))
+
+    def _records(self, data: Dict[str, Dict[str, Any]]):
+        """
+        Yields the journal records of a write: the touched documents, the tables
+        that were replaced without being touched and the dropped tables.
+        """
+        for table in self._tables.keys() - data.keys():
+            yield {'t': table}
+
+        for table, documents in data.items():
+            if table in self._dirty:
+                for doc_id in sorted(self._dirty[table]):
+                    if doc_id in documents:
+                        yield {'t': table, 'id': doc_id, 'doc': documents[doc_id]}
+                    else:
+                        yield {'t': table, 'id': doc_id}
+            elif documents is not self._tables.get(table):
+                yield {'t': table, 'docs': documents}
+
+    def read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        if not self._data:
+            return None
+        return self._data
+
+    def write(self, data: Dict[str, Dict[str, Any]]):
+        records = [json.dumps(record) + '\n' for record in self._records(data)]
+        self._data = data
+        self._tables = dict(data)
+        self._dirty.clear()
+
+        if not records:
+            return
+
+        self._journal.write(''.join(records))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+        if self._journal.tell() > self.max_journal_bytes:
+            self.compact()
+
+    def compact(self):
+        """
+        Writes the in-memory state as a new snapshot and truncates the journal.
+
+        The snapshot is written to a temporary file and atomically moved into place
+        before the journal is cleared, so a crash at any point leaves a state that
+        replays to the same data.
+        """
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with tmp_path.open('w', encoding='utf-8') as snapshot:
+            json.dump(self._data, snapshot)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(tmp_path, self.path)
+
+        self._journal.seek(0)
+        self._journal.truncate()
+
+    def close(self):
+        self._journal.close()
@@ -5,6 +5,9 @@ from pathlib import Path
 from PyQt5.QtWidgets import QMessageBox
 from PyQt5.QtCore import QtMsgType
 
+# Folder of the log file and the startup profiles
+LOG_DIR = Path.home().joinpath('.pycounter')
+
 def setup_logging(
         filename: str | None = None, 
         max_bytes: int = 5_000_000,
@@ -19,7 +22,7 @@ def setup_logging(
     """
 
     if not filename:
-        logfile = Path.home().joinpath('.pycounter').joinpath('pycounter.log')
+        logfile = LOG_DIR.joinpath('pycounter.log')
         logfile.parent.mkdir(mode=0o777, parents=True, exist_ok=True)
     else:
         logfile = Path(filename)
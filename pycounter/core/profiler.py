@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import time
+import builtins
+import platform
+import importlib.util
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+
+# Command-line flag and environment variable that enable the startup profiler.
+# With PYCOUNTER_PROFILE_STARTUP=exit the app quits after the first paint.
+PROFILE_FLAG = '--profile-startup'
+PROFILE_ENV = 'PYCOUNTER_PROFILE_STARTUP'
+
+
+class StartupProfiler:
+    """
+    Records how long each phase of the application startup takes.
+
+    Phases are timed with `phase()` and may be nested. While the profiler is
+    enabled, `__import__` is wrapped to record the time spent importing every
+    module that was not loaded yet (inclusive and self time, like `python -X importtime`).
+
+    A disabled profiler only costs a flag check per phase.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.exit_after = False
+        self.started = 0.0
+        self.phases: list[dict] = []
+        self.imports: dict[str, dict] = {}
+        self._depth = 0
+        self._import_stack: list[float] = []
+        self._original_import = None
+
+    def enable(self, exit_after: bool = False):
+        """
+        Starts the clock and the import hook.
+
+        Args:
+            exit_after (bool): Whether the app should quit once the report is written.
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        self.exit_after = exit_after
+        self.started = time.perf_counter()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def enable_from(self, argv: list[str], environ=os.environ) -> list[str]:
+        """
+        Enables the profiler if requested on the command line or in the environment.
+
+        Args:
+            argv (list[str]): The command line, the profiler flag is removed from it.
+            environ (Mapping): The environment.
+
+        Returns:
+            list[str]: The command line without the profiler flag.
+        """
+        value = environ.get(PROFILE_ENV, '').strip().lower()
+        if PROFILE_FLAG in argv or value not in ('', '0', 'false', 'no'):
+            self.enable(exit_after=value == 'exit')
+        return [arg for arg in argv if arg != PROFILE_FLAG]
+
+    def disable(self):
+        """
+        Removes the import hook, recorded timings are kept.
+        """
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Times the code inside the context as a startup phase.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        record = {'name': name, 'depth': self._depth, 'start': time.perf_counter() - self.started}
+        self.phases.append(record)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            record['seconds'] = time.perf_counter() - self.started - record['start']
+
+    def mark(self, name: str):
+        """
+        Records a point in time (e.g. the first paint) as a phase without duration.
+
+        Args:
+            name (str): The name of the event.
+        """
+        if self.enabled:
+            self.phases.append({
+                'name': name, 'depth': self._depth,
+                'start': time.perf_counter() - self.started, 'seconds': 0.0
+            })
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level:
+            try:
+                module = importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__'))
+            except (ImportError, ValueError):
+                module = name
+        else:
+            module = name
+        if module in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        start = time.perf_counter()
+        self._import_stack.append(0.0)
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._import_stack.pop()
+            if self._import_stack:
+                self._import_stack[-1] += elapsed
+            if module not in self.imports:
+                self.imports[module] = {
+                    'seconds': elapsed,
+                    'self_seconds': elapsed - children,
+                    'nested': bool(self._import_stack),
+                }
+
+    def report(self) -> dict:
+        """
+        Returns the recorded timings as a JSON-serializable dict.
+        """
+        imports = sorted(self.imports.items(), key=lambda item: item[1]['self_seconds'], reverse=True)
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'total_seconds': time.perf_counter() - self.started,
+            'import_seconds': sum(info['seconds'] for _, info in imports if not info['nested']),
+            'phases': self.phases,
+            'imports': [{'module': module, **info} for module, info in imports],
+        }
+
+    def write(self, directory: Path, top: int = 25) -> Path:
+        """
+        Writes the report as JSON and as a human-readable summary into `directory`.
+
+        Every run is also appended to `startup-history.jsonl` (phases only), so
+        the startup time can be compared across versions.
+
+        Args:
+            directory (Path): The target directory (usually ~/.pycounter).
+            top (int): Number of the slowest imports listed in the summary.
+
+        Returns:
+            Path: The path of the JSON report.
+        """
+        self.disable()
+        report = self.report()
+        directory.mkdir(parents=True, exist_ok=True)
+
+        target = directory.joinpath('startup-profile.json')
+        target.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        directory.joinpath('startup-profile.txt').write_text(format_report(report, top), encoding='utf-8')
+
+        history = {key: report[key] for key in ('created', 'python', 'total_seconds', 'import_seconds')}
+        history['phases'] = {phase['name']: round(phase['seconds'], 6) for phase in report['phases']}
+        with directory.joinpath('startup-history.jsonl').open('a', encoding='utf-8') as file:
+            file.write(json.dumps(history) + '\n')
+
+        return target
+
+
+def format_report(report: dict, top: int = 25) -> str:
+    """
+    Formats a startup report as a text table.
+
+    Args:
+        report (dict): A report as returned by `StartupProfiler.report`.
+        top (int): Number of the slowest imports to list.
+
+    Returns:
+        str: The summary.
+    """
+    lines = [
+        f"PyCounter startup profile ({report['created']}, Python {report['python']})",
+        f"total: {report['total_seconds'] * 1e3:.1f} ms, imports: {report['import_seconds'] * 1e3:.1f} ms",
+        "",
+        f"{'phase':<40} {'start ms':>10} {'ms':>10}",
+    ]
+    for phase in report['phases']:
+        name = '  ' * phase['depth'] + phase['name']
+        lines.append(f"{name:<40} {phase['start'] * 1e3:>10.1f} {phase['seconds'] * 1e3:>10.1f}")
+
+    lines += ["", f"{'slowest imports (self)':<40} {'self ms':>10} {'total ms':>10}"]
+    for info in report['imports'][:top]:
+        lines.append(f"{info['module']:<40} {info['self_seconds'] * 1e3:>10.1f} {info['seconds'] * 1e3:>10.1f}")
+    return '\n'.join(lines) + '\n'
+
+
+# The profiler of this process, enabled by `main()` on request
+startup = StartupProfiler()
@@ -0,0 +1,156 @@
+import tempfile
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Callable, Iterable, Literal
+
+from core.store import Cell
+from core.export import (
+    OUTPUTS, import_pyarrow, iter_long_rows,
+    write_long_csv, write_long_jsonl, write_long_parquet
+)
+
+Output = Literal['xlsx', 'csv', 'parquet', 'jsonl']
+Layout = Literal['wide', 'long']
+
+LONG_WRITERS = {
+    'csv': write_long_csv,
+    'jsonl': write_long_jsonl,
+    'parquet': write_long_parquet,
+}
+
+
+class ReportCancelled(Exception):
+    """
+    Raised when a report is cancelled while it is being generated.
+    """
+
+
+@dataclass
+class ReportSnapshot:
+    """
+    A copy of everything a report needs, taken from `Mind` so the report can be
+    generated on another thread while the app keeps writing.
+    """
+    cells: Iterable[Cell]   # a list, or CellColumns from a columnar store
+    months: list[str]
+    rollups: list[dict]
+    default_order: str
+    format: Literal['hours', 'perc'] = 'hours'
+    day_format: str = '%Y%m%d'
+
+
+def resolve_output(file: str | None, output: Output | None) -> Output:
+    """
+    Determines the output format of a report from the explicit format or the file extension.
+
+    Args:
+        file (str | None): Target file.
+        output (Output | None): Explicitly requested format.
+
+    Returns:
+        Output: The format, 'xlsx' if neither is given.
+    """
+    if output is None and file is not None:
+        suffix = Path(file).suffix.lower().lstrip('.')
+        output = 'jsonl' if suffix == 'json' else suffix # type: ignore
+    output = output or 'xlsx'
+    if output not in OUTPUTS:
+        raise ValueError(f"Unsupported report format '{output}', expected one of {OUTPUTS}")
+    return output
+
+
+def write_report(
+        snapshot: ReportSnapshot,
+        file: str | None = None,
+        progress: Callable[[int, str], None] | None = None,
+        cancelled: Callable[[], bool] | None = None,
+        output: Output | None = None,
+        layout: Layout = 'wide'
+) -> str:
+    """
+    Builds the report from a snapshot and writes it to a file.
+
+    Excel reports contain the daily table and the monthly summary. CSV, JSON Lines
+    and Parquet exports contain the daily data only; in the long layout they are
+    streamed from the cells without building the wide date-column table.
+
+    Args:
+        snapshot (ReportSnapshot): The data of the report.
+        file (str | None): Target file, a temporary file if None.
+        progress (Callable | None): Called with a percentage and a description of each step.
+        cancelled (Callable | None): Polled between the steps, the report is aborted if it returns True.
+        output (Output | None): The file format, taken from the extension of `file` if None.
+        layout (Layout): 'wide' (orders x dates) or 'long' (one row per date and order).
+
+    Returns:
+        str: The path of the written file.
+
+    Raises:
+        ReportCancelled: If `cancelled` returned True.
+    """
+    def step(percent: int, message: str):
+        if cancelled and cancelled():
+            raise ReportCancelled()
+        if progress:
+            progress(percent, message)
+
+    output = resolve_output(file, output)
+    if output == 'parquet':
+        import_pyarrow()    # fail early with a readable message
+
+    if file is None:
+        # Create a temporary file to store the report
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{output}') as tmp_file:
+            file = tmp_file.name
+
+    if layout == 'long' and output != 'xlsx':
+        step(0, "Exporting rows")
+        rows = iter_long_rows(snapshot.cells, snapshot.default_order, snapshot.format)
+        LONG_WRITERS[output](rows, file, snapshot.format)
+        step(100, "Done")
+        return file
+
+    # the analytics stack is only loaded once a table has to be built
+    import pandas as pd
+    from core.analytics import days_frame, months_frame
+
+    step(0, "Building daily table")
+    data = days_frame(snapshot.cells, snapshot.default_order, snapshot.format, snapshot.day_format)
+    if layout == 'long':
+        data = data.rename_axis('order').reset_index().melt(id_vars='order', var_name='date')
+
+    if output != 'xlsx':
+        step(60, "Writing file")
+        if output == 'csv':
+            data.to_csv(file, index=layout == 'wide')
+        elif output == 'jsonl':
+            if layout == 'wide':
+                data = data.rename_axis('order').reset_index()
+            data.to_json(file, orient='records', lines=True)
+        else:
+            data.to_parquet(file, index=layout == 'wide')
+        step(100, "Done")
+        return file
+
+    step(40, "Building monthly summary")
+    summary = months_frame(snapshot.months, snapshot.rollups)
+
+    step(60, "Writing workbook")
+    # Save the daily table and the monthly summary to an Excel file
+    with pd.ExcelWriter(file) as writer:
+        data.to_excel(writer, sheet_name='Days', index=layout == 'wide')
+        summary.to_excel(writer, sheet_name='Months')
+
+    step(100, "Done")
+    return file
+
+
+def open_file(file: str):
+    """
+    Opens a report in the default application (via the web browser).
+
+    Args:
+        file (str): The path of the report.
+    """
+    import webbrowser
+    webbrowser.open(f'file://{file}')
@@ -0,0 +1,196 @@
+import math
+from typing import Iterable
+
+from core.store import Cell, DayStore
+
+MONTHS_KEY = 'rollup:months'
+ORDER_PREFIX = 'rollup:order:'
+LAYOUT_KEY = 'rollup:layout'
+# version 1 kept all order totals in a single `rollup:orders` record
+LAYOUT = 2
+LEGACY_ORDERS_KEY = 'rollup:orders'
+
+
+def _month_key(month: str) -> str:
+    return f'rollup:{month}'
+
+
+def _order_key(name: str) -> str:
+    return f'{ORDER_PREFIX}{name}'
+
+
+def _empty_month() -> dict:
+    return {'seconds': 0.0, 'days': 0, 'orders': {}}
+
+
+class Rollups:
+    """
+    Per-month and per-order totals, maintained incrementally on every day write.
+
+    The rollups live in the store's meta records:
+    - `rollup:YYYYMM`: `{'seconds': total, 'days': days worked, 'orders': {order: seconds}}`
+    - `rollup:order:<order>`: seconds of the order over the whole history
+    - `rollup:months`: sorted list of the months that have a rollup
+    - `rollup:layout`: version of this layout
+
+    Every order has its own record, so a write only journals the orders it touched.
+    Month records are loaded lazily, so a report only reads the months it needs.
+    """
+
+    def __init__(self, store: DayStore):
+        """
+        Args:
+            store (DayStore): The store holding the raw days and the rollup records.
+        """
+        self.store = store
+        self._months: dict[str, dict] = {}
+        self._month_index: list[str] | None = None
+        self._orders: dict[str, float] | None = None
+
+    def exists(self) -> bool:
+        """
+        Returns True if the rollups were built for this store.
+        """
+        return self.store.get_meta(LAYOUT_KEY) == LAYOUT and self.store.get_meta(MONTHS_KEY) is not None
+
+    def months(self) -> list[str]:
+        """
+        Returns the months (YYYYMM) that have data, in chronological order.
+        """
+        if self._month_index is None:
+            self._month_index = self.store.get_meta(MONTHS_KEY) or []
+        return self._month_index
+
+    def month(self, month: str) -> dict:
+        """
+        Returns the rollup of a month (YYYYMM).
+        """
+        if month not in self._months:
+            self._months[month] = self.store.get_meta(_month_key(month)) or _empty_month()
+        return self._months[month]
+
+    def orders(self) -> dict[str, float]:
+        """
+        Returns the total seconds per order over the whole history.
+        """
+        if self._orders is None:
+            self._orders = {
+                key[len(ORDER_PREFIX):]: seconds for key, seconds in self.store.iter_meta(ORDER_PREFIX)
+            }
+        return self._orders
+
+    def apply(self, previous: dict | None, document: dict):
+        """
+        Replaces the contribution of a day's previous document by the new one
+        and persists the touched rollup records.
+
+        The rollups are kept by order name and in seconds, they feed the reports
+        and the suggestions.
+
+        Args:
+            previous (dict | None): The day document as stored before the write.
+            document (dict): The day document as stored after the write.
+        """
+        month = document['day'][:6]
+        rollup = self.month(month)
+        orders = self.orders()
+        touched = set()
+
+        for sign, doc in ((-1, previous), (1, document)):
+            if not doc:
+                continue
+            rollup['seconds'] += sign * doc.get('elapsed', 0) / 1_000
+            rollup['days'] += sign * _worked(doc)
+            for order, ms in doc.get('orders', {}).items():
+                name = self.store.order_name(order)
+                rollup['orders'][name] = rollup['orders'].get(name, 0.0) + sign * ms / 1_000
+                orders[name] = orders.get(name, 0.0) + sign * ms / 1_000
+                touched.add(name)
+
+        self.store.put_meta(_month_key(month), rollup)
+        for name in sorted(touched):
+            self.store.put_meta(_order_key(name), orders[name])
+        if month not in self.months():
+            self._month_index = sorted(self.months() + [month])
+            self.store.put_meta(MONTHS_KEY, self._month_index)
+
+    def rebuild(self, cells: Iterable[Cell]):
+        """
+        Recomputes and persists all rollups from the raw cells of the store.
+
+        Args:
+            cells (Iterable[Cell]): All cells as returned by `DayStore.iter_cells`.
+        """
+        months, orders = _aggregate(cells)
+        # records of orders that no longer have any time are zeroed, the store cannot delete them
+        for key, _ in self.store.iter_meta(ORDER_PREFIX):
+            orders.setdefault(key[len(ORDER_PREFIX):], 0.0)
+        for month, rollup in months.items():
+            self.store.put_meta(_month_key(month), rollup)
+        for name, seconds in orders.items():
+            self.store.put_meta(_order_key(name), seconds)
+        self.store.put_meta(MONTHS_KEY, sorted(months))
+        if self.store.get_meta(LEGACY_ORDERS_KEY) is not None:
+            self.store.put_meta(LEGACY_ORDERS_KEY, None)
+        self.store.put_meta(LAYOUT_KEY, LAYOUT)
+
+        self._months = months
+        self._month_index = sorted(months)
+        self._orders = orders
+
+    def check(self, cells: Iterable[Cell]) -> bool:
+        """
+        Verifies the persisted rollups against the raw cells.
+
+        Args:
+            cells (Iterable[Cell]): All cells as returned by `DayStore.iter_cells`.
+
+        Returns:
+            bool: True if every rollup matches the raw data.
+        """
+        months, orders = _aggregate(cells)
+        if sorted(months) != self.months() or not _close(orders, self.orders()):
+            return False
+        for month, expected in months.items():
+            rollup = self.month(month)
+            if (rollup['days'] != expected['days']
+                    or not math.isclose(rollup['seconds'], expected['seconds'], abs_tol=1e-3)
+                    or not _close(expected['orders'], rollup['orders'])):
+                return False
+        return True
+
+
+def _worked(document: dict) -> int:
+    """
+    Returns 1 if any time was recorded on the day, else 0.
+    """
+    return int(bool(document.get('elapsed', 0) or any(document.get('orders', {}).values())))
+
+
+def _close(expected: dict[str, float], actual: dict[str, float]) -> bool:
+    """
+    Compares two order totals, ignoring orders whose total is (close to) zero.
+    """
+    keys = {k for k, v in expected.items() if abs(v) > 1e-3} | {k for k, v in actual.items() if abs(v) > 1e-3}
+    return all(math.isclose(expected.get(k, 0.0), actual.get(k, 0.0), abs_tol=1e-3) for k in keys)
+
+
+def _aggregate(cells: Iterable[Cell]) -> tuple[dict[str, dict], dict[str, float]]:
+    """
+    Aggregates raw cells into month rollups and order totals.
+    """
+    months: dict[str, dict] = {}
+    orders: dict[str, float] = {}
+    worked: set[str] = set()
+
+    for day, order, seconds in cells:
+        rollup = months.setdefault(day[:6], _empty_month())
+        if order is None:
+            rollup['seconds'] += seconds
+        else:
+            rollup['orders'][order] = rollup['orders'].get(order, 0.0) + seconds
+            orders[order] = orders.get(order, 0.0) + seconds
+        if seconds and day not in worked:
+            worked.add(day)
+            rollup['days'] += 1
+    return months, orders
@@ -0,0 +1,103 @@
+import bisect
+from itertools import accumulate
+from typing import Iterable
+
+
+class SubstringIndex:
+    """
+    Case-insensitive substring search over the order names of the completer.
+
+    The names are casefolded once and kept, in sorted order, in a single
+    newline-separated buffer. A query is then a loop of `str.find` calls over
+    that buffer, which yields the matches already sorted and stops after `limit`
+    of them; the line of a hit is found by bisecting the line offsets.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        """
+        Args:
+            names (Iterable[str]): The initial names.
+        """
+        self.names: list[str] = sorted(set(names))
+        folded = [_fold(name) for name in self.names]
+        self._buffer = '\n'.join(folded)
+        # offset of the first character of every name
+        self._starts = [0, *accumulate(len(name) + 1 for name in folded[:-1])] if folded else []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        position = bisect.bisect_left(self.names, name)
+        return position < len(self.names) and self.names[position] == name
+
+    def add(self, name: str) -> bool:
+        """
+        Adds a name, in O(#names).
+
+        Args:
+            name (str): The name.
+
+        Returns:
+            bool: True if the name was new.
+        """
+        if name in self:
+            return False
+        position = bisect.bisect_left(self.names, name)
+        self.names.insert(position, name)
+
+        folded = _fold(name)
+        if len(self.names) == 1:
+            self._buffer, self._starts = folded, [0]
+            return True
+        if position < len(self._starts):
+            offset = self._starts[position]
+            self._buffer = f'{self._buffer[:offset]}{folded}\n{self._buffer[offset:]}'
+        else:
+            offset = len(self._buffer) + 1
+            self._buffer = f'{self._buffer}\n{folded}'
+        shift = len(folded) + 1
+        self._starts[position:] = [offset, *(start + shift for start in self._starts[position:])]
+        return True
+
+    def search(self, text: str, limit: int | None = None) -> list[str]:
+        """
+        Returns the names containing `text` (case-insensitive), sorted.
+
+        Args:
+            text (str): The query, matched literally.
+            limit (int | None): Maximum number of names returned, all if None.
+        """
+        query = text.casefold()
+        if not query:
+            return self.names[:limit]
+        if '\n' in query or not self.names:
+            return []
+
+        buffer, starts = self._buffer, self._starts
+        matches = []
+        position = buffer.find(query)
+        while position != -1:
+            line = bisect.bisect_right(starts, position) - 1
+            matches.append(self.names[line])
+            if limit is not None and len(matches) >= limit:
+                break
+            if line + 1 == len(starts):
+                break
+            position = buffer.find(query, starts[line + 1])
+        return matches
+
+
+def _fold(name: str) -> str:
+    """
+    Casefolds a name for the search buffer, where newlines separate the names.
+    """
+    return name.casefold().replace('\n', ' ')
+
+
+def max_distance_for(query: str, max_distance: int = 2) -> int:
+    """
+    Returns the number of typos tolerated for a query: none below 3 characters,
+    one up to 5 characters and `max_distance` from 6 characters on.
+    """
+    return min(max_distance, len(query) // 3)
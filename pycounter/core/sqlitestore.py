@@ -0,0 +1,265 @@
+import sys
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from config import AppConfig, yaml_config_loader
+from core.store import Cell, DayStore, read_tinydb_days, to_ms
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    id INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL,
+    day TEXT NOT NULL,
+    elapsed REAL NOT NULL DEFAULT 0,
+    UNIQUE (collection, day)
+);
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS day_order_seconds (
+    day_id INTEGER NOT NULL REFERENCES days (id) ON DELETE CASCADE,
+    order_id INTEGER NOT NULL REFERENCES orders (id),
+    seconds REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day_id, order_id)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    collection TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (collection, key)
+);
+CREATE INDEX IF NOT EXISTS idx_days_day ON days (day);
+CREATE INDEX IF NOT EXISTS idx_day_order_seconds_order ON day_order_seconds (order_id);
+"""
+
+
+class SQLiteStore(DayStore):
+    """
+    Stores the day documents in a normalized SQLite database.
+
+    Days, orders and the seconds per day and order live in separate indexed tables,
+    so lookups, range queries and aggregations are done by SQLite instead of loops
+    over all documents. The database runs in WAL mode.
+
+    The `orders` table is the order dictionary, its row ids are the order ids of the
+    day documents. Durations are kept in seconds (REAL) in the tables and converted
+    to the milliseconds of the documents on the way in and out.
+    """
+
+    def __init__(self, config: AppConfig):
+        """
+        Opens (or creates) the SQLite database configured in `config.mind`.
+
+        If the database does not exist yet but a TinyDB file with the same name
+        does, its content is migrated first.
+
+        Args:
+            config (AppConfig): Application configuration with DB details.
+        """
+        self.path = Path(config.mind.Database)
+        self.collection = config.mind.collection
+
+        legacy = self.path.with_suffix('.json')
+        is_new = not self.path.exists()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # the connection is shared with the persistence worker, access is serialized by Mind
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute('PRAGMA foreign_keys=ON')
+        self.connection.executescript(SCHEMA)
+        self._depth = 0  # Nesting level of open transactions
+        self._added: list[str] = []  # Order names cached inside the open transaction
+
+        if is_new and legacy.exists():
+            migrate_tinydb(legacy, self.connection)
+
+        # Cache of the order dictionary (id -> name / name -> id)
+        self.names: dict[int, str] = dict(self.connection.execute('SELECT id, name FROM orders'))
+        self.ids: dict[str, int] = {name: order for order, name in self.names.items()}
+
+    def order_id(self, name: str) -> int:
+        if name not in self.ids:
+            with self.transaction():
+                self.connection.execute('INSERT OR IGNORE INTO orders (name) VALUES (?)', (name,))
+                order = self.connection.execute('SELECT id FROM orders WHERE name = ?', (name,)).fetchone()[0]
+                self.ids[name] = order
+                self.names[order] = name
+                self._added.append(name)
+        return self.ids[name]
+
+    def order_name(self, order_id: int) -> str:
+        if order_id not in self.names:
+            # added by another connection
+            self.names[order_id] = self.connection.execute(
+                'SELECT name FROM orders WHERE id = ?', (order_id,)
+            ).fetchone()[0]
+        return self.names[order_id]
+
+    def get_day(self, day: str) -> dict | None:
+        row = self.connection.execute(
+            'SELECT id, elapsed FROM days WHERE collection = ? AND day = ?',
+            (self.collection, day)
+        ).fetchone()
+        if row is None:
+            return None
+
+        document = {'day': day, 'elapsed': to_ms(row[1])}
+        orders = self.connection.execute(
+            'SELECT order_id, seconds FROM day_order_seconds WHERE day_id = ?',
+            (row[0],)
+        ).fetchall()
+        if orders:
+            document['orders'] = {order: to_ms(seconds) for order, seconds in orders}
+        return document
+
+    @contextmanager
+    def transaction(self):
+        self._depth += 1
+        try:
+            yield
+        except BaseException:
+            if self._depth == 1:
+                self.connection.rollback()
+                # the ids inserted by the transaction are gone
+                for name in self._added:
+                    self.names.pop(self.ids.pop(name), None)
+                self._added.clear()
+            raise
+        finally:
+            self._depth -= 1
+        if not self._depth:
+            self.connection.commit()
+            self._added.clear()
+
+    def put_day(self, document: dict):
+        with self.transaction():
+            day_id = _put_elapsed(self.connection, self.collection, document['day'], document.get('elapsed', 0) / 1_000)
+            self.connection.executemany(
+                'INSERT INTO day_order_seconds (day_id, order_id, seconds) VALUES (?, ?, ?) '
+                'ON CONFLICT (day_id, order_id) DO UPDATE SET seconds = excluded.seconds',
+                [(day_id, order, ms / 1_000) for order, ms in document.get('orders', {}).items()]
+            )
+
+    def order_names(self) -> set[str]:
+        rows = self.connection.execute(
+            'SELECT DISTINCT o.name FROM orders o '
+            'JOIN day_order_seconds s ON s.order_id = o.id '
+            'JOIN days d ON d.id = s.day_id WHERE d.collection = ?',
+            (self.collection,)
+        )
+        return {name for (name,) in rows}
+
+    def iter_cells(self, start: str | None = None, end: str | None = None) -> Iterator[Cell]:
+        rows = self.connection.execute(
+            'SELECT day, NULL, elapsed, 0 FROM days '
+            'WHERE collection = :collection AND day BETWEEN :start AND :end '
+            'UNION ALL '
+            'SELECT d.day, o.name, s.seconds, 1 FROM day_order_seconds s '
+            'JOIN days d ON d.id = s.day_id JOIN orders o ON o.id = s.order_id '
+            'WHERE d.collection = :collection AND d.day BETWEEN :start AND :end '
+            'ORDER BY 1, 4',
+            {'collection': self.collection, 'start': start or '', 'end': end or '99999999'}
+        )
+        for day, order, seconds, _ in rows:
+            yield day, order, seconds
+
+    def get_meta(self, key: str):
+        row = self.connection.execute(
+            'SELECT value FROM meta WHERE collection = ? AND key = ?',
+            (self.collection, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_meta(self, key: str, value):
+        with self.transaction():
+            self.connection.execute(
+                'INSERT INTO meta (collection, key, value) VALUES (?, ?, ?) '
+                'ON CONFLICT (collection, key) DO UPDATE SET value = excluded.value',
+                (self.collection, key, json.dumps(value))
+            )
+
+    def iter_meta(self, prefix: str) -> Iterator[tuple[str, object]]:
+        rows = self.connection.execute(
+            'SELECT key, value FROM meta WHERE collection = ? AND substr(key, 1, ?) = ? ORDER BY key',
+            (self.collection, len(prefix), prefix)
+        )
+        for key, value in rows.fetchall():
+            yield key, json.loads(value)
+
+    def close(self):
+        self.connection.close()
+
+
+def _put_elapsed(connection: sqlite3.Connection, collection: str, day: str, seconds: float) -> int:
+    """
+    Inserts or replaces the elapsed time of a day, without committing.
+
+    Returns:
+        int: The row id of the day.
+    """
+    return connection.execute(
+        'INSERT INTO days (collection, day, elapsed) VALUES (?, ?, ?) '
+        'ON CONFLICT (collection, day) DO UPDATE SET elapsed = excluded.elapsed RETURNING id',
+        (collection, day, seconds)
+    ).fetchone()[0]
+
+
+def _put_day(connection: sqlite3.Connection, collection: str, document: dict):
+    """
+    Inserts or replaces a day document with order names and seconds (the legacy
+    format, see `decode_day`) of a collection, without committing.
+    """
+    day_id = _put_elapsed(connection, collection, document['day'], document.get('elapsed', 0.0))
+
+    orders = document.get('orders', {})
+    if not isinstance(orders, dict) or not orders:
+        return
+
+    connection.executemany(
+        'INSERT OR IGNORE INTO orders (name) VALUES (?)',
+        [(order,) for order in orders]
+    )
+    connection.executemany(
+        'INSERT INTO day_order_seconds (day_id, order_id, seconds) '
+        'SELECT ?, id, ? FROM orders WHERE name = ? '
+        'ON CONFLICT (day_id, order_id) DO UPDATE SET seconds = excluded.seconds',
+        [(day_id, seconds, order) for order, seconds in orders.items()]
+    )
+
+
+def migrate_tinydb(source: str | Path, connection: sqlite3.Connection) -> int:
+    """
+    Copies all collections of a TinyDB JSON file into a SQLite database.
+
+    Args:
+        source (str | Path): Path to the TinyDB JSON file.
+        connection (sqlite3.Connection): Connection to a database with the schema applied.
+
+    Returns:
+        int: The number of migrated day documents.
+    """
+    migrated = 0
+    with connection:
+        for collection, documents in read_tinydb_days(source).items():
+            for document in documents:
+                _put_day(connection, collection, document)
+                migrated += 1
+    return migrated
+
+
+if __name__ == '__main__':
+    # Usage: python core/sqlitestore.py <config.yaml>
+    # Migrates the configured TinyDB file into the SQLite database next to it.
+    app_config = yaml_config_loader(sys.argv[1] if len(sys.argv) > 1 else 'pycounter/config.yaml')
+    target = Path(app_config.mind.Database).with_suffix('.sqlite3')
+    db = sqlite3.connect(target)
+    db.executescript(SCHEMA)
+    count = migrate_tinydb(Path(app_config.mind.Database).with_suffix('.json'), db)
+    db.close()
+    print(f"Migrated {count} days into {target}")
@@ -0,0 +1,300 @@
+import json
+from pathlib import Path
+from dataclasses import dataclass
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+from config import AppConfig
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# A cell of the day x order table: (day id, order name or None for the day total, seconds)
+Cell = tuple[str, str | None, float]
+
+# Name of the report row holding the total elapsed time of a day
+TOTAL_ROW = 'total elapsed'
+
+
+def to_ms(seconds: float) -> int:
+    """
+    Converts seconds into the integer milliseconds stored in the day documents.
+    """
+    return round(seconds * 1_000)
+
+
+def encode_day(document: dict, order_id: Callable[[str], int]) -> dict:
+    """
+    Converts a day document with order names and seconds (the legacy format)
+    into the stored format with order ids and milliseconds.
+
+    Args:
+        document (dict): `{'day': 'YYYYMMDD', 'elapsed': seconds, 'orders': {order name: seconds}}`.
+        order_id (Callable): Returns the id of an order name, e.g. `DayStore.order_id`.
+
+    Returns:
+        dict: `{'day': 'YYYYMMDD', 'elapsed': ms, 'orders': {order id: ms}}`.
+    """
+    encoded = {'day': document['day'], 'elapsed': to_ms(document.get('elapsed', 0.0))}
+    orders = document.get('orders', {})
+    if isinstance(orders, dict) and orders:
+        encoded['orders'] = {order_id(order): to_ms(seconds) for order, seconds in orders.items()}
+    return encoded
+
+
+def decode_day(document: dict, order_name: Callable[[int], str]) -> dict:
+    """
+    Converts a stored day document back into order names and seconds, see `encode_day`.
+
+    Args:
+        document (dict): The stored day document.
+        order_name (Callable): Returns the name of an order id, e.g. `DayStore.order_name`.
+
+    Returns:
+        dict: `{'day': 'YYYYMMDD', 'elapsed': seconds, 'orders': {order name: seconds}}`.
+    """
+    decoded = {'day': document['day'], 'elapsed': document.get('elapsed', 0) / 1_000}
+    if document.get('orders'):
+        decoded['orders'] = {order_name(order): ms / 1_000 for order, ms in document['orders'].items()}
+    return decoded
+
+
+@dataclass
+class CellColumns:
+    """
+    The cells of a range of days as arrays, as provided by columnar backends.
+
+    Iterating yields the same cells as `DayStore.iter_cells`, while the analytics
+    aggregate the arrays directly without building a tuple per cell.
+    """
+    days: list[str]       # The day ids, sorted
+    orders: list[str]     # The order names, indexed by `order`
+    day: 'np.ndarray'     # Index into `days` of every cell
+    order: 'np.ndarray'   # Index into `orders` of every cell, -1 for the day total
+    seconds: 'np.ndarray' # Seconds of every cell
+
+    def __len__(self) -> int:
+        return len(self.seconds)
+
+    def __iter__(self) -> Iterator[Cell]:
+        days, orders = self.days, self.orders
+        for day, order, seconds in zip(self.day.tolist(), self.order.tolist(), self.seconds.tolist()):
+            yield days[day], orders[order] if order >= 0 else None, seconds
+
+
+class DayStore:
+    """
+    Base class of the storage backends used by `Mind`.
+
+    A backend stores one document per day of the shape
+    `{'day': 'YYYYMMDD', 'elapsed': ms, 'orders': {order id: ms}}`: durations are
+    integer milliseconds and the order names are interned into integer ids by a
+    persistent dictionary of the backend (`order_id` / `order_name`). Names and
+    seconds only appear in the cells read by reports (`iter_cells`).
+    """
+
+    def order_id(self, name: str) -> int:
+        """
+        Returns the id of an order name, adding the name to the dictionary if it is new.
+
+        Args:
+            name (str): The order name.
+        """
+        raise NotImplementedError
+
+    def order_name(self, order_id: int) -> str:
+        """
+        Returns the name of an order id.
+
+        Args:
+            order_id (int): An id returned by `order_id`.
+        """
+        raise NotImplementedError
+
+    def get_day(self, day: str) -> dict | None:
+        """
+        Returns the stored document of a day, or None if nothing is stored for it.
+
+        Args:
+            day (str): The day id (YYYYMMDD).
+        """
+        raise NotImplementedError
+
+    def put_day(self, document: dict):
+        """
+        Inserts or replaces the document of a day.
+
+        Args:
+            document (dict): The complete day document, the store takes ownership of it.
+        """
+        raise NotImplementedError
+
+    def order_names(self) -> set[str]:
+        """
+        Returns all order names that were ever pushed.
+        """
+        raise NotImplementedError
+
+    def iter_cells(self, start: str | None = None, end: str | None = None) -> Iterator[Cell]:
+        """
+        Iterates over the stored durations in long format, sorted by day.
+
+        For every day the total elapsed time comes first (order None), followed by
+        the seconds of each order worked on that day (by order name).
+
+        Args:
+            start (str | None): First day id to include, unbounded if None.
+            end (str | None): Last day id to include, unbounded if None.
+        """
+        raise NotImplementedError
+
+    def cells(self, start: str | None = None, end: str | None = None) -> Iterable[Cell]:
+        """
+        Returns a copy of the cells of a range of days (see `iter_cells`) that stays
+        valid while the store is written.
+
+        Args:
+            start (str | None): First day id to include, unbounded if None.
+            end (str | None): Last day id to include, unbounded if None.
+        """
+        return list(self.iter_cells(start, end))
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups the writes inside the context into a single commit.
+        """
+        yield
+
+    def get_meta(self, key: str):
+        """
+        Returns a JSON-serializable meta record (e.g. a rollup), or None if it does not exist.
+
+        Args:
+            key (str): The name of the record.
+        """
+        raise NotImplementedError
+
+    def put_meta(self, key: str, value):
+        """
+        Inserts or replaces a meta record.
+
+        Args:
+            key (str): The name of the record.
+            value: Any JSON-serializable value.
+        """
+        raise NotImplementedError
+
+    def iter_meta(self, prefix: str) -> Iterator[tuple[str, object]]:
+        """
+        Yields the meta records whose name starts with a prefix, sorted by name.
+
+        Args:
+            prefix (str): The common start of the record names.
+
+        Yields:
+            tuple: (name, value) of each matching record.
+        """
+        raise NotImplementedError
+
+    def reload(self):
+        """
+        Re-reads the database after another process wrote to it.
+
+        Backends that keep no state in memory need not do anything.
+        """
+
+    def close(self):
+        """
+        Releases the underlying database.
+        """
+
+
+def open_store(config: AppConfig) -> DayStore:
+    """
+    Opens the storage backend selected by `config.mind.backend`.
+
+    The backend modules are imported here, so only the selected one is loaded.
+
+    Args:
+        config (AppConfig): Application configuration with DB details.
+
+    Returns:
+        DayStore: The opened backend.
+    """
+    if config.mind.backend == 'sqlite':
+        from core.sqlitestore import SQLiteStore
+        return SQLiteStore(config)
+    if config.mind.backend == 'columnar':
+        from core.columnstore import ColumnStore
+        return ColumnStore(config)
+    from core.tinydbstore import TinyDBStore
+    return TinyDBStore(config)
+
+
+def read_tinydb_tables(source: str | Path) -> dict[str, dict]:
+    """
+    Reads all tables of a TinyDB JSON file, replaying its journal if it has one.
+
+    Args:
+        source (str | Path): Path to the TinyDB JSON file.
+
+    Returns:
+        dict[str, dict]: Table name -> {doc id: document}.
+    """
+    if Path(source).with_suffix('.journal').exists():
+        # a journal-backed database, replay the journal on top of the snapshot
+        from core.journal import JournalStorage
+        storage = JournalStorage(str(source))
+        tables = storage.read() or {}
+        storage.close()
+        return tables
+    with Path(source).open('r', encoding='utf-8') as file:
+        content = file.read()
+    return json.loads(content) if content.strip() else {}
+
+
+def read_tinydb_days(source: str | Path) -> dict[str, list[dict]]:
+    """
+    Reads the day documents of all collections of a TinyDB file, in the legacy
+    format with order names and seconds (see `decode_day`).
+
+    Both the legacy files and the files written by `TinyDBStore` are understood.
+
+    Args:
+        source (str | Path): Path to the TinyDB JSON file.
+
+    Returns:
+        dict[str, list[dict]]: Collection name -> day documents.
+    """
+    tables = read_tinydb_tables(source)
+    collections = {}
+    for name, table in tables.items():
+        documents = [document for document in table.values() if document.get('day')]
+        if not documents:
+            continue
+        names = tables.get(f'{name}.orders', {})
+        collections[name] = [
+            decode_day(record_to_day(document), lambda order: names[str(order)]['name'])
+            if 'ms' in document else document
+            for document in documents
+        ]
+    return collections
+
+
+def record_to_day(record: dict) -> dict:
+    """
+    Converts a TinyDB record `{'day', 'ms', 'orders': {'<order id>': ms}}` into a day document.
+    """
+    document = {'day': record['day'], 'elapsed': record['ms']}
+    if record.get('orders'):
+        document['orders'] = {int(order): ms for order, ms in record['orders'].items()}
+    return document
+
+
+def day_to_record(document: dict) -> dict:
+    """
+    Converts a day document into a TinyDB record, see `record_to_day`.
+    """
+    orders = document.get('orders', {})
+    return {'day': document['day'], 'ms': document.get('elapsed', 0), 'orders': {str(order): ms for order, ms in orders.items()}}
@@ -0,0 +1,271 @@
+import math
+import heapq
+import bisect
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+from core.store import DayStore
+
+ORDER_PREFIX = 'suggestions:order:'
+LAYOUT_KEY = 'suggestions:layout'
+# version 1 kept the names in `suggestions:orders` and the statistics in `suggestions:frecency`
+LAYOUT = 2
+LEGACY_NAMES_KEY = 'suggestions:orders'
+LEGACY_FRECENCY_KEY = 'suggestions:frecency'
+
+
+def _order_key(name: str) -> str:
+    return f'{ORDER_PREFIX}{name}'
+
+
+class SuggestionIndex:
+    """
+    Sorted index of all order names, the source of the project completer.
+
+    Every order has its own meta record `suggestions:order:<order>`, so the index is
+    loaded in O(#orders) instead of scanning the orders of every day, and a save only
+    writes the orders that changed. New names are inserted with bisect and announced
+    to the `listeners`, which receive the name and its position in the sorted list.
+
+    The record of an order holds its push statistics `[score, last push]`, or None if
+    it was never pushed. The score decays by half every `half_life` seconds. The `recent_size` most
+    recently pushed orders are kept in a bounded LRU, `hot()` returns them ranked by
+    frecency (how often and how recently they were pushed).
+    """
+
+    def __init__(self, store: DayStore, recent_size: int = 50, half_life: float = 14 * 24 * 60 * 60):
+        """
+        Args:
+            store (DayStore): The store holding the index record.
+            recent_size (int): Capacity of the recently pushed orders.
+            half_life (float): Seconds after which a push counts half.
+        """
+        self.store = store
+        self.recent_size = recent_size
+        self.half_life = half_life
+        self.listeners: list[Callable[[str, int], None]] = []
+        self._names: list[str] | None = None
+        self._stats: dict[str, list[float]] | None = None
+        self._changed: set[str] = set()  # Names whose record is not saved yet
+        self._unsaved: list[tuple[str, float]] = []  # Pushes counted since the last save
+        self._recent: OrderedDict[str, None] | None = None
+        self._hot: list[str] | None = None
+
+    def exists(self) -> bool:
+        """
+        Returns True if the index was built for this store.
+        """
+        return self.store.get_meta(LAYOUT_KEY) == LAYOUT
+
+    def read(self) -> list[tuple[str, list[float] | None]]:
+        """
+        Reads the order records from the store, as (meta key, record), for `reload`.
+        """
+        return list(self.store.iter_meta(ORDER_PREFIX))
+
+    def _load(self, records: list[tuple[str, list[float] | None]] | None = None):
+        """
+        Sets the names and the push statistics from the order records, read from the store if None.
+        """
+        self._names, self._stats = [], {}
+        for key, stats in self.read() if records is None else records:
+            name = key[len(ORDER_PREFIX):]
+            self._names.append(name)
+            if stats:
+                self._stats[name] = stats
+
+    def names(self) -> list[str]:
+        """
+        Returns all order names in sorted order.
+        """
+        if self._names is None:
+            self._load()
+        return self._names
+
+    def __contains__(self, name: str) -> bool:
+        names = self.names()
+        position = bisect.bisect_left(names, name)
+        return position < len(names) and names[position] == name
+
+    def add(self, name: str) -> bool:
+        """
+        Inserts a name and notifies the listeners, the index is persisted by `save`.
+
+        Args:
+            name (str): The order name.
+
+        Returns:
+            bool: True if the name was new.
+        """
+        if not name or name in self:
+            return False
+        position = bisect.bisect_left(self.names(), name)
+        self.names().insert(position, name)
+        self._changed.add(name)
+        for listener in self.listeners:
+            listener(name, position)
+        return True
+
+    def stats(self) -> dict[str, list[float]]:
+        """
+        Returns the push statistics, `{order: [decayed push count, time of the last push]}`.
+        """
+        if self._stats is None:
+            self._load()
+        return self._stats
+
+    def frecency(self, name: str) -> float:
+        """
+        Returns the rank of an order, higher is better.
+
+        The decayed scores of two orders keep their ratio over time, so comparing
+        `log2(score) + last / half_life` ranks them as of any later point in time.
+
+        Args:
+            name (str): The order name.
+        """
+        stats = self.stats().get(name)
+        if not stats:
+            return -math.inf
+        score, last = stats
+        return math.log2(score) + last / self.half_life
+
+    def record(self, name: str, when: float):
+        """
+        Counts a push of an order, adding it to the index if it is new.
+
+        Args:
+            name (str): The order name.
+            when (float): The time of the push (seconds since the epoch).
+        """
+        if not name:
+            return
+
+        self._count(name, when)
+        self._unsaved.append((name, when))
+        self._changed.add(name)
+
+        recent = self.recent()
+        recent[name] = None
+        recent.move_to_end(name)
+        if len(recent) > self.recent_size:
+            recent.popitem(last=False)
+        self._hot = None
+
+        self.add(name)
+
+    def _count(self, name: str, when: float):
+        stats = self.stats()
+        score, last = stats.get(name, (0.0, when))
+        stats[name] = [score * 0.5 ** (max(when - last, 0.0) / self.half_life) + 1.0, max(when, last)]
+
+    def recent(self) -> OrderedDict[str, None]:
+        """
+        Returns the LRU of the recently pushed orders, the most recent last.
+
+        It is filled from the top `recent_size` orders by frecency on first use.
+        """
+        if self._recent is None:
+            stats = self.stats()
+            top = heapq.nlargest(self.recent_size, stats, key=self.frecency)
+            self._recent = OrderedDict.fromkeys(sorted(top, key=lambda name: stats[name][1]))
+        return self._recent
+
+    def hot(self) -> list[str]:
+        """
+        Returns the recently pushed orders ranked by frecency, the best first.
+        """
+        if self._hot is None:
+            self._hot = sorted(self.recent(), key=self.frecency, reverse=True)
+        return self._hot
+
+    def save(self):
+        """
+        Persists the records of the orders that were added or pushed since the last save.
+        """
+        changes, pushes = self.changes()
+        self.write(changes)
+        self.saved(changes, pushes)
+
+    def changes(self) -> tuple[dict[str, list[float] | None], int]:
+        """
+        Copies the records to persist, so they can be written without holding the
+        lock that guards this index. Nothing is marked saved before `saved`.
+
+        Returns:
+            tuple: The records by order name and the number of pushes they include.
+        """
+        stats = self.stats()
+        changes = {name: list(stats[name]) if name in stats else None for name in sorted(self._changed)}
+        return changes, len(self._unsaved)
+
+    def write(self, changes: dict[str, list[float] | None]):
+        """
+        Writes records returned by `changes` to the store.
+
+        Args:
+            changes (dict): The records by order name.
+        """
+        for name, record in changes.items():
+            self.store.put_meta(_order_key(name), record)
+
+    def saved(self, changes: dict[str, list[float] | None], pushes: int):
+        """
+        Marks the records returned by `changes` as persisted. Orders pushed again
+        since then stay changed.
+
+        Args:
+            changes (dict): The records that were written.
+            pushes (int): The number of pushes they include.
+        """
+        stats = self.stats()
+        for name, record in changes.items():
+            if (list(stats[name]) if name in stats else None) == record:
+                self._changed.discard(name)
+        del self._unsaved[:pushes]
+
+    def reload(self, records: list[tuple[str, list[float] | None]] | None = None):
+        """
+        Re-reads the index after another process changed it, keeping the names
+        and pushes of this process that are not saved yet. The listeners are
+        notified of the names the other process added, as by `add`.
+
+        Args:
+            records (list | None): The order records as returned by `read`, read from the store if None.
+        """
+        known = set(self._names) if self._names is not None else None
+        self._load(records)
+        local = self._changed.difference(self._names)
+        if local:
+            self._names = sorted(set(self._names) | local)
+        for name, when in self._unsaved:
+            self._count(name, when)
+        self._hot = None
+
+        if known is not None:
+            # in ascending order every name is inserted at its final position
+            for position, name in enumerate(self._names):
+                if name not in known:
+                    for listener in self.listeners:
+                        listener(name, position)
+
+    def rebuild(self, names: Iterable[str]):
+        """
+        Replaces and persists the index, keeping the statistics of an index
+        stored in the previous layout.
+
+        Args:
+            names (Iterable[str]): All order names.
+        """
+        legacy = self.store.get_meta(LEGACY_FRECENCY_KEY) or {}
+        self._load()
+        self._stats.update(legacy)
+        self._names = sorted(set(names) | set(self._names) | set(legacy)
+                             | set(self.store.get_meta(LEGACY_NAMES_KEY) or []))
+        self._changed = set(self._names)
+        self._recent = self._hot = None
+        self.save()
+        for key in (LEGACY_NAMES_KEY, LEGACY_FRECENCY_KEY):
+            if self.store.get_meta(key) is not None:
+                self.store.put_meta(key, None)
+        self.store.put_meta(LAYOUT_KEY, LAYOUT)
@@ -0,0 +1,255 @@
+import os
+import copy
+import json
+import bisect
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Iterator
+from tinydb import TinyDB
+from tinydb.middlewares import Middleware
+from tinydb.storages import Storage
+
+from config import AppConfig
+from core.journal import JournalStorage
+from core.store import Cell, DayStore, encode_day, day_to_record, record_to_day
+
+
+class BatchMiddleware(Middleware):
+    """
+    A TinyDB middleware that merges all writes inside `batch()` into a single
+    write of the underlying storage.
+
+    `touch()` passes the documents a write changes on to storages that append
+    only those (see `JournalStorage`), the others rewrite everything anyway.
+    """
+
+    def __init__(self, storage_cls):
+        super().__init__(storage_cls)
+        self._depth = 0
+        self._pending = None
+
+    def read(self):
+        if self._pending is not None:
+            return self._pending
+        return self.storage.read()
+
+    def write(self, data):
+        if self._depth:
+            self._pending = data
+        else:
+            self.storage.write(data)
+
+    def touch(self, table: str, doc_id: int):
+        touch = getattr(self.storage, 'touch', None)
+        if touch:
+            touch(table, doc_id)
+
+    @contextmanager
+    def batch(self):
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if not self._depth and self._pending is not None:
+                pending, self._pending = self._pending, None
+                self.storage.write(pending)
+
+    def close(self):
+        self.storage.close()
+
+
+class AtomicJSONStorage(Storage):
+    """
+    A TinyDB storage for a JSON file that is replaced atomically on every write.
+
+    The data is written to a temporary file next to the database, synced and
+    renamed over it, so a reader (or a crash) only ever sees a complete file:
+    the previous version or the new one.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        """
+        Args:
+            path (str): Path to the JSON file.
+            **kwargs: Passed to `json.dump`, e.g. `indent`.
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.kwargs = kwargs
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def read(self):
+        if not self.path.exists():
+            return None
+        content = self.path.read_text(encoding='utf-8')
+        return json.loads(content) if content.strip() else None
+
+    def write(self, data):
+        tmp_path = self.path.with_suffix(f'{self.path.suffix}.tmp')
+        with tmp_path.open('w', encoding='utf-8') as file:
+            json.dump(data, file, **self.kwargs)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class TinyDBStore(DayStore):
+    """
+    Stores the day documents in a TinyDB table, one table (collection) per user.
+
+    The whole table is indexed in memory by day at load time, so lookups and writes
+    of a single day never scan the table. The index is partitioned by month, so a
+    range query only visits the months it overlaps.
+
+    Days are stored as `{'day': 'YYYYMMDD', 'ms': elapsed ms, 'orders': {'<order id>': ms}}`,
+    the order names once in the table `<collection>.orders` (the id is the doc id).
+    Tables with order names and float seconds (the legacy format) are converted
+    on load, in a single write.
+    """
+
+    def __init__(self, config: AppConfig):
+        """
+        Opens the TinyDB database configured in `config.mind`.
+
+        Args:
+            config (AppConfig): Application configuration with DB details.
+        """
+        self.config = config
+        if config.mind.storage == 'journal':
+            self.db = TinyDB(
+                config.mind.Database,
+                storage=BatchMiddleware(JournalStorage),
+                max_journal_bytes=config.mind.journal_max_bytes
+            )
+        else:
+            self.db = TinyDB(config.mind.Database, storage=BatchMiddleware(AtomicJSONStorage), indent=2)
+        self.collection = self.db.table(config.mind.collection)
+
+        # Dictionary of the order names (id -> name / name -> id)
+        self.orders = self.db.table(f'{config.mind.collection}.orders')
+        self.names: dict[int, str] = {doc.doc_id: doc['name'] for doc in self.orders.all()}
+        self.ids: dict[str, int] = {name: order for order, name in self.names.items()}
+
+        # Index of the stored days (day id -> document / doc id), built once at load time
+        self.days: dict[str, dict] = {}
+        self.doc_ids: dict[str, int] = {}
+        legacy = False
+        with self.transaction():
+            for doc in self.collection.all():
+                if not doc.get('day'):
+                    continue
+                if 'ms' in doc:
+                    self.days[doc['day']] = record_to_day(doc)
+                else:
+                    # interns the names of a legacy document
+                    self.days[doc['day']] = encode_day(doc, self.order_id)
+                    legacy = True
+                self.doc_ids[doc['day']] = doc.doc_id
+            if legacy:
+                self._migrate()
+
+        # Month partitions (YYYYMM -> sorted day ids) and their sorted keys
+        self.partitions: dict[str, list[str]] = {}
+        for day in sorted(self.days):
+            self.partitions.setdefault(day[:6], []).append(day)
+        self.months: list[str] = sorted(self.partitions)
+
+        # Meta records (rollups etc.) live in a separate table of the same user
+        self.meta = self.db.table(f'{config.mind.collection}.meta')
+        self.meta_ids: dict[str, int] = {doc['key']: doc.doc_id for doc in self.meta.all()}
+
+    def _migrate(self):
+        """
+        Rewrites the day table in the stored format, in a single write.
+        """
+        days = sorted(self.days)
+        self.collection.truncate()
+        doc_ids = self.collection.insert_multiple(day_to_record(self.days[day]) for day in days)
+        self.doc_ids = dict(zip(days, doc_ids))
+
+    def order_id(self, name: str) -> int:
+        if name not in self.ids:
+            with self.transaction():
+                order = self.orders.insert({'name': name})
+                self.db.storage.touch(self.orders.name, order)
+            self.ids[name] = order
+            self.names[order] = name
+        return self.ids[name]
+
+    def order_name(self, order_id: int) -> str:
+        return self.names[order_id]
+
+    def get_day(self, day: str) -> dict | None:
+        return copy.deepcopy(self.days.get(day))
+
+    def put_day(self, document: dict):
+        day = document['day']
+        self.days[day] = document
+        doc_id = self.doc_ids.get(day)
+        with self.transaction():
+            if doc_id is None:
+                doc_id = self.doc_ids[day] = self.collection.insert(day_to_record(document))
+                month = day[:6]
+                if month not in self.partitions:
+                    bisect.insort(self.months, month)
+                bisect.insort(self.partitions.setdefault(month, []), day)
+            else:
+                self.collection.update(day_to_record(document), doc_ids=[doc_id])
+            self.db.storage.touch(self.collection.name, doc_id)
+
+    def order_names(self) -> set[str]:
+        ids = set()
+        for doc in self.days.values():
+            ids.update(doc.get('orders', {}).keys())
+        return {self.names[order] for order in ids}
+
+    def iter_cells(self, start: str | None = None, end: str | None = None) -> Iterator[Cell]:
+        first = bisect.bisect_left(self.months, start[:6]) if start else 0
+        last = bisect.bisect_right(self.months, end[:6]) if end else len(self.months)
+
+        for month in self.months[first:last]:
+            days = self.partitions[month]
+            lower = bisect.bisect_left(days, start) if start else 0
+            upper = bisect.bisect_right(days, end) if end else len(days)
+            yield from self._day_cells(days[lower:upper])
+
+    def _day_cells(self, days: list[str]) -> Iterator[Cell]:
+        for day in days:
+            doc = self.days[day]
+            yield day, None, doc.get('elapsed', 0) / 1_000
+            for order, ms in doc.get('orders', {}).items():
+                yield day, self.names[order], ms / 1_000
+
+    def transaction(self):
+        return self.db.storage.batch()
+
+    def get_meta(self, key: str):
+        doc_id = self.meta_ids.get(key)
+        if doc_id is None:
+            return None
+        # the storage may hand out its own state, the caller gets a copy
+        return copy.deepcopy(self.meta.get(doc_id=doc_id)['value'])
+
+    def put_meta(self, key: str, value):
+        document = {'key': key, 'value': copy.deepcopy(value)}
+        doc_id = self.meta_ids.get(key)
+        with self.transaction():
+            if doc_id is None:
+                doc_id = self.meta_ids[key] = self.meta.insert(document)
+            else:
+                self.meta.update(document, doc_ids=[doc_id])
+            self.db.storage.touch(self.meta.name, doc_id)
+
+    def iter_meta(self, prefix: str) -> Iterator[tuple[str, object]]:
+        # one read of the table, not one per record
+        documents = [document for document in self.meta.all() if document['key'].startswith(prefix)]
+        for document in sorted(documents, key=lambda document: document['key']):
+            yield document['key'], copy.deepcopy(document['value'])
+
+    def reload(self):
+        self.db.close()
+        self.__init__(self.config)
+
+    def close(self):
+        self.db.close()
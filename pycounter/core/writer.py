@@ -0,0 +1,107 @@
+import threading
+from time import monotonic
+from typing import Callable, Dict, Hashable
+
+from core.log import logger
+
+
+class PersistenceWorker(threading.Thread):
+    """
+    A background thread that performs the database writes of `Mind`.
+
+    Jobs are scheduled under a key. A job that is scheduled while another one with
+    the same key is still pending replaces it, so a burst of writes to the same
+    record within `delay` seconds is committed only once (group commit).
+    """
+
+    def __init__(self, delay: float = 0.25):
+        """
+        Args:
+            delay (float): Seconds to wait for further jobs before committing a batch.
+        """
+        super().__init__(name='pycounter-persistence', daemon=True)
+        self.delay = delay
+        self.commits = 0  # Number of batches written so far
+
+        self._pending: Dict[Hashable, Callable[[], None]] = {}
+        self._cond = threading.Condition()
+        self._busy = False
+        self._flushers = 0  # Threads waiting in flush(), the commit window is skipped for them
+        self._stopping = False
+
+    def schedule(self, key: Hashable, job: Callable[[], None]):
+        """
+        Queues a write job, replacing a pending job with the same key.
+
+        Args:
+            key (Hashable): Identifies the record the job writes.
+            job (Callable): The function performing the write.
+        """
+        if not self.is_alive():
+            # the worker was stopped (or never started), write synchronously
+            job()
+            return
+        with self._cond:
+            self._pending[key] = job
+            self._cond.notify_all()
+
+    def flush(self):
+        """
+        Commits all pending jobs immediately and waits until they are written.
+        """
+        with self._cond:
+            self._flushers += 1
+            self._cond.notify_all()
+            try:
+                while (self._pending or self._busy) and self.is_alive():
+                    self._cond.wait(0.1)
+            finally:
+                self._flushers -= 1
+
+    def stop(self):
+        """
+        Flushes all pending jobs and terminates the worker thread.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self.is_alive():
+            self.join()
+        # run anything that slipped in while the thread was shutting down
+        for job in self._take():
+            job()
+
+    def _take(self):
+        jobs = list(self._pending.values())
+        self._pending = {}
+        return jobs
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+
+                # collect further writes until the commit window closes
+                deadline = monotonic() + self.delay
+                while not (self._flushers or self._stopping):
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                jobs = self._take()
+                self._busy = True
+
+            for job in jobs:
+                try:
+                    job()
+                except Exception:
+                    logger.exception("Failed to persist data!")
+
+            with self._cond:
+                self._busy = False
+                self.commits += 1
+                self._cond.notify_all()
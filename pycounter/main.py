@@ -1,11 +1,19 @@
 import os
 import sys
-from PyQt5.QtWidgets import QApplication, QMessageBox
-from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import qInstallMessageHandler
 
-from ui.app import CounterApp
-from config import yaml_config_loader
+from core.profiler import startup
+
+# The profiler has to be enabled before the application modules are imported
+# (--profile-startup or PYCOUNTER_PROFILE_STARTUP=1, =exit to quit after the first paint)
+sys.argv = startup.enable_from(sys.argv)
+
+with startup.phase('imports'):
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    from ui.assets import assets
+    from PyQt5.QtCore import QTimer, qInstallMessageHandler
+
+    from ui.app import CounterApp
+    from config import yaml_config_loader
 
 def main():
     """
@@ -14,10 +22,12 @@ def main():
     This function performs the following:
     - Loads the configuration from a YAML file (handling both frozen and dev environments)
     - Initializes the Qt application
-    - Sets the window icon and application stylesheet
+    - Loads the assets, sets the window icon and application stylesheet
     - Launches the main application window
+    - Writes a startup profile to ~/.pycounter if the profiler is enabled
     """
-    from pycounter.core.log import logger, qt_message_handler_wrapper, exception_hook
+    with startup.phase('logging'):
+        from pycounter.core.log import LOG_DIR, logger, qt_message_handler_wrapper, exception_hook
 
     sys.excepthook = exception_hook
 
@@ -33,21 +43,32 @@ def main():
             config_path = 'pycounter/config.yaml'  # Default path during development
 
         # Load configuration using a custom YAML loader
-        app_config = yaml_config_loader(config_path)
+        with startup.phase('config'):
+            app_config = yaml_config_loader(config_path)
 
         # Initialize the Qt application
-        app = QApplication(sys.argv)
+        with startup.phase('QApplication'):
+            app = QApplication(sys.argv)
 
-        # Set application window icon
-        app.setWindowIcon(QIcon(str(app_config.assets.Icon)))
+        with startup.phase('assets'):
+            # Resolve the asset paths and rasterize the icons once
+            assets.load(app_config.assets)
 
-        # Apply custom stylesheet from configuration
-        with app_config.assets.Stylesheet.open('r') as stylesheet_file:
-            app.setStyleSheet(stylesheet_file.read())
+            # Set application window icon
+            app.setWindowIcon(assets.icon('Icon'))
+
+            # Apply custom stylesheet from configuration
+            app.setStyleSheet(assets.stylesheet())
 
         # Create and display the main window
-        window = CounterApp(config=app_config)
-        window.show()
+        with startup.phase('main window'):
+            window = CounterApp(config=app_config)
+        with startup.phase('show'):
+            window.show()
+
+        if startup.enabled:
+            # runs once the event loop has processed the first paint events
+            QTimer.singleShot(0, lambda: finish_profile(app, LOG_DIR, logger))
 
         # Execute the application's event loop
         sys.exit(app.exec_())
@@ -58,6 +79,24 @@ def main():
             QMessageBox.critical(None, "Startup Error", f"Fatal startup error:\n{str(ex)}")
         sys.exit(1)
 
+def finish_profile(app: QApplication, directory, logger):
+    """
+    Writes the startup profile after the first paint.
+
+    Args:
+        app (QApplication): The application, quit if the profiler was started with `exit`.
+        directory (Path): Folder of the report.
+        logger (Logger): Logger of the application.
+    """
+    startup.mark('first paint')
+    try:
+        target = startup.write(directory)
+        logger.info(f"Startup profile written to {target}")
+    except OSError:
+        logger.exception("Failed to write the startup profile!")
+    if startup.exit_after:
+        app.quit()
+
 if __name__ == '__main__':
     # Only run main if this script is executed directly
     main()
@@ -1,67 +1,136 @@
-from datetime import datetime
-from typing import Optional
+from itertools import islice
+from typing import Callable, Optional
 
 from PyQt5.QtWidgets import QCompleter, QLabel, QLineEdit, QPushButton, QHBoxLayout
-from PyQt5.QtCore import Qt, QStringListModel, QSortFilterProxyModel, QRegExp
+from PyQt5.QtCore import Qt, QStringListModel, QTimer, pyqtSignal
 
-from config import AppConfig
+from config import AppConfig, CompleterConfig
 from ui.basewidget import BaseWidget
 from core.db import Mind
 from core.activitymanager import ActivityManager
+from core.profiler import startup
+from core.search import SubstringIndex, max_distance_for
 
-class RegexFilterProxyModel(QSortFilterProxyModel):
+class RegexCompleter(QCompleter):
     """
-    A proxy model that uses regex filtering to match substrings in a case-insensitive way.
+    A QCompleter that shows the suggestions containing the typed text (case-insensitive).
+
+    The matching is done by a `SubstringIndex` over the casefolded names; the model
+    of the completer only holds the first `max_results` matches, so Qt never has
+    to filter the whole list row by row. The matching `hot` names (the recently
+    pushed projects ranked by frecency) are shown first.
     """
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.setFilterCaseSensitivity(Qt.CaseInsensitive) # type: ignore
+    def __init__(
+            self,
+            items,
+            parent=None,
+            config: CompleterConfig | None = None,
+            hot: Callable[[], list[str]] | None = None
+        ):
+        self.config = config or CompleterConfig()
+        self.index = SubstringIndex(items)
+        self.hot = hot
 
-    def filterAcceptsRow(self, source_row, source_parent):
-        """
-        Override to filter rows based on a regex match on the data in the first column.
+        # Typo-tolerant matching needs numpy, so it is only loaded if enabled
+        self.fuzzy_index = None
+        if self.config.fuzzy:
+            from core.fuzzy import FuzzyIndex
+            self.fuzzy_index = FuzzyIndex(self.index.names)
+
+        # Model holding the current matches
+        self.model = QStringListModel(self.matches('')) # type: ignore
+
+        # Initialize the QCompleter with the matches model
+        super().__init__(self.model, parent)
+        if self.fuzzy_index is not None:
+            # fuzzy matches do not contain the typed text, Qt must show the model as is
+            self.setCompletionMode(QCompleter.UnfilteredPopupCompletion) # type: ignore
+        else:
+            self.setCompletionMode(QCompleter.PopupCompletion) # type: ignore
+        self.setCaseSensitivity(Qt.CaseInsensitive) # type: ignore
+        self.setFilterMode(Qt.MatchContains) # type: ignore
+
+    def add_suggestion(self, name: str, position: int):
         """
-        index = self.sourceModel().index(source_row, 0, source_parent) # type: ignore
-        data = self.sourceModel().data(index, Qt.DisplayRole) # type: ignore
-        pattern = self.filterRegExp().pattern()
-        return QRegExp(pattern, Qt.CaseInsensitive).indexIn(data) != -1 # type: ignore
+        Adds a new name to the suggestions, used as listener of `Mind.suggestions`.
 
+        Args:
+            name (str): The new order name.
+            position (int): Its position in the sorted suggestions (unused, the index keeps its own order).
+        """
+        if self.index.add(name):
+            if self.fuzzy_index is not None:
+                self.fuzzy_index.add(name)
+            self.updateModelFilter(self.completionPrefix())
 
-class RegexCompleter(QCompleter):
-    """
-    A QCompleter that uses a proxy model with regex filtering for dynamic suggestion matching.
-    """
-    def __init__(self, items, parent=None):
-        # Create string model from provided items
-        self.model = QStringListModel(items) # type: ignore
+    def matches(self, text: str) -> list[str]:
+        """
+        Returns the suggestions containing `text`, the hot ones first.
 
-        # Use custom proxy model for regex-based filtering
-        self.proxy_model = RegexFilterProxyModel()
-        self.proxy_model.setSourceModel(self.model) # type: ignore
+        In fuzzy mode the list is filled up with the names that start with `text`
+        apart from a few typos, ranked by the number of typos.
+        """
+        limit = self.config.max_results
+        query = text.casefold()
+        ranked = [name for name in self.hot() if query in name.casefold()][:limit] if self.hot else []
+        shown = set(ranked)
+        others = (name for name in self.index.search(text, limit + len(ranked)) if name not in shown)
+        matches = ranked + list(islice(others, limit - len(ranked)))
 
-        # Initialize the QCompleter with the proxy model
-        super().__init__(self.proxy_model, parent)
-        self.setCompletionMode(QCompleter.PopupCompletion) # type: ignore
-        self.setCaseSensitivity(Qt.CaseInsensitive) # type: ignore
-        self.setFilterMode(Qt.MatchContains) # type: ignore
+        distance = max_distance_for(text, self.config.fuzzy_max_distance)
+        if self.fuzzy_index is not None and distance and len(matches) < limit:
+            shown.update(matches)
+            similar = self.fuzzy_index.search(text, distance, limit + len(shown))
+            matches += islice((name for name, _ in similar if name not in shown), limit - len(matches))
+        return matches
 
     def updateModelFilter(self, text):
         """
-        Update the regex pattern for filtering based on user input.
+        Replace the matches shown by the completer based on user input.
         """
-        regex = QRegExp(text, Qt.CaseInsensitive) # type: ignore
-        self.proxy_model.setFilterRegExp(regex)
+        self.model.setStringList(self.matches(text))
 
 
 class FocusLineEdit(QLineEdit):
     """
-    A QLineEdit with a regex-based completer that activates suggestions on text edit.
+    A QLineEdit with a substring completer that activates suggestions on text edit.
+
+    With more than `debounce_threshold` suggestions the filter is only updated
+    once the typing pauses for `debounce_ms`.
     """
-    def __init__(self, suggestions, *args, **kwargs):
+    def __init__(
+            self,
+            suggestions,
+            *args,
+            config: CompleterConfig | None = None,
+            hot: Callable[[], list[str]] | None = None,
+            **kwargs
+        ):
         super().__init__(*args, **kwargs)
-        self.completer_ = RegexCompleter(suggestions, self)
+        self.completer_ = RegexCompleter(suggestions, self, config, hot)
         self.setCompleter(self.completer_)
-        self.textEdited.connect(self.completer_.updateModelFilter) # type: ignore
+
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(self.completer_.config.debounce_ms)
+        self.filter_timer.timeout.connect(self._update_filter) # type: ignore
+        self.textEdited.connect(self._on_text_edited) # type: ignore
+
+    def _on_text_edited(self, text: str):
+        if len(self.completer_.index) > self.completer_.config.debounce_threshold:
+            self.filter_timer.start()    # restarts the delay on every keystroke
+        else:
+            self._update_filter()
+
+    def _update_filter(self):
+        """
+        Filters the suggestions by the current text and shows the popup.
+        """
+        text = self.text()
+        self.completer_.updateModelFilter(text)
+        if text:
+            self.completer_.setCompletionPrefix(text)
+            self.completer_.complete()
 
     def focusInEvent(self, event): # type: ignore
         """
@@ -89,6 +158,8 @@ class ActivityPanel(BaseWidget):
     btn_activity_handler: QPushButton
     mind: Mind
     is_recording: bool = False
+    # A name added to the suggestions, also by the persistence worker (another process pushed it)
+    suggestion_added: pyqtSignal = pyqtSignal(str, int)
 
     def __init__(
         self,
@@ -118,8 +189,15 @@ class ActivityPanel(BaseWidget):
         self.lbl_project.setObjectName("lbl_project")
 
         # Get previous activity suggestions from database
-        suggestions = self.mind.get_activity_suggestions()
-        self.inp_project = FocusLineEdit(suggestions, self)
+        with startup.phase('activity suggestions'):
+            suggestions = self.mind.get_activity_suggestions()
+        self.inp_project = FocusLineEdit(
+            suggestions, self, config=self.config.completer, hot=self.mind.suggestions.hot
+        )
+        # pushed projects show up in the completer right away, the signal
+        # delivers the names found by other threads on the GUI thread
+        self.suggestion_added.connect(self.inp_project.completer_.add_suggestion)
+        self.mind.suggestions.listeners.append(self.suggestion_added.emit)
 
         # Create the start/stop button
         self.btn_activity_handler = QPushButton("Record", self)
@@ -133,6 +211,23 @@ class ActivityPanel(BaseWidget):
         layout.addWidget(self.btn_activity_handler)
         self.setLayout(layout)
 
+    def resume_recording(self, order: str):
+        """
+        Puts the panel into the recording state of an order without a click,
+        e.g. to continue the order recorded when the app was terminated.
+
+        Args:
+            order (str): The order name.
+        """
+        if self.is_recording:
+            return
+        self.inp_project.setText(order)
+        self.mind.start_order(order)
+        self.btn_activity_handler.setText("Push")
+        self._set_icon(self.btn_activity_handler, 'Push')
+        self.inp_project.setDisabled(True)
+        self.is_recording = True
+
     def _btn_actitvity_toggle_handler(self):
         """
         Handles toggle behavior of the activity button between 'Record' and 'Push'.
@@ -154,8 +249,7 @@ class ActivityPanel(BaseWidget):
             if not self.activity_manager.running:
                 self.activity_manager.start_timer()
 
-            self.mind.current_order = project_name
-            self.mind.order_start_time = datetime.now()
+            self.mind.start_order(project_name)
             self.btn_activity_handler.setText("Push")
             self._set_icon(self.btn_activity_handler, 'Push')
 
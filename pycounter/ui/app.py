@@ -2,16 +2,21 @@ from PyQt5.QtWidgets import (
     QApplication, QWidget, QMainWindow,
     QVBoxLayout, QSystemTrayIcon
 )
-from PyQt5.QtGui import QIcon, QScreen
+from PyQt5.QtCore import QEvent
+from PyQt5.QtGui import QScreen
 
 from config import AppConfig
 
 from core.db import Mind
 from core.activitymanager import ActivityManager
+from core.checkpoint import Checkpoint, CheckpointRing, Checkpointer, ring_path
+from core.log import logger
+from core.profiler import startup
 
 from ui.timerpanel import TimerPanel
 from ui.activities import ActivityPanel
 from ui.tray import TrayCounter
+from ui.assets import assets
 
 class CounterApp(QMainWindow):
     """
@@ -31,6 +36,7 @@ class CounterApp(QMainWindow):
     # logic and db
     mind: Mind
     activity_manager: ActivityManager
+    checkpointer: Checkpointer
 
 
 
@@ -49,21 +55,48 @@ class CounterApp(QMainWindow):
 
         # setup the "backend"
         self.config = config
-        self.mind = Mind(self.config)
-        self.activity_manager = ActivityManager(self.config, self)
-        self.activity_manager.total_elapsed = self.mind.get_current_elapsed_time()
-
-        self.setWindowIcon(QIcon(str(self.config.assets.Icon)))  # Set window icon
-
-        self._init_ui()
-
-        self.tray_icon = TrayCounter(
-            QIcon(
-                str(self.config.assets.Icon)
-            ), 
-            mgr=self.activity_manager, 
-            parent=self
+        with startup.phase('open database'):
+            self.mind = Mind(self.config)
+        with startup.phase('checkpoint'):
+            # Recover the timer state the app had when it was last terminated
+            ring = CheckpointRing(
+                ring_path(self.config.mind.Database, self.config.mind.collection), self.config.mind.checkpoint_slots
+            )
+            if not ring.owned:
+                logger.warning("Another instance records this collection, its checkpoints are left alone")
+            recovered = ring.unrecovered()
+            if recovered:
+                self.mind.recover(recovered)
+                ring.mark_clean()   # recovered once, not again on the next start
+        with startup.phase('activity manager'):
+            self.activity_manager = ActivityManager(self.config, self)
+            self.activity_manager.total_elapsed = self.mind.get_current_elapsed_time()
+
+        assets.load(self.config.assets)
+        self.setWindowIcon(assets.icon('Icon'))  # Set window icon
+
+        with startup.phase('widgets'):
+            self._init_ui()
+            if recovered and recovered.order and recovered.day == self.mind.day_id:
+                # continue recording the order, the time up to the checkpoint was pushed
+                self.tracker_panel.resume_recording(recovered.order)
+
+        # Checkpoint periodically and right after every action on the timer or the order
+        self.checkpointer = Checkpointer(
+            ring, self._checkpoint_state, self.config.mind.checkpoint_interval_ms, self
         )
+        self.activity_manager.changed.connect(self.checkpointer.write)
+        # Log the starts and stops of the timer to the interval log
+        self.activity_manager.changed.connect(lambda: self.mind.log_timer(self.activity_manager.running))
+        self.tracker_panel.btn_activity_handler.clicked.connect(self.checkpointer.write)
+        self.checkpointer.write()
+
+        with startup.phase('tray'):
+            self.tray_icon = TrayCounter(
+                assets.icon('Icon'),
+                mgr=self.activity_manager, 
+                parent=self
+            )
 
         # Ensure app state is saved before quitting
         self.app = QApplication.instance()
@@ -122,10 +155,47 @@ class CounterApp(QMainWindow):
         y = screen_geometry.height() - h
         self.move(x, y)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._update_visibility()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_visibility()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange: # type: ignore
+            self._update_visibility()
+
+    def _update_visibility(self):
+        """
+        Lets the timer tick at full rate only while the window is on screen.
+        """
+        self.activity_manager.set_visible(self.isVisible() and not self.isMinimized())
+
+    def _checkpoint_state(self) -> Checkpoint:
+        """
+        Returns the current state of the timer and of the recorded order.
+        """
+        recording = self.tracker_panel.is_recording
+        return Checkpoint(
+            day=self.mind.day_id,
+            elapsed=self.activity_manager.total_elapsed,
+            running=self.activity_manager.running,
+            order=self.mind.current_order if recording else '',
+            order_start=self.mind.order_start_time if recording else None,
+            session=self.mind.intervals.session
+        )
+
     def on_exit(self):
         """
         Perform final operations before exiting the app.
 
-        Ensures that the timer is paused and tracked time is pushed to storage.
+        Ensures that the timer is paused and tracked time is pushed to storage,
+        then waits for the persistence worker to commit all pending writes.
         """
-        self.tracker_panel.btn_activity_handler.click()     # Manually trigger push action
+        if self.tracker_panel.is_recording:
+            self.tracker_panel.btn_activity_handler.click() # Manually trigger push action
+        self.checkpointer.close()                           # Marks the last checkpoint clean
+        self.mind.close()                                   # Flush pending writes to disk
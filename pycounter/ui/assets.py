@@ -0,0 +1,99 @@
+from pathlib import Path
+from PyQt5.QtGui import QIcon, QPixmap, QGuiApplication
+from PyQt5.QtCore import QSize
+
+from config import AssetConfig
+
+# Size of the icons on the buttons
+BUTTON_SIZE = QSize(28, 28)
+
+# Sizes each icon is rasterized at: the app icon for the window and the tray,
+# the others for the buttons
+ICON_SIZES: dict[str, tuple[QSize, ...]] = {
+    'Icon': tuple(QSize(size, size) for size in (16, 22, 24, 32, 48, 64)),
+    'Play': (BUTTON_SIZE,),
+    'Pause': (BUTTON_SIZE,),
+    'Reset': (BUTTON_SIZE,),
+    'Record': (BUTTON_SIZE,),
+    'Push': (BUTTON_SIZE,),
+}
+
+
+class AssetRegistry:
+    """
+    Resolves the asset paths once and keeps the icons rasterized in memory.
+
+    `load` reads every icon of the `AssetConfig` from disk and renders it at the
+    sizes it is used (see `ICON_SIZES`, scaled by the screen's pixel ratio), so
+    `icon(name)` is a dictionary lookup without any filesystem access.
+    """
+
+    def __init__(self):
+        self.config: AssetConfig | None = None
+        self.paths: dict[str, Path] = {}
+        self._icons: dict[str, QIcon] = {}
+        self._stylesheet: str | None = None
+
+    def load(self, config: AssetConfig):
+        """
+        Resolves the paths and rasterizes the icons of a configuration, unless already loaded.
+
+        Requires a QGuiApplication.
+
+        Args:
+            config (AssetConfig): The asset configuration.
+        """
+        if config is self.config:
+            return
+        root = config.Root
+        self.paths = {
+            'Stylesheet': root.joinpath(config.stylesheet),
+            **{name: root.joinpath(getattr(config, name.lower())) for name in ICON_SIZES},
+        }
+        ratio = QGuiApplication.instance().devicePixelRatio() if QGuiApplication.instance() else 1.0 # type: ignore
+        self._icons = {name: _rasterize(self.paths[name], sizes, ratio) for name, sizes in ICON_SIZES.items()}
+        self._stylesheet = None
+        self.config = config
+
+    def icon(self, name: str) -> QIcon:
+        """
+        Returns a loaded icon.
+
+        Args:
+            name (str): The name of the icon, e.g. 'Play' (a key of `ICON_SIZES`).
+        """
+        return self._icons[name]
+
+    def path(self, name: str) -> Path:
+        """
+        Returns the resolved path of an asset.
+
+        Args:
+            name (str): The name of the asset, e.g. 'Stylesheet'.
+        """
+        return self.paths[name]
+
+    def stylesheet(self) -> str:
+        """
+        Returns the application stylesheet, read once.
+        """
+        if self._stylesheet is None:
+            self._stylesheet = self.paths['Stylesheet'].read_text()
+        return self._stylesheet
+
+
+def _rasterize(path: Path, sizes: tuple[QSize, ...], ratio: float) -> QIcon:
+    """
+    Renders an icon file into pixmaps of the given sizes.
+    """
+    source = QIcon(str(path))
+    icon = QIcon()
+    for size in sizes:
+        pixmap: QPixmap = source.pixmap(size * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        icon.addPixmap(pixmap)
+    return icon
+
+
+# The assets of this process, loaded by the main window
+assets = AssetRegistry()
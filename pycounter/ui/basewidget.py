@@ -1,12 +1,13 @@
 from typing import Literal
 from PyQt5.QtWidgets import QWidget, QPushButton
-from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QSize
+
 
 from config import AppConfig
 
 from core.db import Mind
 from core.activitymanager import ActivityManager
+from ui.assets import assets, BUTTON_SIZE
+
 
 class BaseWidget(QWidget):
     """
@@ -39,6 +40,7 @@ class BaseWidget(QWidget):
         self.config = config
         self.mind = mind
         self.activity_manager = activity_manager
+        assets.load(config.assets)     # no-op once the main window loaded them
         super().__init__(parent)
 
     def _set_icon(
@@ -51,14 +53,10 @@ class BaseWidget(QWidget):
 
         Args:
             button (QPushButton): The button to apply the icon to.
-            icon (Literal): The name of the icon asset to use, must match a key in `config.assets`.
+            icon (Literal): The name of the icon asset to use, must match a key in `ui.assets.ICON_SIZES`.
 
         Example:
             self._set_icon(self.btn_start, 'Play')
         """
-        # Retrieve icon path from config based on the literal string
-        icon_path = getattr(self.config.assets, icon, None)
-
-        if icon_path:
-            button.setIcon(QIcon(str(icon_path)))      # Set the icon image
-            button.setIconSize(QSize(28, 28))          # Set a standard size for consistency
+        button.setIcon(assets.icon(icon))   # Set the pre-rasterized icon image
+        button.setIconSize(BUTTON_SIZE)     # Set a standard size for consistency
@@ -1,6 +1,11 @@
-from PyQt5.QtWidgets import QMenu, QApplication, QAction
+from functools import partial
+from PyQt5.QtWidgets import QMenu, QApplication, QAction, QSystemTrayIcon
+from PyQt5.QtCore import QThreadPool
 
+from core.export import has_parquet
+from core.report import Layout, Output, open_file
 from ui.basewidget import BaseWidget
+from ui.reportjob import ReportJob
 
 
 class AppMenu(QMenu):
@@ -10,19 +15,26 @@ class AppMenu(QMenu):
 
     Attributes:
         parent_base_widget (BaseWidget): The parent widget that holds shared application state.
+        tray (QSystemTrayIcon): The tray icon showing the progress of running reports.
+        report_job (ReportJob | None): The report currently being generated.
     """
 
     parent_base_widget: BaseWidget
+    tray: QSystemTrayIcon
+    report_job: ReportJob | None = None
 
-    def __init__(self, parent: BaseWidget):
+    def __init__(self, parent: BaseWidget, tray: QSystemTrayIcon):
         """
         Initialize the AppMenu with its parent widget.
 
         Args:
             parent (BaseWidget): The parent widget, usually the main window, 
                                  giving access to the shared 'mind' logic.
+            tray (QSystemTrayIcon): The tray icon owning the menu.
         """
         self.parent_base_widget = parent
+        self.tray = tray
+        self.report_job = None
         super().__init__()
 
         self.init_ui()
@@ -42,8 +54,23 @@ class AppMenu(QMenu):
         monthly_report = QAction("Create monthly report!", self)
         monthly_report.triggered.connect(self.on_create_monthly_report_click)
 
-        # Add both actions to the Reports submenu
+        # Add "Cancel report" action, enabled while a report is generated
+        self.cancel_report = QAction("Cancel report", self)
+        self.cancel_report.setEnabled(False)
+        self.cancel_report.triggered.connect(self.on_cancel_report_click)
+
+        # Add the actions to the Reports submenu
         report_menu.addActions([total_report, monthly_report])
+        report_menu.addSeparator()
+        report_menu.addAction(self.cancel_report)
+
+        # Create an "Export" submenu with the columnar formats (long layout, whole history)
+        export_menu = QMenu("Export", self)
+        for label, output in (("CSV", 'csv'), ("JSON Lines", 'jsonl'), ("Parquet", 'parquet')):
+            export = QAction(f"Export {label}", self)
+            export.triggered.connect(lambda _, output=output: self.start_report('total', output, 'long'))
+            export.setEnabled(output != 'parquet' or has_parquet())
+            export_menu.addAction(export)
 
         # Create a quit action
         quit_action = QAction('Exit!', self)
@@ -52,6 +79,7 @@ class AppMenu(QMenu):
 
         # Add all menu items to the root menu
         self.addMenu(report_menu)
+        self.addMenu(export_menu)
         self.addSeparator()
         self.addAction(quit_action)
 
@@ -60,22 +88,77 @@ class AppMenu(QMenu):
         Callback for the 'Create total report' action.
         Generates a report covering the entire activity duration.
         """
-        self.parent_base_widget.mind.report(
-            format='perc',
-            interval='total',
-            open_report=True
-        )
+        self.start_report(interval='total')
 
     def on_create_monthly_report_click(self):
         """
         Callback for the 'Create monthly report' action.
         Generates a report for the current or previous month.
         """
-        self.parent_base_widget.mind.report(
-            format='perc',
-            interval='month',
-            open_report=True
-        )
+        self.start_report(interval='month')
+
+    def on_cancel_report_click(self):
+        """
+        Callback for the 'Cancel report' action. Stops the running report.
+        """
+        if self.report_job:
+            self.report_job.cancel()
+
+    def start_report(self, interval: str, output: Output = 'xlsx', layout: Layout = 'wide'):
+        """
+        Snapshots the report data and generates the report on the global thread pool,
+        both off the GUI thread.
+
+        Args:
+            interval (str): Either 'total' for all time or 'month' for the current month.
+            output (Output): 'xlsx', 'csv', 'parquet' or 'jsonl'.
+            layout (Layout): 'wide' (orders x dates) or 'long' (one row per date and order).
+        """
+        if self.report_job:
+            self.tray.showMessage("Report", "A report is already being created.", QSystemTrayIcon.Information, 3000) # type: ignore
+            return
+
+        snapshot = partial(self.parent_base_widget.mind.report_snapshot, format='perc', interval=interval) # type: ignore
+        self.report_job = ReportJob(snapshot, output=output, layout=layout)
+        self.report_job.signals.progress.connect(self.on_report_progress)
+        self.report_job.signals.finished.connect(self.on_report_finished)
+        self.report_job.signals.failed.connect(self.on_report_failed)
+        self.report_job.signals.cancelled.connect(self.on_report_cancelled)
+
+        self.cancel_report.setEnabled(True)
+        QThreadPool.globalInstance().start(self.report_job)
+
+    def on_report_progress(self, percent: int, message: str):
+        """
+        Shows the progress of the running report in the tray tooltip.
+        """
+        self.tray.setToolTip(f"PyCounter - Report: {message} ({percent}%)")
+
+    def on_report_finished(self, file: str):
+        """
+        Opens the finished report.
+        """
+        self._report_done()
+        open_file(file)
+
+    def on_report_failed(self, message: str):
+        """
+        Notifies the user about a failed report.
+        """
+        self._report_done()
+        self.tray.showMessage("Report", f"Report failed: {message}", QSystemTrayIcon.Critical, 5000) # type: ignore
+
+    def on_report_cancelled(self):
+        """
+        Notifies the user about a cancelled report.
+        """
+        self._report_done()
+        self.tray.showMessage("Report", "Report cancelled.", QSystemTrayIcon.Information, 3000) # type: ignore
+
+    def _report_done(self):
+        self.report_job = None
+        self.cancel_report.setEnabled(False)
+        self.tray.setToolTip("PyCounter - Keep an eye on your time!")
 
     def on_exit_click(self):
         """
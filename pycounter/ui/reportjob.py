@@ -0,0 +1,76 @@
+import threading
+from typing import Callable
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from core.log import logger
+from core.report import Layout, Output, ReportCancelled, ReportSnapshot, write_report
+
+
+class ReportSignals(QObject):
+    """
+    Signals of a `ReportJob`, delivered to the GUI thread.
+    """
+    progress: pyqtSignal = pyqtSignal(int, str)   # percentage, description of the step
+    finished: pyqtSignal = pyqtSignal(str)        # path of the written report
+    failed: pyqtSignal = pyqtSignal(str)          # error message
+    cancelled: pyqtSignal = pyqtSignal()
+
+
+class ReportJob(QRunnable):
+    """
+    Takes a `ReportSnapshot` and generates the report on a QThreadPool worker,
+    so the timer and alerts keep running while the data is read and the
+    workbook is written.
+    """
+
+    def __init__(
+            self,
+            snapshot: Callable[[], ReportSnapshot],
+            file: str | None = None,
+            output: Output | None = None,
+            layout: Layout = 'wide'
+        ):
+        """
+        Args:
+            snapshot (Callable): Returns the data of the report, called on the worker
+                                 (e.g. `Mind.report_snapshot` with its arguments bound).
+            file (str | None): Target file, a temporary file if None.
+            output (Output | None): The file format, see `write_report`.
+            layout (Layout): 'wide' (orders x dates) or 'long' (one row per date and order).
+        """
+        super().__init__()
+        self.snapshot = snapshot
+        self.file = file
+        self.output = output
+        self.layout = layout
+        self.signals = ReportSignals()
+        self._cancelled = threading.Event()
+
+        # the job is owned by Python, the pool must not delete it
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        """
+        Requests the job to stop at the next step.
+        """
+        self._cancelled.set()
+
+    def run(self):
+        try:
+            self.signals.progress.emit(0, "Reading data")
+            snapshot = self.snapshot()
+            file = write_report(
+                snapshot,
+                self.file,
+                progress=self.signals.progress.emit,
+                cancelled=self._cancelled.is_set,
+                output=self.output,
+                layout=self.layout
+            )
+        except ReportCancelled:
+            self.signals.cancelled.emit()
+        except Exception as ex:
+            logger.exception("Failed to create report!")
+            self.signals.failed.emit(str(ex))
+        else:
+            self.signals.finished.emit(file)
@@ -4,7 +4,6 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QMenu, QToolButton, QAction, QMessageBox, QApplication
 )
-from PyQt5.QtGui import QIcon
 from datetime import timedelta
 
 from ui.basewidget import BaseWidget
@@ -17,19 +16,28 @@ class TimerPanel(BaseWidget):
     """
     A widget that functions as a timer with visual output, alerts, and tray notifications.
 
+    On every tick the label text and the button state are compared with what is
+    displayed, and only the changed widgets are touched. While the window is
+    hidden nothing is drawn, the tick emitted on show catches up.
+
     Attributes:
-        information_shown (bool): Tracks if the information alert has been shown.
-        warning_shown (bool): Tracks if the warning alert has been shown.
-        critical_shown (bool): Tracks if the critical alert has been shown.
         lbl_time (QLabel): Displays the current time in the timer.
         btn_play_pause (QPushButton): Button for playing or pausing the timer.
-        btn_reset (QPushButton): Button to reset the timer.
+        btn_quick_actions (QPushButton): Button with the quick actions menu.
+        redraws (int): Number of widget updates applied.
+        redraws_avoided (int): Number of widget updates skipped as unchanged or hidden.
     """
 
     lbl_time: QLabel
     btn_play_pause: QPushButton
     btn_quick_actions: QPushButton
 
+    # Icon shown for each state of the play/pause button
+    BUTTON_ICONS = {'Start': 'Play', 'Pause': 'Pause', 'Resume': 'Play'}
+
+    redraws: int = 0
+    redraws_avoided: int = 0
+
     @staticmethod
     def _timedelta_to_str(delta: timedelta):
         total_seconds = delta.total_seconds()
@@ -48,7 +56,7 @@ class TimerPanel(BaseWidget):
         self.activity_manager.total_elapsed = new_time
 
         # Reset the label to display 00:00:00
-        self.lbl_time.setText(self._timedelta_to_str(self.activity_manager.total_elapsed))
+        self.update_label_handler()
         # Update the mind with the reset timer value
         self.mind.update(timedelta(seconds=0.0))
 
@@ -70,18 +78,17 @@ class TimerPanel(BaseWidget):
         """
         super().__init__(config=config, mind=mind, activity_manager=mgr, parent=parent)
 
-        # Reset alert flags to prevent repeated notifications
-        self.information_shown = False
-        self.warning_shown = False
-        self.critical_shown = False
-        
+        # What is currently displayed, to skip unchanged updates
+        self._label_text: str | None = None
+        self._button_state: str | None = None
+        self.redraws = 0
+        self.redraws_avoided = 0
+
         # Build and layout the UI elements
         self.init_ui()
 
-        # Connect the tick signal from the activity manager to update the button state
-        self.activity_manager.tick.connect(
-            lambda: self.update_button_handler(self.btn_play_pause)
-        )
+        # One handler updates the label and the button on every tick
+        self.activity_manager.tick.connect(self.tick_handler)
 
     def init_ui(self):
         """
@@ -95,12 +102,10 @@ class TimerPanel(BaseWidget):
         self.lbl_time = QLabel("0:00:00", self)
         # update the label with the current elapsed time from the activity manager
         self.update_label_handler()
-        # Connect the tick signal to update the timer display
-        self.activity_manager.tick.connect(self.update_label_handler)
 
         # Initialize the play/pause button
-        self.btn_play_pause = QPushButton('Start', self)
-        self._set_icon(self.btn_play_pause, 'Play')
+        self.btn_play_pause = QPushButton(self)
+        self._set_button_state('Start')
         self.btn_play_pause.clicked.connect(
             lambda: self.play_pause_handler(self.btn_play_pause)
         )
@@ -127,6 +132,16 @@ class TimerPanel(BaseWidget):
         # Set the layout for the widget
         self.setLayout(layout)
 
+    def tick_handler(self):
+        """
+        Brings the label and the play/pause button up to date, unless the window is hidden.
+        """
+        if not self.activity_manager.visible:
+            self.redraws_avoided += 2
+            return
+        self.update_label_handler()
+        self.update_button_handler(self.btn_play_pause)
+
     def update_button_handler(self, button: QPushButton):
         """
         Updates the play/pause button state based on the activity manager's running state.
@@ -134,12 +149,22 @@ class TimerPanel(BaseWidget):
         Args:
             button (QPushButton): The button to update (either play/pause).
         """
-        if self.activity_manager.running:
-            self._set_icon(button, 'Pause')
-            button.setText("Pause")
-        else:
-            self._set_icon(button, 'Play')
-            button.setText('Resume')
+        self._set_button_state('Pause' if self.activity_manager.running else 'Resume')
+
+    def _set_button_state(self, state: str):
+        """
+        Shows a state ('Start', 'Pause' or 'Resume') on the play/pause button if it changed.
+
+        Args:
+            state (str): The text of the button, a key of `BUTTON_ICONS`.
+        """
+        if state == self._button_state:
+            self.redraws_avoided += 1
+            return
+        self._set_icon(self.btn_play_pause, self.BUTTON_ICONS[state]) # type: ignore
+        self.btn_play_pause.setText(state)
+        self._button_state = state
+        self.redraws += 1
 
     def play_pause_handler(self, button: QPushButton):
         """
@@ -151,12 +176,7 @@ class TimerPanel(BaseWidget):
         self.activity_manager.toggle_play_pause()
         
         # Update the button icon and text based on the current state
-        if self.activity_manager.running:
-            self._set_icon(button, 'Pause')
-            button.setText("Pause")
-        else:
-            self._set_icon(button, 'Play')
-            button.setText('Resume')
+        self.update_button_handler(button)
 
         # Update the mind with the current timer state
         self.mind.update(self.activity_manager.total_elapsed)
@@ -180,8 +200,7 @@ class TimerPanel(BaseWidget):
             # user confirmed
             self._update(timedelta(), absolut=True, reset_activities=True)
             # Update the play/pause button to show "Start"
-            button.setIcon(QIcon(str(self.config.assets.Play)))
-            button.setText("Start")
+            self._set_button_state('Start')
             # Update the mind with the reset timer value
             self.mind.update(timedelta(seconds=0.0))
         else:
@@ -193,4 +212,10 @@ class TimerPanel(BaseWidget):
         Updates the timer display label with the current elapsed time from the activity manager.
         """
         # Display the current elapsed time in the label
-        self.lbl_time.setText(self._timedelta_to_str(self.activity_manager.total_elapsed))
+        text = self._timedelta_to_str(self.activity_manager.total_elapsed)
+        if text == self._label_text:
+            self.redraws_avoided += 1
+            return
+        self.lbl_time.setText(text)
+        self._label_text = text
+        self.redraws += 1
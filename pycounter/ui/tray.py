@@ -17,16 +17,13 @@ class TrayCounter(QSystemTrayIcon):
     def init_ui(self):
         self.setToolTip("PyCounter - Keep an eye on your time!")
 
-        menu = AppMenu(self.parent())
+        menu = AppMenu(self.parent(), tray=self)
         self.setContextMenu(menu)
 
-        self.activity_manager.tick.connect(self.check_alert_handler)
+        self.activity_manager.alert.connect(self.alert_handler)
     
-    def check_alert_handler(self):
-        check = self.activity_manager.check_for_alerts()
-        if check:
-            msg, level = check
-            self.show_alert(msg, getattr(QSystemTrayIcon, level, QSystemTrayIcon.Information))
+    def alert_handler(self, msg: str, level: str):
+        self.show_alert(msg, getattr(QSystemTrayIcon, level, QSystemTrayIcon.Information))
 
 
     def show_alert(self, message: str, icon: QSystemTrayIcon = QSystemTrayIcon.Information):
@@ -4,15 +4,36 @@ from pathlib import Path
 from datetime import date, timedelta
 from pycounter.config import yaml_config_loader
 
-def generate_fake_db(num_records: int = 10, num_orders: int = 5):
+def generate_fake_db(
+        num_records: int = 10,
+        num_orders: int = 5,
+        database: str | None = None,
+        collection: str | None = None,
+        max_day_orders: int | None = None,
+        seed: int | None = None
+    ):
+    """
+    Writes a TinyDB file with `num_records` consecutive days starting today.
+
+    Args:
+        num_records (int): Number of days.
+        num_orders (int): Number of distinct orders.
+        database (str | None): Target file, taken from the config if None.
+        collection (str | None): Target table, taken from the config if None.
+        max_day_orders (int | None): Upper bound of the orders booked on one day, `num_orders` if None.
+        seed (int | None): Seed of the random generator, for reproducible histories.
+    """
+    random.seed(seed)
     app_config = yaml_config_loader('pycounter/config.yaml')
+    database = database or app_config.mind.database
+    collection = collection or app_config.mind.collection
     data = {}
-    data[app_config.mind.collection] = {}
+    data[collection] = {}
     ref_day = date.today()
     random_orders = [str(random.randint(1_000_000, 9_999_999)) for _ in range(num_orders)]
 
     for i in range(num_records):
-        num_day_orders = random.randint(1, num_orders)
+        num_day_orders = random.randint(1, min(num_orders, max_day_orders or num_orders))
         random_order_indices = [random.randint(0, num_orders - 1) for _ in range(num_day_orders)]
 
         day_orders = [random_orders[oid] for oid in random_order_indices]
@@ -44,13 +65,10 @@ def generate_fake_db(num_records: int = 10, num_orders: int = 5):
             "orders": orders_data
         }
 
-        data[app_config.mind.collection][str(i)] = day_record
+        data[collection][str(i)] = day_record
     
-    json.dump(
-        data, 
-        Path(app_config.mind.database).with_suffix('.json').open('w'), 
-        indent=2
-    )
+    with Path(database).with_suffix('.json').open('w') as file:
+        json.dump(data, file, indent=2)
 
 if __name__ == '__main__':
     generate_fake_db(num_records=200, num_orders=20)
@@ -0,0 +1,114 @@
+import unittest
+from datetime import timedelta
+from PyQt5.QtCore import QObject
+from PyQt5.QtWidgets import QApplication
+from config import AppConfig, AlertLevel
+from core.activitymanager import ActivityManager
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestActivityManager(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.parent = QObject()
+        self.manager = ActivityManager(AppConfig(), self.parent, clock=self.clock)
+
+    def test_elapsed_is_computed_from_the_clock(self):
+        self.manager.total_elapsed = timedelta(minutes=5)
+        self.manager.start_timer()
+        self.clock.now += 90.5
+        self.assertEqual(self.manager.total_elapsed, timedelta(minutes=6, seconds=30.5))
+
+        self.manager.toggle_play_pause()
+        self.clock.now += 600
+        self.assertEqual(self.manager.total_elapsed, timedelta(minutes=6, seconds=30.5))
+
+        self.manager.toggle_play_pause()
+        self.clock.now += 1
+        self.assertEqual(self.manager.total_elapsed, timedelta(minutes=6, seconds=31.5))
+
+    def test_setting_the_elapsed_time_while_running(self):
+        self.manager.start_timer()
+        self.clock.now += 10
+        self.manager.total_elapsed = timedelta(hours=1)
+        self.clock.now += 10
+        self.assertEqual(self.manager.total_elapsed, timedelta(hours=1, seconds=10))
+
+        self.manager.reset()
+        self.assertFalse(self.manager.running)
+        self.assertEqual(self.manager.total_elapsed, timedelta())
+
+    def test_tick_rate_follows_visibility(self):
+        ticks = []
+        self.manager.tick.connect(lambda: ticks.append(self.manager.total_elapsed))
+        self.manager.start_timer()
+        self.clock.now += 0.25
+        self.manager._arm()
+        self.assertEqual(self.manager.timer.interval(), 750)    # aligned to the next full second
+
+        self.manager.set_visible(False)
+        self.assertEqual(self.manager.timer.interval(), self.manager.config.window.hidden_tick_ms)
+        self.assertEqual(ticks, [])
+
+        self.clock.now += 3600
+        self.manager.set_visible(True)
+        self.assertEqual(ticks, [timedelta(hours=1, seconds=0.25)])   # caught up on show
+        self.assertTrue(self.manager.timer.isActive())
+
+        self.manager.config.window.hidden_tick_ms = 0
+        self.manager.set_visible(False)
+        self.assertFalse(self.manager.timer.isActive())
+
+        self.manager.toggle_play_pause()
+        self.manager.set_visible(True)
+        self.assertFalse(self.manager.timer.isActive())
+        self.assertEqual(len(ticks), 1)
+
+    def test_alert_schedule(self):
+        self.manager.config.notifications.levels = [AlertLevel(after={'minutes': 30}, message='Stretch', icon='Warning')]
+        self.manager = ActivityManager(self.manager.config, self.parent, clock=self.clock)
+        self.assertEqual([alert[1] for alert in self.manager.alerts],
+                         ['Stretch', 'Finish now!', 'Tomorrow is a new day!', 'GO HOME NOW!'])
+        self.assertFalse(self.manager.alert_timer.isActive())
+
+        self.manager.start_timer()
+        self.assertEqual(self.manager.alert_timer.interval(), 30 * 60 * 1000)
+
+        self.clock.now += 10 * 60
+        self.manager.toggle_play_pause()
+        self.assertFalse(self.manager.alert_timer.isActive())
+        self.manager.toggle_play_pause()
+        self.assertEqual(self.manager.alert_timer.interval(), 20 * 60 * 1000)
+
+        alerts = []
+        self.manager.alert.connect(lambda message, icon: alerts.append((message, icon)))
+        self.manager.total_elapsed += timedelta(hours=1)    # passes two levels, only the last is shown
+        self.assertEqual(self.manager.alert_timer.interval(), 0)
+        self.manager._on_alert_timeout()
+        self.assertEqual(alerts, [('Finish now!', 'Information')])
+        self.assertEqual(self.manager.alert_timer.interval(), 50 * 60 * 1000)
+
+        self.manager.total_elapsed -= timedelta(hours=1)    # shown alerts stay shown until a reset
+        self.assertEqual(self.manager.check_for_alerts(), None)
+        self.assertEqual(self.manager.alert_timer.interval(), 110 * 60 * 1000)
+
+        self.manager.reset()
+        self.assertFalse(self.manager.alert_timer.isActive())
+        self.assertEqual(self.manager.alerts_shown, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
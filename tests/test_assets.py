@@ -0,0 +1,34 @@
+import unittest
+from PyQt5.QtCore import QSize
+from PyQt5.QtWidgets import QApplication
+from config import AssetConfig
+from ui.assets import AssetRegistry
+
+
+class TestAssetRegistry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_icons_are_rasterized_once(self):
+        config = AssetConfig()
+        registry = AssetRegistry()
+        registry.load(config)
+
+        self.assertEqual(registry.path('Play'), config.Play)
+        self.assertIn(QSize(28, 28), registry.icon('Play').availableSizes())
+        self.assertIn(QSize(64, 64), registry.icon('Icon').availableSizes())
+        self.assertFalse(registry.icon('Pause').isNull())
+
+        icon = registry.icon('Play')
+        registry.load(config)                   # same configuration, nothing is reloaded
+        self.assertIs(registry.icon('Play'), icon)
+        self.assertIn('QPushButton', registry.stylesheet())
+
+        with self.assertRaises(KeyError):
+            registry.icon('Missing')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+import tempfile
+from pathlib import Path
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pycounter.core.db import Mind
+from core.checkpoint import RECORD_SIZE, Checkpoint, CheckpointRing, ring_path
+from test_db import temp_config
+
+
+class TestCheckpointRing(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name).joinpath('db.checkpoint')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_and_ring(self):
+        ring = CheckpointRing(self.path, slots=4)
+        self.assertIsNone(ring.latest())
+        start = datetime(2025, 3, 1, 8, 0)
+        for minute in range(10):
+            ring.write(
+                Checkpoint('20250301', timedelta(minutes=minute, milliseconds=5), running=True,
+                           order='Ä' * 150, order_start=start),
+                when=start + timedelta(minutes=minute)
+            )
+        ring.close()
+        self.assertEqual(self.path.stat().st_size, 4 * RECORD_SIZE)
+
+        ring = CheckpointRing(self.path, slots=4)
+        self.assertEqual([checkpoint.seq for checkpoint in ring.read()], [7, 8, 9, 10])
+        latest = ring.latest()
+        self.assertEqual(latest.elapsed, timedelta(minutes=9, milliseconds=5))
+        self.assertEqual(latest.order, 'Ä' * 101)      # truncated to 202 bytes
+        self.assertEqual(latest.order_elapsed, timedelta(minutes=9))
+        self.assertTrue(latest.running)
+        self.assertFalse(latest.clean)
+        self.assertEqual(ring.write(Checkpoint('20250301', timedelta(), session=7)).seq, 11)
+
+        ring.mark_clean()
+        latest = ring.latest()
+        self.assertEqual((latest.seq, latest.session, latest.clean), (12, 7, True))
+        ring.mark_clean()                               # already clean
+        self.assertEqual(ring.latest().seq, 12)
+        ring.close()
+
+    def test_torn_record_falls_back(self):
+        ring = CheckpointRing(self.path)
+        ring.write(Checkpoint('20250301', timedelta(hours=1)))
+        newest = ring.write(Checkpoint('20250301', timedelta(hours=2)))
+        ring.close()
+
+        with self.path.open('r+b') as file:
+            file.seek(newest.seq % 8 * RECORD_SIZE + 40)
+            file.write(b'\xff' * 8)
+
+        ring = CheckpointRing(self.path)
+        self.assertEqual(ring.latest().elapsed, timedelta(hours=1))
+        ring.close()
+
+
+class TestRecover(unittest.TestCase):
+
+    def test_recover(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # the app is terminated while it records A-1
+            mind = Mind(config=temp_config(directory, background_writes=False))
+            mind.update(timedelta(hours=1))
+            start = datetime.now() - timedelta(hours=1)
+            mind.log_timer(True, start)
+            mind.start_order('A-1', when=start)
+            checkpoint = Checkpoint(mind.day_id, timedelta(hours=2), running=True, order='A-1', order_start=start,
+                                    written=start + timedelta(minutes=30), session=mind.intervals.session)
+            mind.close()
+
+            mind = Mind(config=temp_config(directory, background_writes=False))
+            self.assertTrue(mind.recover(checkpoint))
+            # applied once: the order was pushed and the elapsed time is not larger
+            self.assertFalse(mind.recover(checkpoint))
+            self.assertFalse(mind.recover(replace(checkpoint, clean=True, elapsed=timedelta(hours=3))))
+            # an older checkpoint does not lower the elapsed time
+            self.assertFalse(mind.recover(replace(checkpoint, elapsed=timedelta(hours=1), seq=0)))
+            mind.close()
+
+            mind = Mind(config=temp_config(directory))
+            self.assertEqual(mind.get_current_elapsed_time(), timedelta(hours=2))
+            self.assertEqual(mind.get_current_activity()['orders'], {'A-1': 1800.0})
+            self.assertIn('A-1', mind.get_activity_suggestions())
+            # the intervals of the terminated session were closed, not logged again
+            self.assertEqual([(first, order) for first, _, order in mind.get_intervals(start, datetime.now())],
+                             [(start.replace(microsecond=0), None), (start.replace(microsecond=0), 'A-1')])
+            self.assertEqual(len(mind.intervals.events()), 4)
+            mind.close()
+
+    def test_live_session_is_not_recovered(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config = temp_config(directory, background_writes=False)
+            path = ring_path(config.mind.Database, config.mind.collection)
+            running = Mind(config=config)
+            running.update(timedelta(hours=1))
+            ring = CheckpointRing(path)
+            ring.write(Checkpoint(running.day_id, timedelta(hours=1), running=True, session=running.intervals.session))
+
+            # a second instance on the same database leaves the running one alone
+            second = Mind(config=temp_config(directory, background_writes=False))
+            second_ring = CheckpointRing(path)
+            self.assertFalse(second_ring.owned)
+            self.assertIsNone(second_ring.unrecovered())
+            second_ring.write(Checkpoint(second.day_id, timedelta(hours=2)))
+            second_ring.mark_clean()
+            self.assertEqual(ring.latest().elapsed, timedelta(hours=1))
+            self.assertFalse(ring.latest().clean)
+
+            # another collection has a ring of its own
+            other = temp_config(directory, background_writes=False, collection='other')
+            other_ring = CheckpointRing(ring_path(other.mind.Database, other.mind.collection))
+            self.assertTrue(other_ring.owned)
+            self.assertIsNone(other_ring.unrecovered())
+            other_ring.close()
+            second_ring.close()
+            second.close()
+
+            # the running instance dies without marking its ring clean
+            ring.close()
+            running.close()
+            ring = CheckpointRing(path)
+            self.assertTrue(ring.owned)
+            self.assertEqual(ring.unrecovered().elapsed, timedelta(hours=1))
+            ring.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,455 @@
+import os
+import sys
+import time
+import threading
+import unittest
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import date, datetime, timedelta
+import pandas as pd
+from tinydb import TinyDB
+from PyQt5.QtCore import Qt
+from pycounter.config import yaml_config_loader
+from pycounter.core.db import Mind
+from core.store import decode_day, read_tinydb_days, read_tinydb_tables
+from core.filelock import FileLock
+from core.writer import PersistenceWorker
+from core.report import ReportCancelled, write_report
+from ui.reportjob import ReportJob
+
+
+def temp_config(directory: str, **mind):
+    """
+    Loads the default config with the database redirected into `directory`.
+    """
+    config = yaml_config_loader("pycounter/config.yaml")
+    for key, value in mind.items():
+        setattr(config.mind, key, value)
+    config.mind.Database = str(Path(directory).joinpath('db').with_suffix(config.mind.suffix))
+    return config
+
+
+def write_tinydb(directory: str, collection: str, documents: list[dict]):
+    """
+    Writes day documents into a TinyDB file inside `directory`.
+    """
+    db = TinyDB(str(Path(directory).joinpath('db.json')))
+    db.table(collection).insert_multiple(documents)
+    db.close()
+
+
+class TestMind(unittest.TestCase):
+
+    backend = 'tinydb'
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def config(self, **mind):
+        return temp_config(self.tmp.name, backend=self.backend, **mind)
+
+    def test_update_and_push(self):
+        mind = Mind(config=self.config())
+        self.assertIsNone(mind.get_current_activity())
+
+        mind.update(timedelta(hours=1))
+        mind.update(timedelta(hours=2))
+        mind.start_order('A-1', when=datetime.now() - timedelta(minutes=30))
+        mind.push()
+
+        self.assertEqual(mind.get_current_elapsed_time(), timedelta(hours=2))
+        mind.close()
+
+        reloaded = Mind(config=self.config())
+        activity = reloaded.get_current_activity()
+        self.assertIsNotNone(activity)
+        self.assertEqual(activity['elapsed'], 7200.0)
+        self.assertAlmostEqual(activity['orders']['A-1'], 1800.0, delta=1.0)
+        self.assertEqual(reloaded.get_activity_suggestions(), ['A-1'])
+        reloaded.close()
+
+    def test_suggestion_index(self):
+        mind = Mind(config=self.config())
+        added = []
+        mind.suggestions.listeners.append(lambda name, position: added.append((name, position)))
+        mind.update(timedelta(hours=1))
+        for order in ('B', 'A', 'B'):
+            mind.start_order(order)
+            mind.push()
+
+        self.assertEqual(added, [('B', 0), ('A', 0)])
+        mind.close()
+
+        # the index is loaded from its meta record, not from the days
+        reloaded = Mind(config=self.config())
+        reloaded.store.order_names = None
+        self.assertEqual(reloaded.get_activity_suggestions(), ['A', 'B'])
+        reloaded.close()
+
+    def test_suggestions_of_other_processes_are_announced(self):
+        mind = Mind(config=self.config(background_writes=False))
+        other = Mind(config=self.config(background_writes=False))
+        mind.update(timedelta(hours=1))
+        mind.start_order('B')
+        mind.push()
+        self.assertEqual(mind.get_activity_suggestions(), ['B'])
+        added = []
+        mind.suggestions.listeners.append(lambda name, position: added.append((name, position)))
+
+        other.update(timedelta(hours=1))
+        for order in ('C', 'A'):
+            other.start_order(order)
+            other.push()
+        self.assertEqual(mind.get_activity_suggestions(), ['A', 'B', 'C'])
+        self.assertEqual(added, [('A', 0), ('C', 2)])
+        other.close()
+        mind.close()
+
+    def test_background_writes_are_grouped(self):
+        mind = Mind(config=self.config(write_delay_ms=200))
+        for minutes in range(50):
+            mind.update(timedelta(minutes=minutes))
+        mind.flush()
+
+        self.assertEqual(mind.writer.commits, 1)
+        self.assertEqual(mind.store.get_day(mind.day_id)['elapsed'], 49 * 60_000)
+        mind.close()
+
+    def test_reads_and_updates_do_not_wait_for_a_write(self):
+        mind = Mind(config=self.config(write_delay_ms=0))
+        mind.update(timedelta(minutes=1))
+        mind.flush()
+        started_at = datetime.now() - timedelta(minutes=2)
+
+        writing, release = threading.Event(), threading.Event()
+        put_day = mind.store.put_day
+
+        def slow_put_day(document):
+            writing.set()
+            release.wait(10)
+            put_day(document)
+
+        mind.store.put_day = slow_put_day
+        mind.update(timedelta(minutes=2))
+        self.assertTrue(writing.wait(10))
+
+        started = time.monotonic()
+        mind.update(timedelta(minutes=3))
+        self.assertEqual(mind.get_current_elapsed_time(), timedelta(minutes=3))
+        # the interval log is appended by the worker too
+        mind.log_timer(True)
+        mind.start_order('A', when=datetime.now() - timedelta(minutes=1))
+        mind.push()
+        self.assertLess(time.monotonic() - started, 1)
+
+        release.set()
+        mind.flush()
+        self.assertEqual(mind.store.get_day(mind.day_id)['elapsed'], 3 * 60_000)
+        self.assertAlmostEqual(mind.get_current_activity()['orders']['A'], 60.0, delta=1.0)
+        self.assertEqual([order for _, _, order in mind.get_intervals(started_at, datetime.now())], ['A', None])
+        self.assertEqual(mind._pending, {})
+        mind.close()
+
+    def test_build_data_range(self):
+        write_tinydb(self.tmp.name, self.config().mind.collection, [
+            {'day': '20241003', 'elapsed': 7200.0, 'orders': {'A': 3600.0}},
+            {'day': '20251002', 'elapsed': 3600.0, 'orders': {'B': 1800.0}},
+        ])
+        mind = Mind(config=self.config())
+
+        data = mind.build_data(format='hours', start='20251001', end='20251031')
+        self.assertEqual(list(data.columns), ['02-10-2025'])
+        self.assertEqual(data.loc['B', '02-10-2025'], 0.5)
+        mind.close()
+
+    def test_month_report_excludes_other_years(self):
+        today = date.today()
+        last_year = today.replace(year=today.year - 1, day=1)
+        write_tinydb(self.tmp.name, self.config().mind.collection, [
+            {'day': last_year.strftime('%Y%m%d'), 'elapsed': 3600.0, 'orders': {'A': 3600.0}},
+            {'day': today.strftime('%Y%m%d'), 'elapsed': 3600.0, 'orders': {'B': 3600.0}},
+        ])
+        mind = Mind(config=self.config())
+        file = str(Path(self.tmp.name).joinpath('report.xlsx'))
+
+        mind.report(interval='month', file=file, open_report=False)
+        days = pd.read_excel(file, sheet_name='Days', index_col=0)
+        self.assertEqual(list(days.columns), [today.strftime('%d-%m-%Y')])
+
+        mind.report(start=last_year, end=last_year, file=file, open_report=False)
+        days = pd.read_excel(file, sheet_name='Days', index_col=0)
+        self.assertEqual(list(days.columns), [last_year.strftime('%d-%m-%Y')])
+        mind.close()
+
+    def test_report_snapshot_progress_and_cancel(self):
+        mind = Mind(config=self.config())
+        mind.update(timedelta(hours=1))
+        snapshot = mind.report_snapshot(format='perc', interval='month')
+        mind.update(timedelta(hours=5))  # later writes do not affect the snapshot
+
+        self.assertEqual(list(snapshot.cells), [(mind.day_id, None, 3600.0)])
+
+        steps = []
+        file = write_report(snapshot, str(Path(self.tmp.name).joinpath('r.xlsx')), progress=lambda p, m: steps.append(p))
+        self.assertEqual(steps, [0, 40, 60, 100])
+
+        with self.assertRaises(ReportCancelled):
+            write_report(snapshot, file, cancelled=lambda: True)
+        mind.close()
+
+    def test_reads_hold_the_file_lock(self):
+        mind = Mind(config=self.config())
+        mind.update(timedelta(hours=1))
+        other = FileLock(mind.file_lock.path, timeout=0)
+        cells = mind.store.cells
+        locked = []
+
+        def copy_cells(start, end):
+            # another process could not write while the cells are copied
+            with self.assertRaises(TimeoutError):
+                other.acquire()
+            locked.append(True)
+            return cells(start, end)
+
+        mind.store.cells = copy_cells
+        self.assertEqual(list(mind.report_snapshot().cells), [(mind.day_id, None, 3600.0)])
+        mind.build_data()
+        self.assertEqual(locked, [True, True])
+        other.close()
+        mind.close()
+
+    def test_report_job_takes_the_snapshot_on_the_worker(self):
+        mind = Mind(config=self.config())
+        mind.update(timedelta(hours=1))
+        threads = []
+
+        def snapshot():
+            threads.append(threading.current_thread())
+            return mind.report_snapshot()
+
+        job = ReportJob(snapshot, file=str(Path(self.tmp.name).joinpath('r.csv')), layout='long')
+        finished = []
+        job.signals.finished.connect(finished.append, Qt.DirectConnection)
+        worker = threading.Thread(target=job.run)
+        worker.start()
+        worker.join()
+
+        self.assertEqual(threads, [worker])
+        self.assertEqual(len(finished), 1)
+        mind.close()
+
+    def test_build_data_perc(self):
+        write_tinydb(self.tmp.name, self.config().mind.collection, [
+            {'day': '20250102', 'elapsed': 4 * 3600.0, 'orders': {'A': 3600.0, 'B': 3600.0}},
+            {'day': '20250101', 'elapsed': 2 * 3600.0, 'orders': {'A': 1800.0}},
+        ])
+        mind = Mind(config=self.config())
+
+        data = mind.build_data(format='perc')
+        default = mind.config.mind.defaultorder
+        self.assertEqual(list(data.columns), ['01-01-2025', '02-01-2025'])
+        self.assertEqual(list(data.index), ['A', 'B', default, 'total elapsed'])
+        self.assertEqual(list(data['02-01-2025']), [25.0, 25.0, 50.0, 4.0])
+        self.assertEqual(list(data['01-01-2025']), [25.0, 0.0, 75.0, 2.0])
+        mind.close()
+
+    def test_rollups(self):
+        write_tinydb(self.tmp.name, self.config().mind.collection, [
+            {'day': '20250101', 'elapsed': 7200.0, 'orders': {'A': 3600.0}},
+            {'day': '20250205', 'elapsed': 3600.0, 'orders': {'A': 1800.0, 'B': 900.0}},
+        ])
+        mind = Mind(config=self.config())
+        self.assertEqual(mind.get_project_totals(), {'A': 5400.0, 'B': 900.0})
+        self.assertEqual(mind.get_project_totals('20250201', '20250228'), {'A': 1800.0, 'B': 900.0})
+
+        mind.update(timedelta(hours=1))
+        mind.start_order('B', when=datetime.now() - timedelta(minutes=60))
+        mind.push()
+        self.assertAlmostEqual(mind.get_project_totals()['B'], 4500.0, delta=1.0)
+
+        summary = mind.build_summary('20250101', '20250131')
+        self.assertEqual(list(summary.columns), ['01-2025'])
+        self.assertEqual(summary.loc['days worked', '01-2025'], 1)
+        self.assertEqual(summary.loc['total elapsed', '01-2025'], 2.0)
+        self.assertTrue(mind.check_rollups())
+
+        # a corrupted rollup is detected and rebuilt
+        mind.store.put_meta('rollup:order:A', 1.0)
+        mind.rollups = type(mind.rollups)(mind.store)
+        self.assertFalse(mind.check_rollups(repair=True))
+        self.assertTrue(mind.check_rollups())
+        mind.close()
+
+    def test_push_writes_only_the_touched_order_rollups(self):
+        write_tinydb(self.tmp.name, self.config().mind.collection, [
+            {'day': '20250101', 'elapsed': 7200.0, 'orders': {'A': 3600.0, 'B': 1800.0}},
+        ])
+        mind = Mind(config=self.config())
+        written = []
+        put_meta = mind.store.put_meta
+        mind.store.put_meta = lambda key, value: (written.append(key), put_meta(key, value))
+
+        mind.update(timedelta(hours=1))
+        mind.start_order('C', when=datetime.now() - timedelta(minutes=30))
+        mind.push()
+        mind.flush()
+        self.assertIn('rollup:order:C', written)
+        self.assertNotIn('rollup:order:A', written)
+        self.assertNotIn('rollup:order:B', written)
+        self.assertEqual(set(mind.get_project_totals()), {'A', 'B', 'C'})
+        mind.close()
+
+
+class TestPersistenceWorker(unittest.TestCase):
+
+    def test_concurrent_flushes_skip_the_commit_window(self):
+        worker = PersistenceWorker(delay=30)
+        worker.start()
+        written = []
+
+        def job(index):
+            written.append(index)
+            if index < 3:
+                # scheduled while the flushers wait, committed without waiting either
+                worker.schedule(index + 1, lambda: job(index + 1))
+
+        worker.schedule(0, lambda: job(0))
+        started = time.monotonic()
+        flushers = [threading.Thread(target=worker.flush) for _ in range(2)]
+        for flusher in flushers:
+            flusher.start()
+        for flusher in flushers:
+            flusher.join(10)
+        self.assertFalse(any(flusher.is_alive() for flusher in flushers))
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(written, [0, 1, 2, 3])
+        worker.stop()
+
+
+class TestTinyDBFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_migrates_legacy_documents(self):
+        config = temp_config(self.tmp.name)
+        write_tinydb(self.tmp.name, config.mind.collection, [
+            {'day': '20250101', 'elapsed': 7200.0, 'orders': {'A': 3600.0, 'B': 1800.0004}},
+            {'day': '20250102', 'elapsed': 3600.0},
+        ])
+        mind = Mind(config=config)
+        mind.update(timedelta(seconds=1.5))
+        mind.close()
+
+        tables = read_tinydb_tables(config.mind.Database)
+        records = sorted(tables[config.mind.collection].values(), key=lambda record: record['day'])
+        names = {int(order): record['name'] for order, record in tables[f'{config.mind.collection}.orders'].items()}
+        self.assertEqual(records[0], {'day': '20250101', 'ms': 7_200_000, 'orders': {'1': 3_600_000, '2': 1_800_000}})
+        self.assertEqual(records[-1]['ms'], 1_500)
+        self.assertEqual(names, {1: 'A', 2: 'B'})
+
+        # the stored format is read back, also by the migration into the other backends
+        mind = Mind(config=temp_config(self.tmp.name))
+        self.assertEqual(mind.get_current_elapsed_time(), timedelta(seconds=1.5))
+        self.assertEqual(mind.get_project_totals(), {'A': 3600.0, 'B': 1800.0})
+        mind.close()
+        days = read_tinydb_days(config.mind.Database)[config.mind.collection]
+        self.assertIn({'day': '20250101', 'elapsed': 7200.0, 'orders': {'A': 3600.0, 'B': 1800.0}}, days)
+
+
+class TestSQLiteMind(TestMind):
+
+    backend = 'sqlite'
+
+    def test_migrates_tinydb_file(self):
+        collection = self.config().mind.collection
+        write_tinydb(self.tmp.name, collection, [
+            {'day': '20250101', 'elapsed': 7200.0, 'orders': {'A': 3600.0, 'B': 1800.0}},
+            {'day': '20250102', 'elapsed': 3600.0},
+        ])
+        mind = Mind(config=self.config())
+
+        self.assertEqual(decode_day(mind.store.get_day('20250101'), mind.store.order_name)['orders'], {'A': 3600.0, 'B': 1800.0})
+        self.assertEqual(mind.get_activity_suggestions(), ['A', 'B'])
+        self.assertEqual(mind.get_project_totals(), {'A': 3600.0, 'B': 1800.0})
+        mind.close()
+
+    def test_rolled_back_order_ids_are_forgotten(self):
+        mind = Mind(config=self.config(background_writes=False))
+        store = mind.store
+        with self.assertRaises(RuntimeError):
+            with store.transaction():
+                store.order_id('A')
+                raise RuntimeError
+        self.assertNotIn('A', store.ids)
+
+        order = store.order_id('A')
+        self.assertEqual(store.order_name(order), 'A')
+        self.assertEqual(store.connection.execute('SELECT name FROM orders').fetchall(), [('A',)])
+        mind.close()
+
+
+class TestColumnarMind(TestMind):
+
+    backend = 'columnar'
+
+    def test_migrates_tinydb_file(self):
+        collection = self.config().mind.collection
+        write_tinydb(self.tmp.name, collection, [
+            {'day': '20250102', 'elapsed': 3600.0},
+            {'day': '20250101', 'elapsed': 7200.0, 'orders': {'A': 3600.0, 'B': 1800.0004}},
+        ])
+        mind = Mind(config=self.config())
+
+        self.assertEqual(decode_day(mind.store.get_day('20250101'), mind.store.order_name)['orders'], {'A': 3600.0, 'B': 1800.0})
+        self.assertEqual(mind.get_activity_suggestions(), ['A', 'B'])
+        self.assertEqual(list(mind.store.cells()), list(mind.store.iter_cells()))
+        mind.close()
+
+    def test_meta_records_are_copied(self):
+        mind = Mind(config=self.config(background_writes=False))
+        mind.store.put_meta('key', {'a': [1]})
+        mind.store.get_meta('key')['a'].append(2)
+        self.assertEqual(mind.store.get_meta('key'), {'a': [1]})
+        mind.close()
+
+    def test_days_are_kept_sorted(self):
+        mind = Mind(config=self.config(background_writes=False))
+        store = mind.store
+        a, b = store.order_id('A'), store.order_id('B')
+        store.put_day({'day': '20250103', 'elapsed': 30_000, 'orders': {b: 10_000}})
+        store.put_day({'day': '20250101', 'elapsed': 10_000})
+        store.put_day({'day': '20250103', 'elapsed': 40_000, 'orders': {b: 20_000, a: 5_000}})
+        store.put_day({'day': '20250102', 'elapsed': 20_000})
+
+        self.assertEqual([cell[0] for cell in store.iter_cells()], ['20250101', '20250102'] + ['20250103'] * 3)
+        self.assertEqual(store.get_day('20250103'), {'day': '20250103', 'elapsed': 40_000, 'orders': {a: 5_000, b: 20_000}})
+        self.assertEqual(list(store.iter_cells('20250102', '20250102')), [('20250102', None, 20.0)])
+        self.assertEqual(store.cells_path.stat().st_size, 5 * 12)
+        mind.close()
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_mind_does_not_load_analytics(self):
+        # pandas/numpy are only needed for reports, not to start the app
+        code = (
+            "import sys; import core.db, core.report; "
+            "print(sorted(m for m in ('numpy', 'pandas', 'pyarrow', 'tinydb') if m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+            env={**os.environ, 'PYTHONPATH': 'pycounter'}
+        )
+        self.assertEqual(result.stdout.strip(), '[]')
+
+
+if __name__ == "__main__":
+    unittest.main()
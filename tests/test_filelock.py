@@ -0,0 +1,164 @@
+import os
+import json
+import unittest
+import tempfile
+import multiprocessing
+from pathlib import Path
+from datetime import datetime, timedelta
+import numpy as np
+from pycounter.core.db import Mind
+from core.columnstore import CELL
+from core.filelock import FileLock
+from test_db import temp_config
+
+PROCESSES = 4
+ROUNDS = 15
+PUSH_SECONDS = 100
+
+
+def hammer(directory: str, settings: dict, index: int, start: multiprocessing.Barrier):
+    """
+    Pushes to a shared collection and updates and pushes to an own collection of the same database.
+    """
+    shared = Mind(config=temp_config(directory, write_delay_ms=5, **settings))
+    own = Mind(config=temp_config(directory, collection=f'user{index}', background_writes=False, **settings))
+    start.wait()
+    for round in range(1, ROUNDS + 1):
+        for order in (f'P{index}', 'shared'):
+            shared.start_order(order, when=datetime.now() - timedelta(seconds=PUSH_SECONDS))
+            shared.update(timedelta(minutes=round))
+            shared.push()
+        own.update(timedelta(minutes=round))
+        own.start_order(f'O{index}', when=datetime.now() - timedelta(seconds=PUSH_SECONDS))
+        own.push()
+    shared.close()
+    own.close()
+
+
+def read(directory: str, settings: dict, start: multiprocessing.Barrier, done: multiprocessing.Event,
+         reads: multiprocessing.Value):
+    """
+    Takes report snapshots while the writers run, the pushed totals must never go down.
+
+    The files of the database are also read without the lock: they must always be complete.
+    """
+    mind = Mind(config=temp_config(directory, **settings))
+    database = Path(mind.config.mind.Database)
+    start.wait()
+    last: dict[str, float] = {}
+    while not done.is_set():
+        totals: dict[str, float] = {}
+        for _, order, seconds in mind.report_snapshot().cells:
+            if order:
+                totals[order] = totals.get(order, 0.0) + seconds
+        assert all(totals.get(order, 0.0) >= seconds for order, seconds in last.items()), (last, totals)
+        last = totals
+
+        if settings.get('storage') == 'json':
+            json.loads(database.read_text(encoding='utf-8'))
+        elif settings['backend'] == 'columnar':
+            cells = np.fromfile(database.joinpath(f'{mind.config.mind.collection}.cells'), dtype=CELL)
+            assert (np.diff(cells['day']) >= 0).all()
+        reads.value += 1
+    mind.close()
+
+
+class TestFileLock(unittest.TestCase):
+
+    def test_reentrant_and_exclusive(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath('db.lock')
+            lock, other = FileLock(path), FileLock(path, timeout=0.05)
+            self.assertEqual(lock.generation(), 0)
+            with lock, lock:
+                self.assertEqual(lock.bump(), 1)
+                with self.assertRaises(TimeoutError):
+                    other.acquire()
+            with other:
+                self.assertEqual(other.generation(), 1)
+            lock.close()
+            other.close()
+
+    @unittest.skipUnless(os.name == 'posix', "file modes are POSIX")
+    def test_lock_file_is_not_executable(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath('db.lock')
+            umask = os.umask(0o022)
+            try:
+                FileLock(path).close()
+            finally:
+                os.umask(umask)
+            self.assertEqual(path.stat().st_mode & 0o777, 0o644)
+
+
+class TestConcurrentMinds(unittest.TestCase):
+
+    def run_processes(self, **settings):
+        with tempfile.TemporaryDirectory() as directory:
+            # create the database before the processes race to open it
+            Mind(config=temp_config(directory, **settings)).close()
+
+            context = multiprocessing.get_context('spawn')
+            start, done, reads = context.Barrier(PROCESSES + 1), context.Event(), context.Value('i', 0)
+            reader = context.Process(target=read, args=(directory, settings, start, done, reads))
+            writers = [
+                context.Process(target=hammer, args=(directory, settings, index, start))
+                for index in range(PROCESSES)
+            ]
+            for process in [reader] + writers:
+                process.start()
+            for process in writers:
+                process.join(120)
+                self.assertEqual(process.exitcode, 0)
+            done.set()
+            reader.join(60)
+            self.assertEqual(reader.exitcode, 0)
+            self.assertGreater(reads.value, 0)
+
+            mind = Mind(config=temp_config(directory, **settings))
+            totals = mind.get_project_totals()
+            # every push took at least PUSH_SECONDS, a lost one would be missing them
+            for index in range(PROCESSES):
+                self.assertAlmostEqual(totals[f'P{index}'], ROUNDS * PUSH_SECONDS, delta=PUSH_SECONDS / 2)
+            self.assertAlmostEqual(totals['shared'], PROCESSES * ROUNDS * PUSH_SECONDS, delta=PUSH_SECONDS / 2)
+            self.assertTrue(mind.check_rollups(repair=False))
+            self.assertEqual(mind.get_activity_suggestions(), [f'P{index}' for index in range(PROCESSES)] + ['shared'])
+            self.assert_log_matches(mind, pushes={f'P{index}': ROUNDS for index in range(PROCESSES)} | {'shared': PROCESSES * ROUNDS})
+            mind.close()
+
+            for index in range(PROCESSES):
+                mind = Mind(config=temp_config(directory, collection=f'user{index}', **settings))
+                self.assertEqual(mind.get_current_elapsed_time(), timedelta(minutes=ROUNDS))
+                self.assertAlmostEqual(mind.get_project_totals()[f'O{index}'], ROUNDS * PUSH_SECONDS, delta=1.0)
+                self.assert_log_matches(mind, pushes={f'O{index}': ROUNDS})
+                mind.close()
+
+    def assert_log_matches(self, mind: Mind, pushes: dict[str, int]):
+        """
+        The interval log of a collection derives the stored order totals, and only those orders.
+        """
+        logged: dict[str, float] = {}
+        for _, order, seconds in mind.get_interval_totals():
+            if order:
+                logged[order] = logged.get(order, 0.0) + seconds
+        stored = mind.get_project_totals()
+        self.assertEqual(sorted(logged), sorted(pushes))
+        for order, count in pushes.items():
+            # the log has a resolution of one second per event
+            self.assertAlmostEqual(logged[order], stored[order], delta=count)
+
+    def test_tinydb(self):
+        self.run_processes(backend='tinydb', storage='json')
+
+    def test_tinydb_journal(self):
+        self.run_processes(backend='tinydb', storage='journal', journal_max_bytes=4_000)
+
+    def test_sqlite(self):
+        self.run_processes(backend='sqlite')
+
+    def test_columnar(self):
+        self.run_processes(backend='columnar')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import random
+import unittest
+import tempfile
+from pathlib import Path
+from datetime import date, datetime, timedelta
+import numpy as np
+from pycounter.core.db import Mind
+from core.intervals import (
+    EVENT_SIZE, IntervalLog, day_parts, split_days, TIMER_START, TIMER_STOP, ORDER_START, ORDER_PUSH
+)
+from test_db import temp_config
+
+
+class TestIntervalLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name).joinpath('db.intervals')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_day_parts(self):
+        start = datetime(2025, 3, 1, 22, 30)
+        self.assertEqual(day_parts(start, start + timedelta(hours=1)), [('20250301', 3600.0)])
+        self.assertEqual(
+            day_parts(start, datetime(2025, 3, 3, 1, 0)),
+            [('20250301', 5400.0), ('20250302', 86400.0), ('20250303', 3600.0)]
+        )
+
+    def test_split_days_matches_day_parts(self):
+        rng = random.Random(1)
+        base = datetime(2025, 1, 1).timestamp()
+        starts = np.array([int(base + rng.uniform(0, 90 * 86400)) for _ in range(500)])
+        ends = starts + np.array([rng.randint(0, 3 * 86400) for _ in range(500)])
+        days, orders, seconds = split_days(starts, ends, np.arange(500))
+
+        expected = {}
+        for index, (first, last) in enumerate(zip(starts.tolist(), ends.tolist())):
+            if last > first:
+                for day, part in day_parts(datetime.fromtimestamp(first), datetime.fromtimestamp(last)):
+                    expected[index, day] = part
+        found = {
+            (order, date.fromordinal(day).strftime('%Y%m%d')): part
+            for day, order, part in zip(days.tolist(), orders.tolist(), seconds.tolist()) if part
+        }
+        self.assertEqual(found, {key: part for key, part in expected.items() if part})
+
+    def test_log_totals_and_queries(self):
+        log = IntervalLog(self.path)
+        day = datetime(2025, 3, 1)
+        log.append(TIMER_START, day.replace(hour=8))
+        log.append(ORDER_START, day.replace(hour=8), 'A')
+        log.append(ORDER_PUSH, day.replace(hour=10), 'A')
+        log.append(TIMER_STOP, day.replace(hour=12))
+        log.append(TIMER_STOP, day.replace(hour=13))            # repeated, ignored
+        log.append(TIMER_START, day.replace(hour=23))
+        log.append(ORDER_START, day.replace(hour=23), 'B')
+        log.append(ORDER_PUSH, day.replace(hour=23) + timedelta(hours=2), 'B')
+        log.append(TIMER_STOP, day.replace(hour=23) + timedelta(hours=3))
+        log.close()
+
+        with self.path.open('ab') as file:
+            file.write(b'\x01\x02\x03')                         # torn record
+        log = IntervalLog(self.path)
+        self.assertEqual(self.path.stat().st_size, 9 * EVENT_SIZE)
+        self.assertEqual(log.names, ['A', 'B'])
+
+        self.assertEqual(log.daily_totals(), [
+            ('20250301', None, 5 * 3600.0), ('20250301', 'A', 7200.0), ('20250301', 'B', 3600.0),
+            ('20250302', None, 7200.0), ('20250302', 'B', 3600.0),
+        ])
+        self.assertEqual(log.daily_totals(start=date(2025, 3, 2)), [
+            ('20250302', None, 7200.0), ('20250302', 'B', 3600.0)
+        ])
+        self.assertEqual(
+            list(log.between(day.replace(hour=9), day.replace(hour=11))),
+            [(day.replace(hour=8), day.replace(hour=12), None), (day.replace(hour=8), day.replace(hour=10), 'A')]
+        )
+
+        # interleaved orders are paired by order, a restarted order counts from its last start
+        log.append(ORDER_START, datetime(2025, 3, 4, 10), 'A')
+        log.append(ORDER_START, datetime(2025, 3, 4, 11), 'B')
+        log.append(ORDER_PUSH, datetime(2025, 3, 4, 11, 30), 'A')
+        log.append(ORDER_START, datetime(2025, 3, 4, 11, 30), 'B')
+        log.append(ORDER_PUSH, datetime(2025, 3, 4, 12), 'B')
+        self.assertEqual(log.daily_totals(start=date(2025, 3, 4)), [('20250304', 'A', 5400.0), ('20250304', 'B', 1800.0)])
+
+        log.append(ORDER_START, datetime(2025, 3, 5, 9), 'A')   # still running
+        self.assertEqual(log.daily_totals(start=date(2025, 3, 5)), [])
+        self.assertEqual(log.daily_totals(start=date(2025, 3, 5), now=datetime(2025, 3, 5, 9, 30)),
+                         [('20250305', 'A', 1800.0)])
+        log.close()
+
+    def test_sessions_are_paired_separately(self):
+        first, second = IntervalLog(self.path, session=1), IntervalLog(self.path, session=2)
+        day = datetime(2025, 3, 1)
+        # two processes record the same order of one collection at the same time
+        first.append(TIMER_START, day.replace(hour=8))
+        first.append(ORDER_START, day.replace(hour=8), 'A')
+        second.append(TIMER_START, day.replace(hour=9))
+        second.append(ORDER_START, day.replace(hour=9), 'A')
+        first.append(ORDER_PUSH, day.replace(hour=10), 'A')
+        first.append(TIMER_STOP, day.replace(hour=10))
+        second.append(ORDER_PUSH, day.replace(hour=12), 'A')
+        second.append(TIMER_STOP, day.replace(hour=12))
+        self.assertEqual(first.daily_totals(), [('20250301', None, 5 * 3600.0), ('20250301', 'A', 5 * 3600.0)])
+        self.assertEqual(set(first.events()['session'].tolist()), {1, 2})
+
+        # an interval left open by a crashed session is closed in its name
+        first.append(ORDER_START, day.replace(hour=13), 'B')
+        second.append(ORDER_PUSH, day.replace(hour=14), 'B', session=1)
+        self.assertEqual(second.daily_totals()[-1], ('20250301', 'B', 3600.0))
+        first.close()
+        second.close()
+
+
+class TestMindIntervals(unittest.TestCase):
+
+    def test_push_across_midnight(self):
+        with tempfile.TemporaryDirectory() as directory:
+            mind = Mind(config=temp_config(directory, background_writes=False))
+            mind.update(timedelta(hours=1))
+            midnight = datetime.combine(date.today(), datetime.min.time())
+            mind.start_order('A-1', when=midnight - timedelta(minutes=30))
+            mind.push()
+
+            yesterday = (date.today() - timedelta(days=1)).strftime(mind.day_format)
+            self.assertEqual(mind.days[yesterday]['orders'], {mind.store.order_id('A-1'): 1_800_000})
+            self.assertIn('A-1', mind.get_current_activity()['orders'])
+            self.assertEqual([interval[2] for interval in mind.get_intervals(midnight - timedelta(hours=1), datetime.now())],
+                             ['A-1'])
+            mind.close()
+
+    def test_collections_have_their_own_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            alice = Mind(config=temp_config(directory, collection='alice', background_writes=False))
+            bob = Mind(config=temp_config(directory, collection='bob', background_writes=False))
+            now = datetime.now()
+            alice.update(timedelta(hours=2))
+            bob.update(timedelta(hours=2))
+            alice.start_order('A', when=now - timedelta(minutes=90))
+            bob.start_order('B', when=now - timedelta(minutes=60))
+            alice.push()
+            bob.push()
+
+            for mind, order in ((alice, 'A'), (bob, 'B')):
+                logged = {}
+                for _, name, seconds in mind.get_interval_totals():
+                    if name:
+                        logged[name] = logged.get(name, 0.0) + seconds
+                self.assertEqual(list(logged), [order])
+                self.assertAlmostEqual(logged[order], mind.get_project_totals()[order], delta=1.0)
+                mind.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
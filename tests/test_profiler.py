@@ -0,0 +1,53 @@
+import json
+import unittest
+import tempfile
+from pathlib import Path
+from core.profiler import PROFILE_FLAG, StartupProfiler
+
+
+class TestStartupProfiler(unittest.TestCase):
+
+    def test_disabled_records_nothing(self):
+        profiler = StartupProfiler()
+        self.assertEqual(profiler.enable_from(['main.py'], environ={}), ['main.py'])
+        with profiler.phase('config'):
+            pass
+        self.assertEqual(profiler.phases, [])
+
+    def test_phases_and_imports(self):
+        profiler = StartupProfiler()
+        argv = profiler.enable_from(['main.py', PROFILE_FLAG], environ={})
+        try:
+            with profiler.phase('imports'):
+                import colorsys  # noqa: F401, a small stdlib module that is not loaded by the app
+                with profiler.phase('nested'):
+                    pass
+            profiler.mark('first paint')
+        finally:
+            profiler.disable()
+
+        self.assertEqual(argv, ['main.py'])
+        self.assertEqual([(p['name'], p['depth']) for p in profiler.phases],
+                         [('imports', 0), ('nested', 1), ('first paint', 0)])
+        self.assertGreaterEqual(profiler.phases[0]['seconds'], profiler.phases[1]['seconds'])
+
+        with tempfile.TemporaryDirectory() as directory:
+            target = profiler.write(Path(directory))
+            report = json.loads(target.read_text())
+            summary = Path(directory).joinpath('startup-profile.txt').read_text()
+            history = Path(directory).joinpath('startup-history.jsonl').read_text().splitlines()
+
+        self.assertEqual(len(report['phases']), 3)
+        self.assertIn('nested', summary)
+        self.assertEqual(len(history), 1)
+
+    def test_exit_from_environment(self):
+        profiler = StartupProfiler()
+        profiler.enable_from(['main.py'], environ={'PYCOUNTER_PROFILE_STARTUP': 'exit'})
+        profiler.disable()
+        self.assertTrue(profiler.enabled)
+        self.assertTrue(profiler.exit_after)
+
+
+if __name__ == "__main__":
+    unittest.main()
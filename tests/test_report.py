@@ -0,0 +1,91 @@
+import csv
+import json
+import unittest
+import tempfile
+from pathlib import Path
+import pandas as pd
+from core.export import has_parquet
+from core.report import ReportSnapshot, write_report
+
+CELLS = [
+    ('20250101', None, 4 * 3600.0),
+    ('20250101', 'A', 3600.0),
+    ('20250101', 'B', 1800.0),
+    ('20250102', None, 3600.0),
+]
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.snapshot = ReportSnapshot(cells=CELLS, months=[], rollups=[], default_order='0000')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def file(self, name: str) -> str:
+        return str(Path(self.tmp.name).joinpath(name))
+
+    def test_long_csv(self):
+        file = write_report(self.snapshot, self.file('r.csv'), layout='long')
+        with open(file, newline='') as source:
+            rows = list(csv.reader(source))
+
+        self.assertEqual(rows[0], ['date', 'order', 'hours'])
+        self.assertEqual(rows[1:5], [
+            ['2025-01-01', 'A', '1.0'],
+            ['2025-01-01', 'B', '0.5'],
+            ['2025-01-01', '0000', '2.5'],
+            ['2025-01-01', 'total elapsed', '4.0'],
+        ])
+        self.assertEqual(rows[-1], ['2025-01-02', 'total elapsed', '1.0'])
+
+    def test_long_jsonl_perc(self):
+        self.snapshot.format = 'perc'
+        file = write_report(self.snapshot, self.file('r.jsonl'), layout='long')
+        with open(file) as source:
+            rows = [json.loads(line) for line in source]
+
+        self.assertEqual(rows[0], {'date': '2025-01-01', 'order': 'A', 'percent': 25.0})
+        self.assertEqual(len(rows), 6)
+
+    def test_wide_csv_matches_excel_table(self):
+        file = write_report(self.snapshot, self.file('r.csv'))
+        data = pd.read_csv(file, index_col=0)
+
+        self.assertEqual(list(data.columns), ['01-01-2025', '02-01-2025'])
+        self.assertEqual(data.loc['A', '01-01-2025'], 1.0)
+
+    @unittest.skipUnless(has_parquet(), "pyarrow is not installed")
+    def test_long_parquet(self):
+        file = write_report(self.snapshot, output='parquet', layout='long')
+        data = pd.read_parquet(file)
+
+        self.assertEqual(list(data.columns), ['date', 'order', 'hours'])
+        self.assertEqual(len(data), 6)
+
+    def test_long_matches_wide(self):
+        cells = CELLS + [
+            ('20250103', 'A', 5400.0),                          # no total, the orders count
+            ('20250104', None, 3600.0), ('20250104', 'B', 7200.0),   # booked more than elapsed
+        ]
+        for format in ('hours', 'perc'):
+            snapshot = ReportSnapshot(cells=cells, months=[], rollups=[], default_order='0000', format=format)
+            wide = pd.read_csv(write_report(snapshot, self.file('wide.csv')), index_col=0)
+            with open(write_report(snapshot, self.file('long.csv'), layout='long'), newline='') as source:
+                long = list(csv.reader(source))[1:]
+
+            for date, order, value in long:
+                column = '-'.join(reversed(date.split('-')))
+                self.assertEqual(wide.loc[order, column], float(value), (format, date, order))
+            self.assertEqual(list(wide.loc['total elapsed']), [4.0, 1.0, 1.5, 1.0])
+            self.assertEqual(list(wide.loc['0000'])[2:], [0.0, 0.0])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            write_report(self.snapshot, self.file('r.txt'))
+
+
+if __name__ == "__main__":
+    unittest.main()
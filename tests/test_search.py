@@ -0,0 +1,78 @@
+import unittest
+from core.fuzzy import FuzzyIndex
+from core.search import SubstringIndex, max_distance_for
+
+
+class TestSubstringIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SubstringIndex(['340811', 'Alpha-12', 'beta-123', 'GAMMA', 'Straße'])
+
+    def test_case_insensitive_substrings(self):
+        self.assertEqual(self.index.search('A-1'), ['Alpha-12', 'beta-123'])
+        self.assertEqual(self.index.search('gam'), ['GAMMA'])
+        self.assertEqual(self.index.search('STRASSE'), ['Straße'])
+        self.assertEqual(self.index.search('08'), ['340811'])
+        self.assertEqual(self.index.search('zz'), [])
+
+    def test_limit_keeps_sorted_order(self):
+        self.assertEqual(self.index.search('', limit=2), ['340811', 'Alpha-12'])
+        self.assertEqual(self.index.search('a', limit=2), ['Alpha-12', 'GAMMA'])
+
+    def test_add(self):
+        for name in ('alpha-2', '0', 'zeta'):
+            self.assertTrue(self.index.add(name))
+        self.assertFalse(self.index.add('alpha-2'))
+        self.assertEqual(self.index.search('alpha'), ['Alpha-12', 'alpha-2'])
+        self.assertEqual(self.index.search('ta'), ['beta-123', 'zeta'])
+        self.assertEqual(self.index.search('0'), ['0', '340811'])
+        self.assertEqual(len(self.index), 8)
+
+        empty = SubstringIndex()
+        self.assertEqual(empty.search('a'), [])
+        empty.add('Ab')
+        empty.add('aa')
+        self.assertEqual(empty.search('A'), ['Ab', 'aa'])
+
+    def test_matches_linear_scan(self):
+        names = [f'{i * 7919 % 100_000:05d}-{"ab"[i % 2]}' for i in range(2_000)]
+        index = SubstringIndex(names)
+        for query in ('1', '12', '00-', 'B', '99999'):
+            expected = sorted(n for n in set(names) if query.casefold() in n.casefold())
+            self.assertEqual(index.search(query), expected)
+            self.assertEqual(index.search(query, limit=5), expected[:5])
+
+
+
+class TestFuzzyIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FuzzyIndex(['340811', '340812-dev', '431108', 'Straße-7', '9'])
+
+    def test_typos(self):
+        # substitution, transposition, deletion and insertion
+        self.assertEqual(self.index.search('340911', 1), [('340811', 1)])
+        self.assertEqual(self.index.search('348011', 1), [('340811', 1)])
+        self.assertEqual(self.index.search('34811', 1), [('340811', 1)])
+        self.assertEqual(self.index.search('3408011', 1), [('340811', 1)])
+        self.assertEqual(self.index.search('STRASE', 1), [('Straße-7', 1)])
+
+    def test_ranked_by_distance(self):
+        self.assertEqual(
+            self.index.search('340812', 2),
+            [('340812-dev', 0), ('340811', 1)]
+        )
+        self.assertEqual(self.index.search('340812', 2, limit=1), [('340812-dev', 0)])
+        self.assertEqual(self.index.search('777777', 2), [])
+
+    def test_add(self):
+        self.index.add('431109')
+        # the whole name is closer than the prefix '43110' of '431108'
+        self.assertEqual(self.index.search('431190', 1), [('431109', 1), ('431108', 1)])
+
+    def test_max_distance(self):
+        self.assertEqual([max_distance_for('x' * n) for n in (1, 2, 3, 5, 6, 12)], [0, 0, 1, 1, 2, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import unittest
+import tempfile
+from pathlib import Path
+from tinydb import TinyDB
+from pycounter.core.journal import JournalStorage
+
+
+class TestJournalStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tmp.name).joinpath('db.json'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_journal_replay(self):
+        db = TinyDB(self.path, storage=JournalStorage)
+        table = db.table('user')
+        doc_id = table.insert({'day': '20250101', 'elapsed': 10.0})
+        table.update({'orders': {'1234': 5.0}}, doc_ids=[doc_id])
+        db.close()
+
+        # nothing was written to the snapshot, everything lives in the journal
+        self.assertFalse(Path(self.path).exists() and Path(self.path).stat().st_size)
+
+        db = TinyDB(self.path, storage=JournalStorage)
+        doc = db.table('user').get(doc_id=doc_id)
+        self.assertEqual(doc, {'day': '20250101', 'elapsed': 10.0, 'orders': {'1234': 5.0}})
+        db.close()
+
+    def test_journal_compaction(self):
+        db = TinyDB(self.path, storage=JournalStorage, max_journal_bytes=200)
+        table = db.table('user')
+        for i in range(20):
+            table.insert({'day': f'202501{i:02d}', 'elapsed': float(i)})
+        self.assertLessEqual(Path(self.path).with_suffix('.journal').stat().st_size, 200)
+        db.storage.compact()
+        db.close()
+
+        # the snapshot stays a plain TinyDB JSON file
+        db = TinyDB(self.path)
+        self.assertEqual(len(db.table('user')), 20)
+        db.close()
+
+    def test_touched_documents_are_appended(self):
+        db = TinyDB(self.path, storage=JournalStorage)
+        table = db.table('user')
+        table.insert_multiple({'day': f'202501{i:02d}', 'elapsed': float(i)} for i in range(1, 21))
+        journal = Path(self.path).with_suffix('.journal')
+
+        # a touched document is appended alone, not the whole table
+        db.storage.touch('user', 5)
+        table.update({'elapsed': 99.0}, doc_ids=[5])
+        db.storage.touch('user', 6)
+        table.remove(doc_ids=[6])
+        with journal.open() as source:
+            records = [json.loads(line) for line in source]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[1:], [
+            {'t': 'user', 'id': '5', 'doc': {'day': '20250105', 'elapsed': 99.0}},
+            {'t': 'user', 'id': '6'},
+        ])
+        db.close()
+
+        db = TinyDB(self.path, storage=JournalStorage)
+        self.assertEqual(len(db.table('user')), 19)
+        self.assertEqual(db.table('user').get(doc_id=5)['elapsed'], 99.0)
+        db.close()
+
+    def test_truncated_record_is_dropped(self):
+        db = TinyDB(self.path, storage=JournalStorage)
+        db.table('user').insert({'day': '20250101', 'elapsed': 1.0})
+        db.close()
+
+        with Path(self.path).with_suffix('.journal').open('a') as journal:
+            journal.write('{"t": "user", "id": "2", "doc": {"day"')
+
+        db = TinyDB(self.path, storage=JournalStorage)
+        self.assertEqual(len(db.table('user')), 1)
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
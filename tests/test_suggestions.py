@@ -0,0 +1,91 @@
+import unittest
+from core.store import DayStore
+from core.suggestions import SuggestionIndex
+
+DAY = 24 * 60 * 60
+
+
+class MetaStore(DayStore):
+    """
+    Keeps only the meta records, in memory.
+    """
+
+    def __init__(self):
+        self.meta = {}
+        self.written = []
+
+    def get_meta(self, key: str):
+        return self.meta.get(key)
+
+    def put_meta(self, key: str, value):
+        self.meta[key] = value
+        self.written.append(key)
+
+    def iter_meta(self, prefix: str):
+        for key in sorted(key for key in self.meta if key.startswith(prefix)):
+            yield key, self.meta[key]
+
+
+class TestFrecency(unittest.TestCase):
+
+    def setUp(self):
+        self.store = MetaStore()
+        self.index = SuggestionIndex(self.store, recent_size=3, half_life=7 * DAY)
+
+    def test_frequent_and_recent_first(self):
+        now = 100 * DAY
+        for day in range(5):
+            self.index.record('often', now - 20 * DAY + day)
+        self.index.record('once', now - 30 * DAY)
+        self.index.record('today', now)
+
+        # five pushes 20 days ago weigh 5 / 2^(20/7) ~ 0.7 < one push today
+        self.assertEqual(self.index.hot(), ['today', 'often', 'once'])
+        self.index.record('often', now)
+        self.assertEqual(self.index.hot()[0], 'often')
+
+    def test_recent_is_bounded(self):
+        for when, name in enumerate('abcd'):
+            self.index.record(name, when * DAY)
+        self.index.record('b', 5 * DAY)
+
+        self.assertEqual(list(self.index.recent()), ['c', 'd', 'b'])
+        self.assertEqual(self.index.names(), ['a', 'b', 'c', 'd'])
+
+    def test_persisted(self):
+        self.index.record('a', 0.0)
+        self.index.record('b', DAY)
+        self.index.record('b', 2 * DAY)
+        self.index.save()
+
+        reloaded = SuggestionIndex(self.store, recent_size=1, half_life=7 * DAY)
+        self.assertEqual(reloaded.names(), ['a', 'b'])
+        self.assertEqual(reloaded.hot(), ['b'])
+
+    def test_save_writes_only_the_changed_orders(self):
+        for when, name in enumerate('abc'):
+            self.index.record(name, when * DAY)
+        self.index.add('d')
+        self.index.save()
+        self.store.written.clear()
+
+        self.index.record('b', 5 * DAY)
+        self.index.save()
+        self.assertEqual(self.store.written, ['suggestions:order:b'])
+        self.assertIsNone(self.store.meta['suggestions:order:d'])
+
+    def test_previous_layout_is_imported(self):
+        self.store.meta['suggestions:orders'] = ['a', 'b']
+        self.store.meta['suggestions:frecency'] = {'b': [1.0, DAY]}
+        self.assertFalse(self.index.exists())
+
+        self.index.rebuild(['c'])
+        self.assertTrue(self.index.exists())
+        reloaded = SuggestionIndex(self.store, recent_size=3, half_life=7 * DAY)
+        self.assertEqual(reloaded.names(), ['a', 'b', 'c'])
+        self.assertEqual(reloaded.hot(), ['b'])
+        self.assertIsNone(self.store.meta['suggestions:frecency'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from datetime import timedelta
+from PyQt5.QtWidgets import QApplication
+from config import AppConfig
+from core.activitymanager import ActivityManager
+from ui.timerpanel import TimerPanel
+from test_activitymanager import FakeClock
+
+
+class TestTimerPanel(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.config = AppConfig()
+        self.manager = ActivityManager(self.config, self.app, clock=self.clock)
+        self.panel = TimerPanel(self.config, None, self.manager)   # type: ignore, the ticks do not use the mind
+
+    def test_only_changes_are_drawn(self):
+        self.assertEqual(self.panel.btn_play_pause.text(), 'Start')
+        redraws = self.panel.redraws
+
+        self.manager.start_timer()
+        self.clock.now += 1
+        self.manager.tick.emit()
+        self.assertEqual(self.panel.lbl_time.text(), '00:00:01')
+        self.assertEqual(self.panel.btn_play_pause.text(), 'Pause')
+        self.assertEqual(self.panel.redraws, redraws + 2)
+
+        self.manager.tick.emit()                        # same second, nothing to draw
+        self.clock.now += 1
+        self.manager.tick.emit()                        # only the label changed
+        self.assertEqual(self.panel.redraws, redraws + 3)
+        self.assertEqual(self.panel.redraws_avoided, 3)
+
+    def test_hidden_window_is_not_drawn(self):
+        self.manager.start_timer()
+        self.manager.set_visible(False)
+        self.clock.now += 3600
+        self.manager.tick.emit()
+        self.assertEqual(self.panel.lbl_time.text(), '00:00:00')
+
+        self.manager.set_visible(True)                  # catches up on show
+        self.assertEqual(self.panel.lbl_time.text(), '01:00:00')
+        self.assertEqual(self.manager.total_elapsed, timedelta(hours=1))
+
+
+if __name__ == "__main__":
+    unittest.main()